@@ -1,7 +1,15 @@
-from fastapi import APIRouter, Depends, Query
+import asyncio
+import base64
+import json
+import time
 
-from app.core.security import get_current_user
-from app.core.loki import loki_client
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from app.core.labels import label_index
+from app.core.live import DROP_POLICIES, TailCapacityError, live_tail
+from app.core.security import authenticate_token, get_current_user
+from app.core.loki import entry_token, is_log_query, loki_client, to_ns
 from app.models.user import User
 
 router = APIRouter(prefix="/alarms", tags=["alarms"])
@@ -19,9 +27,193 @@ async def query_alarms(
     return result
 
 
+def _encode_cursor(ts: int, tokens: set[str]) -> str:
+    raw = json.dumps({"ts": str(ts), "seen": sorted(tokens)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[int, set[str]]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return int(data["ts"]), set(data.get("seen", []))
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/search")
+async def search_alarms(
+    query: str = Query(default='{job="signalforge"}', description="LogQL log query"),
+    start: str | None = Query(default=None, description="Start time (RFC3339 or Unix timestamp); default end - 1h"),
+    end: str | None = Query(default=None, description="End time (RFC3339 or Unix timestamp); default now"),
+    direction: str = Query(default="backward", pattern="^(backward|forward)$"),
+    limit: int = Query(default=10_000, ge=1, le=10_000_000, description="Maximum lines in this response"),
+    page_size: int = Query(default=1000, ge=1, le=5000, description="Lines fetched from Loki per request"),
+    cursor: str | None = Query(default=None, description="Continue after the trailer cursor of a previous response"),
+    _user: User = Depends(get_current_user),
+):
+    """Stream matching log lines as NDJSON.
+
+    Each line is {"ts", "labels", "line"} in `direction` order, fetched from
+    Loki page by page and written as it arrives. The last line is a trailer
+    {"done", "count", "cursor"}; pass `cursor` with the same query, range
+    and direction to fetch the next page of results.
+    """
+    if not is_log_query(query):
+        raise HTTPException(status_code=400, detail="Search requires a log query (stream selector)")
+    try:
+        end_ns = to_ns(end) if end else time.time_ns()
+        start_ns = to_ns(start) if start else end_ns - 3600 * 10**9
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid start or end time")
+    after = _decode_cursor(cursor) if cursor else None
+
+    async def lines():
+        count = 0
+        last_ts, seen = after if after else (None, set())
+        exhausted = True
+        async for page in loki_client.iter_entries(
+            query, start_ns, end_ns, direction, min(page_size, limit), after=after
+        ):
+            chunk = []
+            for ts, labels, line in page:
+                if count >= limit:
+                    exhausted = False
+                    break
+                chunk.append(json.dumps({"ts": str(ts), "labels": labels, "line": line}))
+                count += 1
+                if ts != last_ts:
+                    last_ts, seen = ts, set()
+                seen.add(entry_token(labels, line))
+            if chunk:
+                yield "\n".join(chunk) + "\n"
+            if count >= limit:
+                exhausted = False
+                break
+        trailer = {
+            "done": exhausted,
+            "count": count,
+            "cursor": None if exhausted or last_ts is None else _encode_cursor(last_ts, seen),
+        }
+        yield json.dumps(trailer) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.websocket("/live")
+async def live_alarms(
+    websocket: WebSocket,
+    token: str = Query(description="Bearer token (browsers cannot set headers on WebSockets)"),
+    query: str = Query(default='{job="signalforge"}', description="LogQL log query"),
+    policy: str = Query(default="drop_oldest", description="When this client falls behind: " + ", ".join(DROP_POLICIES)),
+):
+    """Live alarm tail.
+
+    Clients tailing the same query share one upstream Loki tail. Messages
+    are {"type": "entries", "entries": [{"ts", "labels", "line"}],
+    "dropped"} batches, where dropped counts entries discarded for this
+    client since the previous batch, and {"type": "status", "state"}
+    notices when the upstream connects or reconnects.
+    """
+    if await authenticate_token(token) is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+        return
+    if not is_log_query(query) or policy not in DROP_POLICIES:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid query or policy")
+        return
+    await websocket.accept()
+    try:
+        subscriber = live_tail.subscribe(query, policy)
+    except TailCapacityError as exc:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=str(exc))
+        return
+
+    # Clients send nothing; the receive task only notices the disconnect
+    receiver = asyncio.create_task(websocket.receive())
+    try:
+        while True:
+            getter = asyncio.create_task(subscriber.next_batch())
+            await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver.done():
+                getter.cancel()
+                if receiver.result()["type"] == "websocket.disconnect":
+                    break
+                receiver = asyncio.create_task(websocket.receive())
+                continue
+            batch = getter.result()
+            if batch is None:
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Client too slow")
+                break
+            entries = [item for item in batch if "type" not in item]
+            for item in batch:
+                if "type" in item:
+                    await websocket.send_json(item)
+            if entries:
+                await websocket.send_json(
+                    {"type": "entries", "entries": entries, "dropped": subscriber.take_dropped()}
+                )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        live_tail.unsubscribe(subscriber)
+
+
+@router.get("/live/stats")
+async def live_alarm_stats(_user: User = Depends(get_current_user)):
+    """Open upstream tails, their subscribers and drop counters."""
+    return live_tail.stats()
+
+
+# Index lookups answer from memory; only a request arriving before the
+# first refresh after startup waits for it (briefly)
+LABEL_INDEX_WAIT_SECONDS = 5.0
+
+
 @router.get("/labels")
 async def get_alarm_labels(
     _user: User = Depends(get_current_user),
 ):
-    result = await loki_client.query_instant(query='{job="signalforge"}', limit=1)
-    return result
+    """Label names with their value counts, from the label index."""
+    await label_index.wait_ready(LABEL_INDEX_WAIT_SECONDS)
+    return {
+        "labels": {name: len(values) for name, values in sorted(label_index.values.items())},
+        "index": label_index.stats(),
+    }
+
+
+@router.get("/labels/{name}/values")
+async def get_alarm_label_values(
+    name: str,
+    prefix: str = Query(default="", description="Case-insensitive value prefix"),
+    limit: int = Query(default=100, ge=1, le=10_000),
+    _user: User = Depends(get_current_user),
+):
+    await label_index.wait_ready(LABEL_INDEX_WAIT_SECONDS)
+    values = label_index.label_values(name, prefix, limit)
+    if values is None:
+        raise HTTPException(status_code=404, detail=f"Unknown label '{name}'")
+    return {"label": name, "values": values}
+
+
+@router.get("/autocomplete")
+async def autocomplete_alarms(
+    q: str = Query(min_length=1, description="Case-insensitive prefix of a label value, tag path or path segment"),
+    limit: int = Query(default=20, ge=1, le=200),
+    _user: User = Depends(get_current_user),
+):
+    await label_index.wait_ready(LABEL_INDEX_WAIT_SECONDS)
+    return label_index.autocomplete(q, limit)
+
+
+@router.get("/hierarchy")
+async def browse_alarm_hierarchy(
+    path: str = Query(default="", description='Node path, e.g. "Plant A/Boiler Room"; empty for the top level'),
+    limit: int = Query(default=500, ge=1, le=10_000),
+    _user: User = Depends(get_current_user),
+):
+    """Children of one node of the tag hierarchy learned from alarm display paths."""
+    await label_index.wait_ready(LABEL_INDEX_WAIT_SECONDS)
+    node = label_index.browse(path, limit)
+    if node is None:
+        raise HTTPException(status_code=404, detail=f"Unknown path '{path}'")
+    return node
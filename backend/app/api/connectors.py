@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select, text, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import get_current_user, get_current_admin
 from app.models.connector import Connector
@@ -15,7 +16,9 @@ from app.schemas.connector import ConnectorCreate, ConnectorUpdate, ConnectorRes
 
 router = APIRouter(prefix="/connectors", tags=["connectors"])
 
-VALID_CONNECTOR_TYPES = {"ignition", "factorytalk", "wincc", "plant_scada"}
+VALID_CONNECTOR_TYPES = {"ignition", "factorytalk", "wincc", "plant_scada"} | {
+    t.strip() for t in settings.EXTRA_CONNECTOR_TYPES.split(",") if t.strip()
+}
 
 EVENT_TYPE_LABELS = {0: "Active", 1: "Clear", 2: "Ack"}
 
@@ -0,0 +1,61 @@
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.core.export import export_manager
+from app.core.loki import is_log_query, to_ns
+from app.core.security import get_current_user
+from app.models.user import User
+from app.schemas.export import ExportCreate, ExportJobResponse
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+MEDIA_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+
+
+def _get_job(job_id: str, user: User):
+    job = export_manager.get(job_id, user.id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export not found")
+    return job
+
+
+@router.post("", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_export(data: ExportCreate, user: User = Depends(get_current_user)):
+    """Start a background export of every line matching `query` in [start, end)."""
+    if not is_log_query(data.query):
+        raise HTTPException(status_code=400, detail="Export requires a log query (stream selector)")
+    try:
+        start_ns = to_ns(data.start)
+        end_ns = to_ns(data.end) if data.end else time.time_ns()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid start or end time")
+    if start_ns >= end_ns:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    job = export_manager.submit(user.id, data.query, start_ns, end_ns, data.format)
+    return job.to_dict()
+
+
+@router.get("", response_model=list[ExportJobResponse])
+async def list_exports(user: User = Depends(get_current_user)):
+    return [job.to_dict() for job in export_manager.for_owner(user.id)]
+
+
+@router.get("/{job_id}", response_model=ExportJobResponse)
+async def get_export(job_id: str, user: User = Depends(get_current_user)):
+    return _get_job(job_id, user).to_dict()
+
+
+@router.get("/{job_id}/download")
+async def download_export(job_id: str, user: User = Depends(get_current_user)):
+    job = _get_job(job_id, user)
+    if job.status != "completed":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Export is {job.status}")
+    return FileResponse(job.path, media_type=MEDIA_TYPES[job.format], filename=job.filename)
+
+
+@router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_export(job_id: str, user: User = Depends(get_current_user)):
+    """Cancel a running export, or delete a finished one and its file."""
+    export_manager.delete(_get_job(job_id, user))
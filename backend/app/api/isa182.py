@@ -0,0 +1,263 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.isa182 import ActiveAlarm, AlarmLifecycle, FloodEpisode, ISA182Report
+from app.models.user import User
+from app.schemas.isa182 import (
+    ActiveAlarmList,
+    ActiveAlarmResponse,
+    AlarmLifecycleResponse,
+    DurationStats,
+    FloodEpisodeResponse,
+    ISA182ReportResponse,
+    LifecycleStats,
+    LifecycleSummary,
+    SourceLifecycleStats,
+)
+
+router = APIRouter(prefix="/isa182", tags=["isa182"])
+
+STALE_THRESHOLD_HOURS = 24
+
+# Reports stored by the signal-service ISA-18.2 analysis job (last 24 hours)
+REPORT_KINDS = ("alarm_rate", "bad_actors", "priority_distribution", "correlations")
+
+
+def _parse_time(value: str | None, default: datetime) -> datetime:
+    """Parse an RFC3339 or Unix-seconds query parameter."""
+    if not value:
+        return default
+    try:
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid time '{value}'")
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+@router.get("/floods", response_model=list[FloodEpisodeResponse])
+async def list_flood_episodes(
+    start: str | None = Query(default=None, description="Start time (RFC3339 or Unix timestamp), default 7 days ago"),
+    end: str | None = Query(default=None, description="End time (RFC3339 or Unix timestamp), default now"),
+    scope: str | None = Query(default=None, description='Area name, or "plant" for plant-wide floods'),
+    open_only: bool = Query(default=False, description="Only floods still in progress"),
+    limit: int = Query(default=200, ge=1, le=5000),
+    _user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Flood episodes overlapping [start, end], newest first."""
+    now = datetime.now(timezone.utc)
+    start_dt = _parse_time(start, now - timedelta(days=7))
+    end_dt = _parse_time(end, now)
+
+    stmt = select(FloodEpisode).where(FloodEpisode.started_at < end_dt)
+    if open_only:
+        stmt = stmt.where(FloodEpisode.ended_at.is_(None))
+    else:
+        stmt = stmt.where(or_(FloodEpisode.ended_at.is_(None), FloodEpisode.ended_at >= start_dt))
+    if scope:
+        stmt = stmt.where(FloodEpisode.scope == scope)
+    rows = await db.execute(stmt.order_by(FloodEpisode.started_at.desc()).limit(limit))
+
+    episodes = []
+    for ep in rows.scalars().all():
+        item = FloodEpisodeResponse.model_validate(ep)
+        item.duration_seconds = ((ep.ended_at or now) - ep.started_at).total_seconds()
+        episodes.append(item)
+    return episodes
+
+
+async def _standing_alarms(
+    db: AsyncSession,
+    min_age_hours: float,
+    area: str | None,
+    priority: str | None,
+    include_acked: bool,
+    limit: int,
+) -> ActiveAlarmList:
+    """Activated, not yet cleared alarms from the active_alarms state table."""
+    now = datetime.now(timezone.utc)
+    conditions = [ActiveAlarm.activated_at.is_not(None), ActiveAlarm.cleared_at.is_(None)]
+    if min_age_hours:
+        conditions.append(ActiveAlarm.activated_at < now - timedelta(hours=min_age_hours))
+    if area:
+        conditions.append(ActiveAlarm.area == area)
+    if priority:
+        conditions.append(ActiveAlarm.isa_priority == priority)
+    if not include_acked:
+        conditions.append(ActiveAlarm.acked_at.is_(None))
+
+    counts = await db.execute(
+        select(ActiveAlarm.isa_priority, func.count()).where(*conditions).group_by(ActiveAlarm.isa_priority)
+    )
+    by_priority = {p: n for p, n in counts.all()}
+    rows = await db.execute(select(ActiveAlarm).where(*conditions).order_by(ActiveAlarm.activated_at).limit(limit))
+
+    return ActiveAlarmList(
+        total=sum(by_priority.values()),
+        by_priority=by_priority,
+        alarms=[
+            ActiveAlarmResponse(
+                connector_id=a.connector_id,
+                event_id=a.event_id,
+                area=a.area,
+                equipment=a.equipment,
+                alarm_type=a.alarm_type,
+                isa_priority=a.isa_priority,
+                state="acked" if a.acked_at else "active",
+                activated_at=a.activated_at,
+                acked_at=a.acked_at,
+                standing_seconds=(now - a.activated_at).total_seconds(),
+            )
+            for a in rows.scalars().all()
+        ],
+    )
+
+
+@router.get("/active-alarms", response_model=ActiveAlarmList)
+async def list_active_alarms(
+    area: str | None = Query(default=None),
+    priority: str | None = Query(default=None, description="ISA priority: low, medium, high"),
+    include_acked: bool = Query(default=True, description="Include acknowledged but uncleared alarms"),
+    limit: int = Query(default=500, ge=1, le=5000),
+    _user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Alarms currently standing (activated, not cleared), oldest first."""
+    return await _standing_alarms(db, 0, area, priority, include_acked, limit)
+
+
+@router.get("/stale-alarms", response_model=ActiveAlarmList)
+async def list_stale_alarms(
+    threshold_hours: float = Query(default=STALE_THRESHOLD_HOURS, gt=0, description="Minimum standing time"),
+    area: str | None = Query(default=None),
+    priority: str | None = Query(default=None, description="ISA priority: low, medium, high"),
+    limit: int = Query(default=500, ge=1, le=5000),
+    _user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Alarms standing for longer than the ISA-18.2 stale threshold."""
+    return await _standing_alarms(db, threshold_hours, area, priority, True, limit)
+
+
+def _duration_columns(column) -> list:
+    return [
+        func.count(column),
+        func.avg(column),
+        *(func.percentile_cont(q).within_group(column) for q in (0.5, 0.9, 0.99)),
+        func.max(column),
+    ]
+
+
+_LIFECYCLE_COLUMNS = [*_duration_columns(AlarmLifecycle.time_to_ack), *_duration_columns(AlarmLifecycle.time_to_clear)]
+
+
+def _duration_stats(values) -> DurationStats:
+    count, *stats = values
+    if not count:
+        return DurationStats(count=0)
+    mean, p50, p90, p99, maximum = (round(float(v), 3) for v in stats)
+    return DurationStats(count=count, mean=mean, p50=p50, p90=p90, p99=p99, max=maximum)
+
+
+def _lifecycle_stats(values) -> LifecycleStats:
+    return LifecycleStats(time_to_ack=_duration_stats(values[:6]), time_to_clear=_duration_stats(values[6:12]))
+
+
+@router.get("/lifecycles", response_model=LifecycleSummary)
+async def get_lifecycle_stats(
+    start: str | None = Query(default=None, description="Start time (RFC3339 or Unix timestamp), default 7 days ago"),
+    end: str | None = Query(default=None, description="End time (RFC3339 or Unix timestamp), default now"),
+    area: str | None = Query(default=None),
+    top_n: int = Query(default=50, ge=1, le=1000, description="Number of slowest sources"),
+    _user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Time to acknowledge / time to clear for alarms activated in [start, end).
+
+    Computed from the completed alarms the signal-service stores in
+    alarm_lifecycles; alarms still standing are not included.
+    """
+    now = datetime.now(timezone.utc)
+    start_dt = _parse_time(start, now - timedelta(days=7))
+    end_dt = _parse_time(end, now)
+    conditions = [AlarmLifecycle.activated_at >= start_dt, AlarmLifecycle.activated_at < end_dt]
+    if area:
+        conditions.append(AlarmLifecycle.area == area)
+
+    outcomes = await db.execute(
+        select(AlarmLifecycle.outcome, func.count()).where(*conditions).group_by(AlarmLifecycle.outcome)
+    )
+    plant = (await db.execute(select(*_LIFECYCLE_COLUMNS).where(*conditions))).one()
+    areas = await db.execute(
+        select(AlarmLifecycle.area, *_LIFECYCLE_COLUMNS).where(*conditions).group_by(AlarmLifecycle.area)
+    )
+    slowest = func.percentile_cont(0.9).within_group(AlarmLifecycle.time_to_ack)
+    sources = await db.execute(
+        select(AlarmLifecycle.source, AlarmLifecycle.area, *_LIFECYCLE_COLUMNS)
+        .where(*conditions)
+        .group_by(AlarmLifecycle.source, AlarmLifecycle.area)
+        .order_by(slowest.desc().nulls_last())
+        .limit(top_n)
+    )
+
+    return LifecycleSummary(
+        start=start_dt,
+        end=end_dt,
+        outcomes={outcome: n for outcome, n in outcomes.all()},
+        plant=_lifecycle_stats(tuple(plant)),
+        areas={row[0]: _lifecycle_stats(tuple(row[1:])) for row in sorted(areas.all())},
+        sources=[
+            SourceLifecycleStats(source=row[0], area=row[1], **_lifecycle_stats(tuple(row[2:])).model_dump())
+            for row in sources.all()
+        ],
+    )
+
+
+@router.get("/lifecycles/alarms", response_model=list[AlarmLifecycleResponse])
+async def list_alarm_lifecycles(
+    start: str | None = Query(default=None, description="Start time (RFC3339 or Unix timestamp), default 24 hours ago"),
+    end: str | None = Query(default=None, description="End time (RFC3339 or Unix timestamp), default now"),
+    area: str | None = Query(default=None),
+    source: str | None = Query(default=None, description="equipment/alarm_type"),
+    limit: int = Query(default=500, ge=1, le=5000),
+    _user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Completed alarms activated in [start, end) with their durations, newest first."""
+    now = datetime.now(timezone.utc)
+    start_dt = _parse_time(start, now - timedelta(hours=24))
+    end_dt = _parse_time(end, now)
+    stmt = select(AlarmLifecycle).where(AlarmLifecycle.activated_at >= start_dt, AlarmLifecycle.activated_at < end_dt)
+    if area:
+        stmt = stmt.where(AlarmLifecycle.area == area)
+    if source:
+        stmt = stmt.where(AlarmLifecycle.source == source)
+    rows = await db.execute(stmt.order_by(AlarmLifecycle.activated_at.desc()).limit(limit))
+    return [AlarmLifecycleResponse.model_validate(row) for row in rows.scalars().all()]
+
+
+@router.get("/reports/{kind}", response_model=ISA182ReportResponse)
+async def get_report(
+    kind: str,
+    _user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Latest result of a periodic ISA-18.2 analysis over the last 24 hours.
+
+    Kinds: alarm_rate, bad_actors, priority_distribution, correlations.
+    """
+    if kind not in REPORT_KINDS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Unknown report '{kind}'")
+    report = await db.get(ISA182Report, kind)
+    if report is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Report '{kind}' has not been computed yet")
+    return ISA182ReportResponse.model_validate(report)
@@ -1,80 +1,78 @@
+import asyncio
 import time
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
 
-from app.core.database import get_db
-from app.core.loki import loki_client
-from app.core.security import get_current_user
+from app.core.cache import ResponseCache
+from app.core.config import settings
+from app.core.database import async_session
+from app.core.loki import is_log_query, loki_client, to_seconds
+from app.core.push import SnapshotPublisher
+from app.core.security import authenticate_token, get_current_user
 from app.models.connector import Connector
+from app.models.rollup import AlarmCount10m, AlarmCount1h
 from app.models.user import User
 
 router = APIRouter(prefix="/metrics", tags=["metrics"])
 
+# Every dashboard tab polls the overview; identical for all users
+overview_cache = ResponseCache(
+    "overview",
+    ttl=settings.OVERVIEW_CACHE_TTL_SECONDS,
+    stale_ttl=settings.OVERVIEW_CACHE_STALE_SECONDS,
+)
 
-@router.get("/overview")
-async def get_overview(
-    _user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
-    now = int(time.time())
-    start_24h = now - 86400
 
-    # 1. Hourly alarm counts over past 24h (time series for chart)
-    alarm_rate: list[dict] = []
-    try:
-        result = await loki_client.query_metric(
-            query='count_over_time({job="signalforge"}[1h])',
-            start=str(start_24h),
-            end=str(now),
-            step=3600,
+def _utc(ts: int) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+async def _hourly_counts(first_hour: int) -> list[dict]:
+    async with async_session() as db:
+        rows = await db.execute(
+            select(AlarmCount1h.bucket_start, func.sum(AlarmCount1h.count))
+            .where(AlarmCount1h.bucket_start >= _utc(first_hour))
+            .group_by(AlarmCount1h.bucket_start)
         )
-        series_list = result.get("data", {}).get("result", [])
-        if series_list:
-            buckets: dict[int, int] = {}
-            for series in series_list:
-                for ts_str, val_str in series.get("values", []):
-                    ts = int(float(ts_str))
-                    buckets[ts] = buckets.get(ts, 0) + int(float(val_str))
-            alarm_rate = [{"time": ts, "count": cnt} for ts, cnt in sorted(buckets.items())]
-    except Exception:
-        pass
-
-    # 2. Severity breakdown over past 24h (instant metric query)
-    by_severity: list[dict] = []
-    try:
-        result = await loki_client.query_instant(
-            query='sum by (severity) (count_over_time({job="signalforge"}[24h]))',
+        buckets = {int(bucket.timestamp()): int(count) for bucket, count in rows.all()}
+    return [
+        {"time": ts, "count": buckets.get(ts, 0)}
+        for ts in range(first_hour, first_hour + 24 * 3600, 3600)
+    ]
+
+
+async def _severity_counts(first_hour: int) -> list[dict]:
+    async with async_session() as db:
+        rows = await db.execute(
+            select(AlarmCount1h.severity, func.sum(AlarmCount1h.count))
+            .where(AlarmCount1h.bucket_start >= _utc(first_hour))
+            .group_by(AlarmCount1h.severity)
         )
-        for series in result.get("data", {}).get("result", []):
-            by_severity.append({
-                "severity": series.get("metric", {}).get("severity", "unknown"),
-                "count": int(float(series["value"][1])),
-            })
-    except Exception:
-        pass
-
-    # 3. Last 1h total
-    last_1h = 0
-    try:
-        result = await loki_client.query_instant(
-            query='sum(count_over_time({job="signalforge"}[1h]))',
+        return [{"severity": severity, "count": int(count)} for severity, count in rows.all()]
+
+
+async def _last_hour_total(now: int) -> int:
+    # Six 10-minute buckets, the newest one partial
+    async with async_session() as db:
+        total = await db.scalar(
+            select(func.coalesce(func.sum(AlarmCount10m.count), 0))
+            .where(AlarmCount10m.bucket_start >= _utc(now // 600 * 600 - 5 * 600))
         )
-        result_list = result.get("data", {}).get("result", [])
-        if result_list:
-            last_1h = int(float(result_list[0]["value"][1]))
-    except Exception:
-        pass
-
-    # 4. Connector stats from DB
-    rows = await db.execute(select(Connector))
-    connectors = rows.scalars().all()
+    return int(total or 0)
+
+
+async def _connector_stats() -> dict:
+    async with async_session() as db:
+        rows = await db.execute(select(Connector))
+        connectors = rows.scalars().all()
     export_enabled_count = sum(
         1 for c in connectors
         if c.enabled and (c.label_mappings or {}).get("_export_enabled", False)
     )
-    connector_stats = {
+    return {
         "total": len(connectors),
         "connected": sum(1 for c in connectors if c.status in ("connected", "polling")),
         "error": sum(1 for c in connectors if c.status == "error"),
@@ -96,6 +94,20 @@ async def get_overview(
         ],
     }
 
+
+async def _compute_overview() -> dict:
+    now = int(time.time())
+    # Hour buckets of the last 24h, including the current (partial) hour
+    first_hour = now // 3600 * 3600 - 23 * 3600
+
+    # Independent queries, each on its own session, run concurrently
+    alarm_rate, by_severity, last_1h, connector_stats = await asyncio.gather(
+        _hourly_counts(first_hour),
+        _severity_counts(first_hour),
+        _last_hour_total(now),
+        _connector_stats(),
+    )
+
     return {
         "alarm_rate": alarm_rate,
         "by_severity": by_severity,
@@ -104,4 +116,74 @@ async def get_overview(
             "last_24h": sum(p["count"] for p in alarm_rate),
         },
         "connectors": connector_stats,
+        "generated_at": now,
+    }
+
+
+@router.get("/overview")
+async def get_overview(_user: User = Depends(get_current_user)):
+    return await overview_cache.get("overview", _compute_overview)
+
+
+# One computation per interval (or ingestion notification) for every open dashboard
+overview_publisher = SnapshotPublisher(
+    "overview",
+    _compute_overview,
+    interval=settings.DASHBOARD_PUSH_INTERVAL_SECONDS,
+    min_interval=settings.DASHBOARD_MIN_INTERVAL_SECONDS,
+    channel=settings.INGEST_NOTIFY_CHANNEL,
+)
+
+
+@router.get("/stream")
+async def stream_overview(
+    token: str = Query(description="Bearer token (EventSource cannot set headers)"),
+):
+    """Server-sent overview updates.
+
+    Sends a `snapshot` event with the full /metrics/overview payload, then
+    `delta` events holding a JSON merge patch (RFC 7386) against the
+    previous version. Event ids are consecutive versions; a client that
+    receives a snapshot should replace its state.
+    """
+    if await authenticate_token(token) is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    return StreamingResponse(
+        overview_publisher.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/query_range")
+async def query_range(
+    query: str = Query(description="LogQL metric query, e.g. sum by (area) (count_over_time({job=\"signalforge\"}[1h]))"),
+    start: str | None = Query(default=None, description="Start time (RFC3339 or Unix timestamp); default end - 24h"),
+    end: str | None = Query(default=None, description="End time (RFC3339 or Unix timestamp); default now"),
+    step: int = Query(default=3600, ge=1, description="Evaluation step in seconds"),
+    _user: User = Depends(get_current_user),
+):
+    """Time series for a dashboard panel, as a Loki matrix result.
+
+    Served through the step-aligned result cache: settled past intervals
+    come from memory and only the recent head of the range is queried.
+    """
+    if is_log_query(query):
+        raise HTTPException(status_code=400, detail="query_range requires a metric query")
+    try:
+        end_s = to_seconds(end) if end else time.time()
+        start_s = to_seconds(start) if start else end_s - 24 * 3600
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid start or end time")
+    if start_s > end_s:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return await loki_client.query_metric(query, start_s, end_s, step)
+
+
+@router.get("/cache")
+async def get_cache_stats(_user: User = Depends(get_current_user)):
+    """Hit rate and latency of the metrics response caches."""
+    return {
+        "caches": [overview_cache.stats(), loki_client.result_cache.stats()],
+        "publishers": [overview_publisher.stats()],
     }
@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api import auth, users, connectors, alarms, health, metrics, transform
+from app.api import auth, users, connectors, alarms, health, metrics, transform, isa182, exports
 
 api_router = APIRouter(prefix="/api")
 api_router.include_router(auth.router)
@@ -10,3 +10,5 @@ api_router.include_router(alarms.router)
 api_router.include_router(health.router)
 api_router.include_router(metrics.router)
 api_router.include_router(transform.router)
+api_router.include_router(isa182.router)
+api_router.include_router(exports.router)
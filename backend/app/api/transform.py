@@ -154,6 +154,7 @@ SAMPLE_DATA: dict[str, list[dict[str, Any]]] = {
             "ProcessValue": 87.3,
             "Limit": 80.0,
             "EventId": "WCC-14302-MU01",
+            "AlarmKey": "M01_TEMP|1234",
         },
         {
             "MessageNumber": 1235,
@@ -167,6 +168,7 @@ SAMPLE_DATA: dict[str, list[dict[str, Any]]] = {
             "ProcessValue": 0.0,
             "Limit": 1.0,
             "EventId": "WCC-14278-PLC02",
+            "AlarmKey": "PLC02_COMM|1235",
         },
         {
             "MessageNumber": 1236,
@@ -180,11 +182,13 @@ SAMPLE_DATA: dict[str, list[dict[str, Any]]] = {
             "ProcessValue": 45.2,
             "Limit": 50.0,
             "EventId": "WCC-14150-CW01",
+            "AlarmKey": "CW_FLOW|1236",
         },
     ],
     "plant_scada": [
         {
             "AlarmID": "CIT-4521",
+            "AlarmKey": "PUMP_01|PUMP_01_FAULT",
             "Time": "2026-02-26T14:30:00",
             "Tag": "PUMP_01_FAULT",
             "Description": "Pump 01 high vibration — maintenance required",
@@ -199,6 +203,7 @@ SAMPLE_DATA: dict[str, list[dict[str, Any]]] = {
         },
         {
             "AlarmID": "CIT-4522",
+            "AlarmKey": "REACTOR_02|REACTOR_PRESS_HH",
             "Time": "2026-02-26T14:22:00",
             "Tag": "REACTOR_PRESS_HH",
             "Description": "Reactor R02 pressure high-high alarm",
@@ -213,6 +218,7 @@ SAMPLE_DATA: dict[str, list[dict[str, Any]]] = {
         },
         {
             "AlarmID": "CIT-4523",
+            "AlarmKey": "TANK_03|TANK_LEVEL_LL",
             "Time": "2026-02-26T14:05:00",
             "Tag": "TANK_LEVEL_LL",
             "Description": "Feed tank T03 level low-low",
@@ -256,7 +262,8 @@ DEFAULT_MAPPINGS: dict[str, dict[str, str]] = {
         "value_field": "Value",
         "threshold_field": "Limit",
         "priority_field": "Priority",
-        "vendor_id_field": "AlarmId",
+        "vendor_id_field": "EventID",
+        "event_id_field": "AlarmId",
     },
     "wincc": {
         "timestamp_field": "DateTime",
@@ -270,6 +277,7 @@ DEFAULT_MAPPINGS: dict[str, dict[str, str]] = {
         "threshold_field": "Limit",
         "priority_field": "Priority",
         "vendor_id_field": "EventId",
+        "event_id_field": "AlarmKey",
     },
     "plant_scada": {
         "timestamp_field": "Time",
@@ -283,6 +291,7 @@ DEFAULT_MAPPINGS: dict[str, dict[str, str]] = {
         "threshold_field": "High",
         "priority_field": "Priority",
         "vendor_id_field": "AlarmID",
+        "event_id_field": "AlarmKey",
     },
 }
 
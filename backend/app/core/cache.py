@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("value", "computed_at")
+
+    def __init__(self, value: Any, computed_at: float):
+        self.value = value
+        self.computed_at = computed_at
+
+
+class ResponseCache:
+    """In-process TTL cache with single-flight and stale-while-revalidate.
+
+    - Fresh entries (younger than `ttl`) are served directly.
+    - Stale entries (up to `ttl + stale_ttl`) are served immediately while
+      one background task recomputes them.
+    - On a miss, concurrent callers for the same key share one computation.
+
+    Values must be computed without request-scoped resources (e.g. open
+    their own DB sessions), since a computation can outlive the request
+    that started it.
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0.0, max_entries: int = 256):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._computes = 0
+        self._compute_seconds = 0.0
+        self._max_compute_seconds = 0.0
+        self._requests = 0
+        self._request_seconds = 0.0
+
+    async def get(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        try:
+            return await self._get(key, compute)
+        finally:
+            self._requests += 1
+            self._request_seconds += time.perf_counter() - started
+
+    async def _get(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry.computed_at
+            if age < self.ttl:
+                self.hits += 1
+                return entry.value
+            if age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._start(key, compute)
+                return entry.value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = self._start(key, compute)
+        # Shield so one caller disconnecting does not cancel the shared computation
+        return await asyncio.shield(task)
+
+    def _start(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.create_task(self._compute(key, compute))
+            # Background refreshes may have no awaiter; failures are logged in _compute
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        try:
+            value = await compute()
+        except Exception:
+            self.errors += 1
+            logger.exception(f"{self.name} cache: computing {key!r} failed")
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            elapsed = time.perf_counter() - started
+            self._computes += 1
+            self._compute_seconds += elapsed
+            self._max_compute_seconds = max(self._max_compute_seconds, elapsed)
+        self._entries[key] = _Entry(value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        served = self.hits + self.stale_hits + self.misses + self.coalesced
+        return {
+            "name": self.name,
+            "ttl_seconds": self.ttl,
+            "stale_seconds": self.stale_ttl,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": round((self.hits + self.stale_hits + self.coalesced) / served, 4) if served else 0.0,
+            "avg_request_ms": round(self._request_seconds / self._requests * 1000, 2) if self._requests else 0.0,
+            "avg_compute_ms": round(self._compute_seconds / self._computes * 1000, 2) if self._computes else 0.0,
+            "max_compute_ms": round(self._max_compute_seconds * 1000, 2),
+        }
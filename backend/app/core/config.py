@@ -9,6 +9,40 @@ class Settings(BaseSettings):
     ADMIN_USERNAME: str = "admin"
     ADMIN_PASSWORD: str = "admin123"
     LOKI_URL: str = "http://loki:3100"
+    # Dashboard overview response cache (shared by all clients)
+    OVERVIEW_CACHE_TTL_SECONDS: float = 10.0
+    OVERVIEW_CACHE_STALE_SECONDS: float = 60.0  # serve stale while refreshing, up to this long past TTL
+    # Server-sent dashboard updates (/api/metrics/stream)
+    DASHBOARD_PUSH_INTERVAL_SECONDS: float = 15.0  # recompute at least this often while clients are connected
+    DASHBOARD_MIN_INTERVAL_SECONDS: float = 2.0  # ... and at most this often on ingestion notifications
+    DASHBOARD_KEEPALIVE_SECONDS: float = 20.0
+    INGEST_NOTIFY_CHANNEL: str = "signalforge_ingest"  # Postgres NOTIFY sent by the signal-service, "" to disable
+    # Long Loki range queries are split into shards run concurrently
+    LOKI_SHARD_SECONDS: int = 86400
+    LOKI_MAX_PARALLEL_QUERIES: int = 4
+    LOKI_QUERY_TIMEOUT_SECONDS: float = 60.0  # per shard request
+    # Step-aligned Loki metric result cache
+    LOKI_CACHE_INTERVAL_SECONDS: int = 3600  # cache granularity (rounded to whole steps)
+    LOKI_CACHE_FRESHNESS_SECONDS: int = 900  # intervals newer than this may still change; keep above ingestion lag
+    LOKI_RESULT_CACHE_MAX_SAMPLES: int = 2_000_000
+    # Live alarm tail: one upstream Loki tail per selector, fanned out to clients
+    LIVE_TAIL_MAX_SELECTORS: int = 8  # Loki's max_concurrent_tail_requests defaults to 10
+    LIVE_TAIL_QUEUE_SIZE: int = 1000  # entries buffered per client before its drop policy applies
+    LIVE_TAIL_DELAY_SECONDS: int = 0  # Loki delay_for (0-5), trades latency for fewer out-of-order entries
+    # Label / tag hierarchy index for autocomplete and browsing
+    LABEL_INDEX_REFRESH_SECONDS: int = 300
+    LABEL_INDEX_LOOKBACK_HOURS: int = 24  # label values and paths seen in this window
+    LABEL_INDEX_QUERY: str = '{job="signalforge", event_type="active"}'  # lines scanned for tag paths
+    LABEL_INDEX_PAGE_SIZE: int = 5000
+    LABEL_INDEX_MAX_LINES_PER_REFRESH: int = 200_000  # a larger backlog is caught up over later refreshes
+    LABEL_INDEX_MAX_PATHS: int = 500_000
+    # Background alarm export jobs (CSV / Parquet files)
+    EXPORT_DIR: str = "/tmp/signalforge-exports"
+    EXPORT_MAX_RUNNING: int = 2
+    EXPORT_RETENTION_HOURS: int = 24  # finished exports are deleted after this long
+    EXPORT_PARQUET_ROW_GROUP: int = 50_000
+    # Comma-separated site-specific connector types registered in the signal-service
+    EXTRA_CONNECTOR_TYPES: str = ""
 
     model_config = {"env_file": ".env", "extra": "ignore"}
 
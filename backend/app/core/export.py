@@ -0,0 +1,246 @@
+import asyncio
+import csv
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.config import settings
+from app.core.loki import MAX_QUERY_LIMIT, loki_client
+
+# Stable export schema, mirroring the signal-service CanonicalAlarmEvent:
+# timestamp, labels (AlarmLabels), message and metadata (AlarmMetadata)
+LABEL_COLUMNS = [
+    "source", "severity", "area", "equipment", "alarm_type", "connector_id", "isa_priority", "event_type",
+]
+METADATA_COLUMNS = [
+    "value", "threshold", "unit", "state", "priority", "vendor_alarm_id", "event_id", "ack_user",
+    "ack_required", "shelved",
+]
+COLUMNS = ["timestamp", *LABEL_COLUMNS, "message", *METADATA_COLUMNS]
+
+FORMATS = {"csv": ".csv", "parquet": ".parquet"}
+
+
+def _row(ts_ns: int, labels: dict[str, str], line: str) -> dict[str, Any]:
+    try:
+        body = json.loads(line)
+        if not isinstance(body, dict):
+            body = {"message": line}
+    except ValueError:
+        body = {"message": line}
+    row: dict[str, Any] = {"timestamp": ts_ns}
+    for column in LABEL_COLUMNS:
+        row[column] = labels.get(column)
+    row["message"] = body.get("message")
+    for column in METADATA_COLUMNS:
+        row[column] = body.get(column)
+    return row
+
+
+class _CsvWriter:
+    def __init__(self, path: str):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=COLUMNS)
+        self._writer.writeheader()
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        for row in rows:
+            row["timestamp"] = datetime.fromtimestamp(row["timestamp"] / 1e9, tz=timezone.utc).isoformat()
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetWriter:
+    """Buffers rows into row groups of EXPORT_PARQUET_ROW_GROUP rows."""
+
+    def __init__(self, path: str):
+        # Imported here so CSV exports and app startup do not load pyarrow
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self.schema = pa.schema([
+            ("timestamp", pa.timestamp("ns", tz="UTC")),
+            *[(column, pa.string()) for column in LABEL_COLUMNS],
+            ("message", pa.string()),
+            ("value", pa.float64()),
+            ("threshold", pa.float64()),
+            ("unit", pa.string()),
+            ("state", pa.string()),
+            ("priority", pa.int32()),
+            ("vendor_alarm_id", pa.string()),
+            ("event_id", pa.string()),
+            ("ack_user", pa.string()),
+            ("ack_required", pa.bool_()),
+            ("shelved", pa.bool_()),
+        ])
+        self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        self._buffer: list[dict[str, Any]] = []
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        self._buffer.extend(rows)
+        if len(self._buffer) >= settings.EXPORT_PARQUET_ROW_GROUP:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        columns = {}
+        for field in self.schema:
+            values = [row.get(field.name) for row in self._buffer]
+            try:
+                columns[field.name] = self._pa.array(values, type=field.type)
+            except (self._pa.ArrowInvalid, self._pa.ArrowTypeError):
+                # Vendor metadata of an unexpected type: keep the row, drop the value
+                columns[field.name] = self._pa.array(
+                    [_coerce(v, field.type, self._pa) for v in values], type=field.type
+                )
+        self._writer.write_table(self._pa.table(columns, schema=self.schema))
+        self._buffer = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+def _coerce(value: Any, arrow_type: Any, pa: Any) -> Any:
+    try:
+        pa.array([value], type=arrow_type)
+        return value
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+
+
+class ExportJob:
+    def __init__(self, owner: str, query: str, start_ns: int, end_ns: int, fmt: str):
+        self.id = str(uuid.uuid4())
+        self.owner = owner
+        self.query = query
+        self.start_ns = start_ns
+        self.end_ns = end_ns
+        self.format = fmt
+        self.status = "queued"  # queued, running, completed, failed, cancelled
+        self.rows = 0
+        self.progress = 0.0
+        self.error: str | None = None
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: datetime | None = None
+        self.path = os.path.join(settings.EXPORT_DIR, f"{self.id}{FORMATS[fmt]}")
+        self.task: asyncio.Task | None = None
+        self._started = 0.0
+
+    @property
+    def filename(self) -> str:
+        start = datetime.fromtimestamp(self.start_ns / 1e9, tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        end = datetime.fromtimestamp(self.end_ns / 1e9, tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        return f"alarms_{start}_{end}{FORMATS[self.format]}"
+
+    def to_dict(self) -> dict[str, Any]:
+        elapsed = (time.monotonic() - self._started) if self._started and self.status == "running" else None
+        return {
+            "id": self.id,
+            "query": self.query,
+            "start": datetime.fromtimestamp(self.start_ns / 1e9, tz=timezone.utc),
+            "end": datetime.fromtimestamp(self.end_ns / 1e9, tz=timezone.utc),
+            "format": self.format,
+            "status": self.status,
+            "rows": self.rows,
+            "progress": round(self.progress, 4),
+            "rows_per_second": round(self.rows / elapsed, 1) if elapsed else None,
+            "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ExportManager:
+    """Runs export jobs as background tasks and keeps their state in memory.
+
+    Each job walks the range shard by shard (LOKI_SHARD_SECONDS) in time
+    order, paging entries out of Loki and appending them to the output
+    file, so memory holds at most one page (plus one Parquet row group).
+    Finished files are removed after EXPORT_RETENTION_HOURS.
+    """
+
+    def __init__(self):
+        self.jobs: dict[str, ExportJob] = {}
+        self._slots: asyncio.Semaphore | None = None
+
+    def submit(self, owner: str, query: str, start_ns: int, end_ns: int, fmt: str) -> ExportJob:
+        self._prune()
+        os.makedirs(settings.EXPORT_DIR, exist_ok=True)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, settings.EXPORT_MAX_RUNNING))
+        job = ExportJob(owner, query, start_ns, end_ns, fmt)
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job))
+        return job
+
+    async def _run(self, job: ExportJob) -> None:
+        async with self._slots:
+            job.status = "running"
+            job._started = time.monotonic()
+            writer = None
+            try:
+                writer = _ParquetWriter(job.path) if job.format == "parquet" else _CsvWriter(job.path)
+                shard_ns = max(1, settings.LOKI_SHARD_SECONDS) * 10**9
+                total = max(1, job.end_ns - job.start_ns)
+                for lo in range(job.start_ns, job.end_ns, shard_ns):
+                    hi = min(job.end_ns, lo + shard_ns)
+                    async for page in loki_client.iter_entries(job.query, lo, hi, "forward", MAX_QUERY_LIMIT):
+                        writer.write([_row(ts, labels, line) for ts, labels, line in page])
+                        job.rows += len(page)
+                        job.progress = (page[-1][0] - job.start_ns) / total
+                    job.progress = (hi - job.start_ns) / total
+                writer.close()
+                writer = None
+                job.status = "completed"
+            except asyncio.CancelledError:
+                job.status = "cancelled"
+                raise
+            except Exception as exc:
+                job.status = "failed"
+                job.error = str(exc)
+            finally:
+                if writer is not None:
+                    writer.close()
+                if job.status != "completed" and os.path.exists(job.path):
+                    os.remove(job.path)
+                job.finished_at = datetime.now(timezone.utc)
+
+    def get(self, job_id: str, owner: str) -> ExportJob | None:
+        job = self.jobs.get(job_id)
+        return job if job is not None and job.owner == owner else None
+
+    def for_owner(self, owner: str) -> list[ExportJob]:
+        self._prune()
+        return sorted((j for j in self.jobs.values() if j.owner == owner), key=lambda j: j.created_at, reverse=True)
+
+    def delete(self, job: ExportJob) -> None:
+        """Cancel a queued or running job (which removes its partial file) or delete its output."""
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+        elif os.path.exists(job.path):
+            os.remove(job.path)
+        self.jobs.pop(job.id, None)
+
+    async def close(self) -> None:
+        tasks = [job.task for job in self.jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _prune(self) -> None:
+        cutoff = time.time() - settings.EXPORT_RETENTION_HOURS * 3600
+        for job in list(self.jobs.values()):
+            if job.finished_at is not None and job.finished_at.timestamp() < cutoff:
+                self.delete(job)
+
+
+export_manager = ExportManager()
@@ -0,0 +1,270 @@
+import asyncio
+import bisect
+import json
+import logging
+import time
+from typing import Any
+
+from app.core.config import settings
+from app.core.loki import entry_token, loki_client
+
+logger = logging.getLogger(__name__)
+
+PATH_SEPARATOR = "/"
+
+
+class PrefixIndex:
+    """Immutable case-insensitive prefix search over (text, item) pairs.
+
+    Keys are kept sorted, so a search is a binary search to the first
+    match plus a scan over the matches returned.
+    """
+
+    def __init__(self, pairs: list[tuple[str, Any]]):
+        pairs = sorted(((text.casefold(), item) for text, item in pairs), key=lambda p: p[0])
+        self._keys = [key for key, _ in pairs]
+        self._items = [item for _, item in pairs]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(self, prefix: str, limit: int) -> list[Any]:
+        prefix = prefix.casefold()
+        keys = self._keys
+        i = bisect.bisect_left(keys, prefix)
+        results = []
+        while i < len(keys) and len(results) < limit and keys[i].startswith(prefix):
+            results.append(self._items[i])
+            i += 1
+        return results
+
+
+class _Node:
+    __slots__ = ("name", "children", "tags", "ordered")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.children: dict[str, _Node] = {}
+        self.tags = 0  # leaf paths below (and including) this node
+        self.ordered: list[_Node] | None = None  # children largest first, set when the index is built
+
+    def sorted_children(self) -> list["_Node"]:
+        return sorted(self.children.values(), key=lambda c: (-c.tags, c.name))
+
+
+def path_segments(labels: dict[str, str], line: str) -> list[str]:
+    """Hierarchy of one alarm line.
+
+    Ignition-style messages are display paths ("Plant A/Boiler Room/Boiler01/
+    HighTemperature"); other vendors fall back to area / equipment / alarm_type.
+    """
+    try:
+        body = json.loads(line)
+        message = body.get("message", "") if isinstance(body, dict) else ""
+    except ValueError:
+        message = line
+    if isinstance(message, str) and PATH_SEPARATOR in message:
+        segments = [s.strip() for s in message.split(PATH_SEPARATOR) if s.strip()]
+        if len(segments) > 1:
+            return segments
+    return [labels[k] for k in ("area", "equipment", "alarm_type") if labels.get(k)]
+
+
+class LabelIndex:
+    """In-memory index of Loki label values and the alarm tag hierarchy.
+
+    A background task refreshes it every LABEL_INDEX_REFRESH_SECONDS:
+    label names and values come from Loki's label APIs over the last
+    LABEL_INDEX_LOOKBACK_HOURS, and tag paths are learned by scanning new
+    active alarm lines since the previous refresh (at most
+    LABEL_INDEX_MAX_LINES_PER_REFRESH; a backlog is caught up over the
+    following refreshes). Searches run against immutable snapshots that
+    each refresh replaces, so requests never wait on Loki.
+    """
+
+    def __init__(self):
+        self.values: dict[str, PrefixIndex] = {}
+        self.root = _Node("")
+        self.paths = 0
+        self.refreshed_at: float | None = None
+        self.scanned_to_ns: int | None = None
+        self.last_error: str | None = None
+        self._value_index = PrefixIndex([])
+        self._path_index = PrefixIndex([])
+        self._after: tuple[int, set[str]] | None = None
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def wait_ready(self, timeout: float) -> bool:
+        """Wait for the first refresh (up to `timeout` seconds)."""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.refresh()
+                self.last_error = None
+            except Exception as exc:
+                self.last_error = str(exc) or type(exc).__name__
+                logger.warning(f"Label index refresh failed: {self.last_error}")
+            self._ready.set()
+            await asyncio.sleep(max(1.0, settings.LABEL_INDEX_REFRESH_SECONDS - (time.monotonic() - started)))
+
+    async def refresh(self) -> None:
+        end_ns = time.time_ns()
+        start_ns = end_ns - settings.LABEL_INDEX_LOOKBACK_HOURS * 3600 * 10**9
+
+        names = await loki_client.labels(start_ns, end_ns)
+        fetched = await asyncio.gather(*(loki_client.label_values(name, start_ns, end_ns) for name in names))
+        # Sorting tens of thousands of keys would stall the event loop
+        self.values, self._value_index = await asyncio.to_thread(self._build_value_indexes, dict(zip(names, fetched)))
+
+        if await self._scan_paths(start_ns, end_ns):
+            self._path_index = await asyncio.to_thread(self._build_path_index)
+        self.refreshed_at = time.time()
+
+    @staticmethod
+    def _build_value_indexes(values: dict[str, list[str]]) -> tuple[dict[str, PrefixIndex], PrefixIndex]:
+        per_label = {name: PrefixIndex([(value, value) for value in vals]) for name, vals in values.items()}
+        combined = PrefixIndex([(value, (name, value)) for name, vals in values.items() for value in vals])
+        return per_label, combined
+
+    async def _scan_paths(self, start_ns: int, end_ns: int) -> bool:
+        """Add tag paths from lines since the last scan; True if the tree changed."""
+        if self._after is not None and self._after[0] < start_ns:
+            self._after = None  # fell behind the lookback window: skip ahead
+        lines, added = 0, 0
+        async for page in loki_client.iter_entries(
+            settings.LABEL_INDEX_QUERY, start_ns, end_ns, "forward", settings.LABEL_INDEX_PAGE_SIZE, after=self._after
+        ):
+            for ts, labels, line in page:
+                added += self._add_path(path_segments(labels, line))
+            lines += len(page)
+            # Resume point for the next scan: last timestamp and the entries seen there
+            last_ts = page[-1][0]
+            seen = self._after[1] if self._after is not None and self._after[0] == last_ts else set()
+            seen.update(entry_token(labels, line) for ts, labels, line in page if ts == last_ts)
+            self._after = (last_ts, seen)
+            self.scanned_to_ns = last_ts
+            if lines >= settings.LABEL_INDEX_MAX_LINES_PER_REFRESH:
+                break
+        if self._after is None:
+            self._after = (end_ns, set())
+        return added > 0
+
+    def _add_path(self, segments: list[str]) -> int:
+        if not segments or self.paths >= settings.LABEL_INDEX_MAX_PATHS:
+            return 0
+        node = self.root
+        trail = [node]
+        for segment in segments:
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = _Node(segment)
+            node = child
+            trail.append(node)
+        if node.children or node.tags:
+            return 0  # already known (or an intermediate node of a longer path)
+        for n in trail:
+            n.tags += 1
+        self.paths += 1
+        return 1
+
+    def _build_path_index(self) -> PrefixIndex:
+        # Every node is findable by its full path and by its own name
+        pairs: list[tuple[str, Any]] = []
+        stack = [(self.root, "")]
+        while stack:
+            node, path = stack.pop()
+            node.ordered = node.sorted_children()
+            for name, child in node.children.items():
+                child_path = f"{path}{PATH_SEPARATOR}{name}" if path else name
+                pairs.append((child_path, child_path))
+                pairs.append((name, child_path))
+                stack.append((child, child_path))
+        return PrefixIndex(pairs)
+
+    def _find(self, path: str) -> _Node | None:
+        node = self.root
+        for segment in (s.strip() for s in path.split(PATH_SEPARATOR)):
+            if not segment:
+                continue
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    # -- queries -------------------------------------------------------------
+
+    def label_values(self, name: str, prefix: str = "", limit: int = 100) -> list[str] | None:
+        index = self.values.get(name)
+        if index is None:
+            return None
+        return index.search(prefix, limit)
+
+    def autocomplete(self, prefix: str, limit: int = 20) -> dict[str, list[dict[str, Any]]]:
+        """Label values and hierarchy nodes starting with `prefix` (paths match by full path or name)."""
+        paths: list[dict[str, Any]] = []
+        seen: set[str] = set()
+        for path in self._path_index.search(prefix, limit * 2):
+            if path in seen:
+                continue
+            seen.add(path)
+            node = self._find(path)
+            paths.append({"path": path, "tags": node.tags if node else 0})
+            if len(paths) >= limit:
+                break
+        return {
+            "labels": [{"label": name, "value": value} for name, value in self._value_index.search(prefix, limit)],
+            "paths": paths,
+        }
+
+    def browse(self, path: str = "", limit: int = 500) -> dict[str, Any] | None:
+        """One hierarchy level: the node at `path` and its children (largest first)."""
+        node = self._find(path)
+        if node is None:
+            return None
+        base = PATH_SEPARATOR.join(s.strip() for s in path.split(PATH_SEPARATOR) if s.strip())
+        children = node.ordered if node.ordered is not None else node.sorted_children()
+        return {
+            "path": base,
+            "tags": node.tags,
+            "children": [
+                {
+                    "name": child.name,
+                    "path": f"{base}{PATH_SEPARATOR}{child.name}" if base else child.name,
+                    "tags": child.tags,
+                    "leaf": not child.children,
+                }
+                for child in children[:limit]
+            ],
+            "truncated": len(children) > limit,
+        }
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "labels": len(self.values),
+            "label_values": len(self._value_index),
+            "paths": self.paths,
+            "refreshed_at": self.refreshed_at,
+            "scanned_to_ns": str(self.scanned_to_ns) if self.scanned_to_ns else None,
+            "last_error": self.last_error,
+        }
+
+
+label_index = LabelIndex()
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from app.core.config import settings
+from app.core.loki import entry_token, loki_client
+
+logger = logging.getLogger(__name__)
+
+DROP_POLICIES = ("drop_oldest", "drop_newest", "disconnect")
+
+
+class TailCapacityError(Exception):
+    """No upstream tail slot left for a new selector."""
+
+
+class Subscriber:
+    """One client's bounded queue of tail entries.
+
+    When the queue is full, `policy` decides what gives: "drop_oldest"
+    keeps the newest entries (a live banner), "drop_newest" keeps the
+    backlog in order, and "disconnect" ends the subscription. Dropped
+    entries are counted and reported with the next batch.
+    """
+
+    def __init__(self, selector: str, policy: str, maxsize: int):
+        self.selector = selector
+        self.policy = policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+        self.delivered = 0
+        self.overflowed = False
+
+    def offer(self, item: dict[str, Any]) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+        if self.policy == "disconnect":
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)  # wakes the reader, which closes the connection
+            return
+        self.dropped += 1
+        if self.policy == "drop_oldest":
+            self.queue.get_nowait()
+            self.queue.put_nowait(item)
+
+    async def next_batch(self) -> list[dict[str, Any]] | None:
+        """Wait for entries and return everything queued, or None once overflowed."""
+        item = await self.queue.get()
+        batch = [item]
+        while item is not None and not self.queue.empty():
+            item = self.queue.get_nowait()
+            batch.append(item)
+        if batch[-1] is None:
+            return None
+        self.delivered += len(batch)
+        return batch
+
+    def take_dropped(self) -> int:
+        dropped, self.dropped = self.dropped, 0
+        return dropped
+
+
+class _Upstream:
+    """One Loki tail for a selector, shared by all its subscribers.
+
+    Reconnects with backoff, resuming from the newest timestamp seen. Only
+    the entries Loki replays right after a reconnect are deduplicated
+    against what was already delivered; once past the resume point every
+    entry is forwarded, including late ones older than it.
+    """
+
+    def __init__(self, selector: str):
+        self.selector = selector
+        self.subscribers: set[Subscriber] = set()
+        self.connected = False
+        self.entries = 0
+        self.loki_dropped = 0
+        self.reconnects = 0
+        self.started_at = time.time()
+        self._resume_ns = time.time_ns()  # live only: no replay of the past hour
+        self._seen: set[str] = set()  # entry tokens at _resume_ns
+        self.task = asyncio.create_task(self._run())
+
+    def _broadcast(self, item: dict[str, Any]) -> None:
+        for subscriber in list(self.subscribers):
+            subscriber.offer(item)
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            replaying = True
+            try:
+                async for entries, dropped in loki_client.tail(
+                    self.selector, self._resume_ns, settings.LIVE_TAIL_DELAY_SECONDS
+                ):
+                    if not self.connected:
+                        self.connected = True
+                        backoff = 1.0
+                        self._broadcast({"type": "status", "state": "connected"})
+                    self.loki_dropped += dropped
+                    for ts, labels, line in entries:
+                        token = entry_token(labels, line)
+                        if replaying:
+                            # Loki replays from _resume_ns after a (re)connect: skip
+                            # what was already delivered, until the first newer entry
+                            if ts < self._resume_ns or (ts == self._resume_ns and token in self._seen):
+                                continue
+                            replaying = ts == self._resume_ns
+                        if ts > self._resume_ns:
+                            self._resume_ns = ts
+                            self._seen.clear()
+                        if ts == self._resume_ns:
+                            self._seen.add(token)
+                        # Out-of-order entries older than the resume point are still forwarded
+                        self.entries += 1
+                        self._broadcast({"ts": str(ts), "labels": labels, "line": line})
+                error = "upstream closed"
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                error = str(exc) or type(exc).__name__
+            self.connected = False
+            self.reconnects += 1
+            logger.warning(f"Loki tail for {self.selector} lost ({error}), reconnecting in {backoff:.0f}s")
+            self._broadcast({"type": "status", "state": "reconnecting", "error": error})
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "selector": self.selector,
+            "connected": self.connected,
+            "subscribers": len(self.subscribers),
+            "entries": self.entries,
+            "loki_dropped": self.loki_dropped,
+            "client_dropped": sum(s.dropped for s in self.subscribers),
+            "reconnects": self.reconnects,
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+        }
+
+
+class LiveTailHub:
+    """Fans Loki live tails out to many clients.
+
+    The first subscriber of a selector opens its upstream tail; the last
+    one to leave closes it. At most LIVE_TAIL_MAX_SELECTORS upstreams run
+    at once, since Loki limits concurrent tail requests.
+    """
+
+    def __init__(self):
+        self._upstreams: dict[str, _Upstream] = {}
+
+    def subscribe(self, selector: str, policy: str = "drop_oldest") -> Subscriber:
+        key = selector.strip()
+        upstream = self._upstreams.get(key)
+        if upstream is None:
+            if len(self._upstreams) >= settings.LIVE_TAIL_MAX_SELECTORS:
+                raise TailCapacityError(
+                    f"{len(self._upstreams)} live selectors already open; subscribe to an existing one"
+                )
+            upstream = self._upstreams[key] = _Upstream(key)
+        subscriber = Subscriber(key, policy, settings.LIVE_TAIL_QUEUE_SIZE)
+        upstream.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        upstream = self._upstreams.get(subscriber.selector)
+        if upstream is None:
+            return
+        upstream.subscribers.discard(subscriber)
+        if not upstream.subscribers:
+            upstream.task.cancel()
+            del self._upstreams[subscriber.selector]
+
+    async def close(self) -> None:
+        tasks = [upstream.task for upstream in self._upstreams.values()]
+        self._upstreams.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_selectors": settings.LIVE_TAIL_MAX_SELECTORS,
+            "queue_size": settings.LIVE_TAIL_QUEUE_SIZE,
+            "upstreams": [upstream.stats() for upstream in self._upstreams.values()],
+        }
+
+
+live_tail = LiveTailHub()
@@ -1,15 +1,170 @@
+import asyncio
+import hashlib
 import json
 import time
-from typing import Any
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator
+from urllib.parse import urlencode
 
 import httpx
+from websockets.asyncio.client import connect as ws_connect
 
 from app.core.config import settings
 
 
+# Loki's default max_entries_limit_per_query
+MAX_QUERY_LIMIT = 5000
+
+
+def to_seconds(value: str | int | float) -> float:
+    """Parse a Loki time parameter (RFC3339, unix seconds or unix nanoseconds)."""
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        try:
+            number = float(value)
+        except ValueError:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    # Loki also accepts nanosecond epochs; seconds will not reach 1e14 for a long time
+    return number / 1e9 if number > 1e14 else number
+
+
+def to_ns(value: str | int | float) -> int:
+    """Parse a Loki time parameter to integer nanoseconds (exact for ns input)."""
+    if isinstance(value, str) and value.isdigit() and int(value) > 10**14:
+        return int(value)
+    return int(round(to_seconds(value) * 1e9))
+
+
+def is_log_query(query: str) -> bool:
+    """Log (stream) queries start with a stream selector; metric queries with a function."""
+    return query.lstrip().startswith("{")
+
+
+def entry_token(labels: dict[str, str], line: str) -> str:
+    """Short identity of a log entry, to tell apart entries sharing a timestamp."""
+    raw = json.dumps([sorted(labels.items()), line], separators=(",", ":"))
+    return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+
+def _series_key(labels: dict[str, str]) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def merge_matrices(parts: list[list[dict]]) -> list[dict]:
+    """Concatenate matrix series from consecutive shards, by label set, in order."""
+    merged: dict[tuple, dict] = {}
+    for part in parts:
+        for series in part:
+            metric = series.get("metric", {})
+            entry = merged.setdefault(_series_key(metric), {"metric": metric, "values": []})
+            entry["values"].extend(series.get("values", []))
+    return list(merged.values())
+
+
+class StepResultCache:
+    """LRU cache of metric query results per (query, step, interval).
+
+    Each entry holds the series of one fixed, step-aligned interval as
+    [(metric labels, values)]. Size is bounded by the total number of
+    samples held.
+    """
+
+    def __init__(self, max_samples: int):
+        self.max_samples = max_samples
+        self._entries: OrderedDict[tuple[str, int, int], list[tuple[dict, list]]] = OrderedDict()
+        self._sizes: dict[tuple[str, int, int], int] = {}
+        self.samples = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, int, int]) -> list[tuple[dict, list]] | None:
+        series = self._entries.get(key)
+        if series is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return series
+
+    def put(self, key: tuple[str, int, int], series: list[tuple[dict, list]]) -> None:
+        size = max(1, sum(len(values) for _, values in series))
+        if size > self.max_samples:
+            return
+        if key in self._entries:
+            self.samples -= self._sizes.pop(key)
+            del self._entries[key]
+        self._entries[key] = series
+        self._sizes[key] = size
+        self.samples += size
+        while self.samples > self.max_samples:
+            old, _ = self._entries.popitem(last=False)
+            self.samples -= self._sizes.pop(old)
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "name": "loki_step_results",
+            "entries": len(self._entries),
+            "samples": self.samples,
+            "max_samples": self.max_samples,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
 class LokiClient:
     def __init__(self, base_url: str | None = None):
         self.base_url = (base_url or settings.LOKI_URL).rstrip("/")
+        self.result_cache = StepResultCache(settings.LOKI_RESULT_CACHE_MAX_SAMPLES)
+        self._client: httpx.AsyncClient | None = None
+        self._slots: asyncio.Semaphore | None = None
+
+    def _http(self) -> httpx.AsyncClient:
+        """Shared query client; at most LOKI_MAX_PARALLEL_QUERIES requests in flight."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=settings.LOKI_QUERY_TIMEOUT_SECONDS)
+            self._slots = asyncio.Semaphore(max(1, settings.LOKI_MAX_PARALLEL_QUERIES))
+        return self._client
+
+    async def _get_json(self, path: str, params: dict[str, Any]) -> dict[str, Any]:
+        client = self._http()
+        async with self._slots:
+            resp = await client.get(f"{self.base_url}{path}", params=params)
+            resp.raise_for_status()
+            return resp.json()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def tail(
+        self, query: str, start_ns: int | None = None, delay_for: int = 0
+    ) -> AsyncIterator[tuple[list[tuple[int, dict, str]], int]]:
+        """Follow a log query over Loki's tail WebSocket.
+
+        Yields (entries, dropped) per message: entries as (ns, labels, line)
+        in timestamp order, and the number of entries Loki itself dropped
+        because this tail fell behind. Ends (or raises) when the connection
+        closes; the caller decides whether to reconnect.
+        """
+        params: dict[str, Any] = {"query": query, "limit": MAX_QUERY_LIMIT, "delay_for": delay_for}
+        if start_ns is not None:
+            params["start"] = start_ns
+        url = f"{self.base_url.replace('http', 'ws', 1)}/loki/api/v1/tail?{urlencode(params)}"
+        async with ws_connect(url, open_timeout=settings.LOKI_QUERY_TIMEOUT_SECONDS, max_size=None) as ws:
+            async for message in ws:
+                data = json.loads(message)
+                entries = [
+                    (int(ts), stream.get("stream", {}), line)
+                    for stream in data.get("streams") or []
+                    for ts, line in stream.get("values", [])
+                ]
+                entries.sort(key=lambda e: e[0])
+                yield entries, len(data.get("dropped_entries") or [])
 
     async def push(self, labels: dict[str, str], message: str, metadata: dict | None = None, timestamp_ns: int | None = None) -> bool:
         ts = timestamp_ns or int(time.time() * 1_000_000_000)
@@ -35,21 +190,132 @@ class LokiClient:
             )
             return resp.status_code == 204
 
-    async def query(self, query: str, limit: int = 100, start: str | None = None, end: str | None = None) -> dict[str, Any]:
-        params: dict[str, Any] = {"query": query, "limit": limit}
-        if start:
-            params["start"] = start
-        if end:
-            params["end"] = end
+    async def query(
+        self,
+        query: str,
+        limit: int = 100,
+        start: str | None = None,
+        end: str | None = None,
+        direction: str = "backward",
+    ) -> dict[str, Any]:
+        """Run a LogQL range query.
+
+        Log queries over more than LOKI_SHARD_SECONDS are split into
+        shards run concurrently (bounded by LOKI_MAX_PARALLEL_QUERIES),
+        nearest shards first in the query direction. Shards are started in
+        waves and no further waves run once `limit` entries are collected;
+        the merged entries are ordered by time, truncated to `limit` and
+        regrouped into streams. Metric queries are passed through as-is.
+        """
+        if not is_log_query(query):
+            params: dict[str, Any] = {"query": query, "limit": limit, "direction": direction}
+            if start:
+                params["start"] = start
+            if end:
+                params["end"] = end
+            return await self._get_json("/loki/api/v1/query_range", params)
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/loki/api/v1/query_range",
-                params=params,
-                timeout=30.0,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        end_ns = to_ns(end) if end else time.time_ns()
+        start_ns = to_ns(start) if start else end_ns - 3600 * 10**9
+        shard_ns = max(1, settings.LOKI_SHARD_SECONDS) * 10**9
+        shards = [(lo, min(end_ns, lo + shard_ns)) for lo in range(start_ns, end_ns, shard_ns)] or [(start_ns, end_ns)]
+        if direction == "backward":
+            shards.reverse()
+
+        entries: list[tuple[int, dict, str]] = []
+        wave = max(1, settings.LOKI_MAX_PARALLEL_QUERIES)
+        for i in range(0, len(shards), wave):
+            results = await asyncio.gather(*(
+                self._query_entries(query, limit, lo, hi, direction) for lo, hi in shards[i:i + wave]
+            ))
+            for shard_entries in results:
+                entries.extend(shard_entries)
+            if len(entries) >= limit:
+                break
+        entries = entries[:limit]
+
+        streams: dict[tuple, dict] = {}
+        for ts, labels, line in entries:
+            stream = streams.setdefault(_series_key(labels), {"stream": labels, "values": []})
+            stream["values"].append([str(ts), line])
+        return {"status": "success", "data": {"resultType": "streams", "result": list(streams.values())}}
+
+    async def _query_entries(
+        self, query: str, limit: int, start_ns: int, end_ns: int, direction: str
+    ) -> list[tuple[int, dict, str]]:
+        """Entries of one shard [start_ns, end_ns), flattened and ordered by `direction`."""
+        body = await self._get_json("/loki/api/v1/query_range", {
+            "query": query,
+            "limit": limit,
+            "start": start_ns,
+            "end": end_ns,
+            "direction": direction,
+        })
+        entries = [
+            (int(ts), stream.get("stream", {}), line)
+            for stream in body.get("data", {}).get("result", [])
+            for ts, line in stream.get("values", [])
+        ]
+        entries.sort(key=lambda e: e[0], reverse=direction == "backward")
+        return entries[:limit]
+
+    async def iter_entries(
+        self,
+        query: str,
+        start_ns: int,
+        end_ns: int,
+        direction: str = "backward",
+        page_size: int = 1000,
+        after: tuple[int, set[str]] | None = None,
+    ) -> AsyncIterator[list[tuple[int, dict, str]]]:
+        """Page through a log query in [start_ns, end_ns), yielding one page at a time.
+
+        Each page restarts at the last timestamp seen (inclusive) and skips
+        entries already yielded there, identified by entry_token, so
+        entries sharing a timestamp are neither lost nor repeated. `after`
+        resumes from (timestamp, tokens) of a previous run.
+        """
+        last_ts, seen = after if after else (None, set())
+        size = page_size
+        while start_ns < end_ns:
+            if last_ts is not None:
+                if direction == "backward":
+                    end_ns = last_ts + 1
+                else:
+                    start_ns = last_ts
+            page = await self._query_entries(query, size, start_ns, end_ns, direction)
+            fresh = []
+            for ts, labels, line in page:
+                if ts == last_ts:
+                    token = entry_token(labels, line)
+                    if token in seen:
+                        continue
+                    seen.add(token)
+                else:
+                    last_ts, seen = ts, {entry_token(labels, line)}
+                fresh.append((ts, labels, line))
+            if fresh:
+                size = page_size
+                yield fresh
+            if len(page) < size:
+                return
+            if not fresh:
+                # A full page of already-seen entries at one timestamp: widen
+                # the page to get past them, or step past the timestamp
+                if size < MAX_QUERY_LIMIT:
+                    size = min(size * 2, MAX_QUERY_LIMIT)
+                else:
+                    last_ts, seen = (last_ts - 1, set()) if direction == "backward" else (last_ts + 1, set())
+
+    async def labels(self, start_ns: int, end_ns: int) -> list[str]:
+        """Label names seen in [start_ns, end_ns]."""
+        data = await self._get_json("/loki/api/v1/labels", {"start": start_ns, "end": end_ns})
+        return data.get("data") or []
+
+    async def label_values(self, name: str, start_ns: int, end_ns: int) -> list[str]:
+        """Values of one label seen in [start_ns, end_ns]."""
+        data = await self._get_json(f"/loki/api/v1/label/{name}/values", {"start": start_ns, "end": end_ns})
+        return data.get("data") or []
 
     async def query_instant(self, query: str, limit: int = 100) -> dict[str, Any]:
         async with httpx.AsyncClient() as client:
@@ -64,19 +330,83 @@ class LokiClient:
     async def query_metric(
         self,
         query: str,
-        start: str,
-        end: str,
+        start: str | int | float,
+        end: str | int | float,
         step: int = 3600,
     ) -> dict[str, Any]:
-        """Execute a LogQL metric query returning a matrix (time-series) result."""
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/loki/api/v1/query_range",
-                params={"query": query, "start": start, "end": end, "step": step},
-                timeout=30.0,
-            )
-            resp.raise_for_status()
-            return resp.json()
+        """Execute a LogQL metric query returning a matrix (time-series) result.
+
+        The range is aligned to `step` and split into fixed intervals of
+        whole steps. Intervals whose last evaluation is older than
+        LOKI_CACHE_FRESHNESS_SECONDS cannot change any more and are served
+        from the result cache; only the missing intervals (usually just the
+        head of the range) are queried, one request per consecutive run.
+        """
+        step = max(1, int(step))
+        first = int(to_seconds(start)) // step * step
+        last = int(to_seconds(end)) // step * step
+        interval = max(1, settings.LOKI_CACHE_INTERVAL_SECONDS // step) * step
+        cacheable_until = time.time() - settings.LOKI_CACHE_FRESHNESS_SECONDS
+
+        # Interval boundaries are multiples of `interval`, so they repeat
+        # across requests with different ranges
+        bounds = []
+        lo = first
+        while lo <= last:
+            hi = min(last + step, (lo // interval + 1) * interval)
+            bounds.append((lo, hi))
+            lo = hi
+
+        parts: list[list[tuple[dict, list]] | None] = []
+        for lo, hi in bounds:
+            whole = lo % interval == 0 and hi % interval == 0
+            parts.append(self.result_cache.get((query, step, lo)) if whole else None)
+
+        i = 0
+        while i < len(bounds):
+            if parts[i] is not None:
+                i += 1
+                continue
+            j = i
+            while j + 1 < len(bounds) and parts[j + 1] is None:
+                j += 1
+            data = await self._query_range_matrix(query, bounds[i][0], bounds[j][1] - step, step)
+            if data.get("resultType") != "matrix":
+                # Not a metric query; nothing to cache
+                return {"status": "success", "data": data}
+            for k in range(i, j + 1):
+                lo, hi = bounds[k]
+                series = [
+                    (s.get("metric", {}), [v for v in s.get("values", []) if lo <= float(v[0]) < hi])
+                    for s in data.get("result", [])
+                ]
+                parts[k] = [(metric, values) for metric, values in series if values]
+                if lo % interval == 0 and hi % interval == 0 and hi - step <= cacheable_until:
+                    self.result_cache.put((query, step, lo), parts[k])
+            i = j + 1
+
+        return {
+            "status": "success",
+            "data": {
+                "resultType": "matrix",
+                "result": merge_matrices([
+                    [{"metric": metric, "values": values} for metric, values in part or []] for part in parts
+                ]),
+            },
+        }
+
+    async def _query_range_matrix(self, query: str, start: int, end: int, step: int) -> dict[str, Any]:
+        """Evaluate at start, start+step, ..., end; split into concurrent shards of whole steps."""
+        span = max(1, settings.LOKI_SHARD_SECONDS // step) * step
+        shards = [(lo, min(end, lo + span - step)) for lo in range(start, end + 1, span)]
+        bodies = await asyncio.gather(*(
+            self._get_json("/loki/api/v1/query_range", {"query": query, "start": lo, "end": hi, "step": step})
+            for lo, hi in shards
+        ))
+        datas = [body.get("data", {}) for body in bodies]
+        if len(datas) == 1 or any(d.get("resultType") != "matrix" for d in datas):
+            return datas[0]
+        return {"resultType": "matrix", "result": merge_matrices([d.get("result", []) for d in datas])}
 
     async def ready(self) -> bool:
         try:
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def merge_patch(old: Any, new: Any) -> Any:
+    """JSON merge patch (RFC 7386) turning `old` into `new`, or _MISSING if equal.
+
+    Objects are diffed key by key (removed keys become null); anything
+    else, lists included, is replaced whole.
+    """
+    if old == new:
+        return _MISSING
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return new
+    patch = {key: None for key in old if key not in new}
+    for key, value in new.items():
+        change = merge_patch(old.get(key, _MISSING), value) if key in old else value
+        if change is not _MISSING:
+            patch[key] = change
+    return patch
+
+
+def _event(event: str, version: int, data: Any) -> str:
+    return f"event: {event}\nid: {version}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+
+class SnapshotPublisher:
+    """Computes one snapshot for all subscribers and pushes changes as SSE.
+
+    While anyone is subscribed, a single task recomputes the snapshot every
+    `interval` seconds, or sooner (but at most every `min_interval`) when
+    a Postgres NOTIFY arrives on `channel`. Subscribers get the full
+    snapshot on connect, then merge-patch deltas. A subscriber that missed
+    a version (slow connection) gets a full snapshot instead, so nothing
+    is queued per client. The task stops when the last subscriber leaves.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        compute: Callable[[], Awaitable[dict[str, Any]]],
+        interval: float,
+        min_interval: float,
+        channel: str = "",
+    ):
+        self.name = name
+        self.compute = compute
+        self.interval = interval
+        self.min_interval = min_interval
+        self.channel = channel
+        self.version = 0
+        self.snapshot: dict[str, Any] | None = None
+        self.delta: Any = None  # patch from version - 1 to version
+        self.subscribers = 0
+        self.computes = 0
+        self.notifications = 0
+        self._changed = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def _publish(self, snapshot: dict[str, Any]) -> None:
+        self.delta = merge_patch(self.snapshot, snapshot) if self.snapshot is not None else snapshot
+        self.snapshot = snapshot
+        self.version += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _on_notify(self, *_args) -> None:
+        self.notifications += 1
+        self._wake.set()
+
+    async def _run(self) -> None:
+        listener = None
+        try:
+            if self.channel:
+                try:
+                    url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+                    listener = await asyncpg.connect(url.render_as_string(hide_password=False))
+                    await listener.add_listener(self.channel, self._on_notify)
+                except Exception as exc:
+                    # Interval updates still work without ingestion notifications
+                    logger.warning(f"{self.name}: cannot listen on {self.channel} ({exc}), interval updates only")
+                    listener = None
+            while True:
+                started = time.monotonic()
+                self._wake.clear()
+                try:
+                    self._publish(await self.compute())
+                    self.computes += 1
+                except Exception:
+                    logger.exception(f"{self.name}: computing snapshot failed")
+                await asyncio.sleep(max(0.0, self.min_interval - (time.monotonic() - started)))
+                try:
+                    await asyncio.wait_for(
+                        self._wake.wait(), max(0.0, self.interval - (time.monotonic() - started))
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if listener is not None:
+                await listener.close()
+
+    async def stream(self) -> AsyncIterator[str]:
+        """SSE event stream for one subscriber: snapshot, then deltas, with keep-alives."""
+        self.subscribers += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        try:
+            version = 0
+            while True:
+                if self.snapshot is None or self.version == version:
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), settings.DASHBOARD_KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"
+                    continue
+                if version and self.version == version + 1:
+                    if self.delta is not _MISSING:
+                        yield _event("delta", self.version, self.delta)
+                else:
+                    yield _event("snapshot", self.version, self.snapshot)
+                version = self.version
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0 and self._task is not None:
+                self._task.cancel()
+                self._task = None
+                # The next subscriber starts from a fresh computation
+                self.snapshot, self.delta = None, None
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "subscribers": self.subscribers,
+            "version": self.version,
+            "computes": self.computes,
+            "notifications": self.notifications,
+            "interval_seconds": self.interval,
+            "min_interval_seconds": self.min_interval,
+            "channel": self.channel or None,
+        }
@@ -3,9 +3,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from sqlalchemy import select
 
+from app.api.metrics import overview_publisher
 from app.api.router import api_router
 from app.core.config import settings
 from app.core.database import async_session
+from app.core.export import export_manager
+from app.core.labels import label_index
+from app.core.live import live_tail
+from app.core.loki import loki_client
 from app.core.security import get_password_hash
 from app.models.user import User
 
@@ -27,7 +32,13 @@ async def create_admin_user():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await create_admin_user()
+    label_index.start()
     yield
+    await label_index.close()
+    await overview_publisher.close()
+    await live_tail.close()
+    await export_manager.close()
+    await loki_client.close()
 
 
 app = FastAPI(
@@ -1,4 +1,6 @@
 from app.models.user import User
 from app.models.connector import Connector
+from app.models.isa182 import ActiveAlarm, AlarmLifecycle, FloodEpisode, ISA182Report
+from app.models.rollup import AlarmCount10m, AlarmCount1h
 
-__all__ = ["User", "Connector"]
+__all__ = ["User", "Connector", "FloodEpisode", "ActiveAlarm", "AlarmLifecycle", "ISA182Report", "AlarmCount10m", "AlarmCount1h"]
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import String, Integer, DateTime, Float, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class FloodEpisode(Base):
+    """Alarm flood episode written by the signal-service flood detector."""
+
+    __tablename__ = "flood_episodes"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    scope: Mapped[str] = mapped_column(String(255), nullable=False)  # area name or "plant"
+    area: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)  # NULL while in flood
+    alarm_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    peak_rate: Mapped[int] = mapped_column(Integer, nullable=False, default=0)  # alarms per 10 minutes
+    top_sources: Mapped[list] = mapped_column(JSON, nullable=False, default=list)  # [{source, count}]
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class ActiveAlarm(Base):
+    """Alarm instance state maintained by signal-service ingestion."""
+
+    __tablename__ = "active_alarms"
+
+    connector_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    event_id: Mapped[str] = mapped_column(String(255), primary_key=True)  # vendor event id, else equipment/alarm
+    area: Mapped[str] = mapped_column(String(255), nullable=False, default="unknown")
+    equipment: Mapped[str] = mapped_column(String(255), nullable=False, default="unknown")
+    alarm_type: Mapped[str] = mapped_column(String(255), nullable=False, default="generic")
+    isa_priority: Mapped[str] = mapped_column(String(20), nullable=False, default="low")
+    activated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    acked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    cleared_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class AlarmLifecycle(Base):
+    """Completed alarm instance written by the signal-service lifecycle assembler."""
+
+    __tablename__ = "alarm_lifecycles"
+
+    connector_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    event_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    activated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    source: Mapped[str] = mapped_column(String(512), nullable=False)  # equipment/alarm_type
+    area: Mapped[str] = mapped_column(String(255), nullable=False, default="unknown")
+    isa_priority: Mapped[str] = mapped_column(String(20), nullable=False, default="low")
+    acked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    cleared_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    time_to_ack: Mapped[float | None] = mapped_column(Float, nullable=True)  # seconds
+    time_to_clear: Mapped[float | None] = mapped_column(Float, nullable=True)
+    outcome: Mapped[str] = mapped_column(String(20), nullable=False)  # cleared, superseded, timed_out
+
+
+class ISA182Report(Base):
+    """Latest result of one periodic signal-service ISA-18.2 analysis."""
+
+    __tablename__ = "isa182_reports"
+
+    kind: Mapped[str] = mapped_column(String(50), primary_key=True)
+    window_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    window_end: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    result: Mapped[Any] = mapped_column(JSON, nullable=False, default=dict)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.core.database import Base
+
+
+class _AlarmCountColumns:
+    """Alarm event counts per bucket and label dimension (written by the signal-service)."""
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    connector_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    area: Mapped[str] = mapped_column(String(255), primary_key=True)
+    isa_priority: Mapped[str] = mapped_column(String(20), primary_key=True)
+    severity: Mapped[str] = mapped_column(String(50), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(20), primary_key=True)  # active, ack, clear
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+
+class AlarmCount10m(_AlarmCountColumns, Base):
+    __tablename__ = "alarm_counts_10m"
+
+
+class AlarmCount1h(_AlarmCountColumns, Base):
+    __tablename__ = "alarm_counts_1h"
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class ExportCreate(BaseModel):
+    query: str = '{job="signalforge"}'
+    start: str = Field(description="Start time (RFC3339 or Unix timestamp)")
+    end: str | None = Field(default=None, description="End time (RFC3339 or Unix timestamp), default now")
+    format: str = Field(default="csv", pattern="^(csv|parquet)$")
+
+
+class ExportJobResponse(BaseModel):
+    id: str
+    query: str
+    start: datetime
+    end: datetime
+    format: str
+    status: str  # queued, running, completed, failed, cancelled
+    rows: int
+    progress: float  # fraction of the time range processed
+    rows_per_second: float | None = None
+    size_bytes: int
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class FloodEpisodeResponse(BaseModel):
+    id: str
+    scope: str
+    area: str | None = None
+    started_at: datetime
+    ended_at: datetime | None = None
+    duration_seconds: float | None = None
+    alarm_count: int
+    peak_rate: int
+    top_sources: list[dict] = []
+
+    model_config = {"from_attributes": True}
+
+
+class ActiveAlarmResponse(BaseModel):
+    connector_id: str
+    event_id: str
+    area: str
+    equipment: str
+    alarm_type: str
+    isa_priority: str
+    state: str  # active, acked
+    activated_at: datetime
+    acked_at: datetime | None = None
+    standing_seconds: float
+
+
+class ActiveAlarmList(BaseModel):
+    total: int
+    by_priority: dict[str, int]
+    alarms: list[ActiveAlarmResponse]
+
+
+class DurationStats(BaseModel):
+    """Seconds from activation; percentiles are omitted when count is 0."""
+
+    count: int
+    mean: float | None = None
+    p50: float | None = None
+    p90: float | None = None
+    p99: float | None = None
+    max: float | None = None
+
+
+class LifecycleStats(BaseModel):
+    time_to_ack: DurationStats
+    time_to_clear: DurationStats
+
+
+class SourceLifecycleStats(LifecycleStats):
+    source: str
+    area: str
+
+
+class LifecycleSummary(BaseModel):
+    start: datetime
+    end: datetime
+    outcomes: dict[str, int]
+    plant: LifecycleStats
+    areas: dict[str, LifecycleStats]
+    sources: list[SourceLifecycleStats]  # slowest to acknowledge (p90) first
+
+
+class AlarmLifecycleResponse(BaseModel):
+    connector_id: str
+    event_id: str
+    source: str
+    area: str
+    isa_priority: str
+    activated_at: datetime
+    acked_at: datetime | None = None
+    cleared_at: datetime | None = None
+    time_to_ack: float | None = None
+    time_to_clear: float | None = None
+    outcome: str
+
+    model_config = {"from_attributes": True}
+
+
+class ISA182ReportResponse(BaseModel):
+    kind: str
+    window_start: datetime
+    window_end: datetime
+    computed_at: datetime
+    result: Any
+
+    model_config = {"from_attributes": True}
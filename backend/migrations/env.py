@@ -7,7 +7,9 @@ from sqlalchemy.ext.asyncio import create_async_engine
 
 from app.core.config import settings
 from app.core.database import Base
-from app.models import User, Connector  # noqa: F401
+from app.models import (  # noqa: F401
+    User, Connector, FloodEpisode, ActiveAlarm, AlarmLifecycle, ISA182Report, AlarmCount10m, AlarmCount1h,
+)
 
 config = context.config
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
@@ -0,0 +1,37 @@
+"""Create connector_cursors table for incremental connector reads.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19
+
+Connectors that read a vendor history without deleting source rows
+(FactoryTalk AllEvent, file-based archives) persist their high-water mark
+here so a restart resumes where the last successful Loki push left off.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "connector_cursors",
+        sa.Column(
+            "connector_id",
+            sa.String(36),
+            sa.ForeignKey("connectors.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("cursor", sa.JSON(), nullable=False, server_default="{}"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("connector_cursors")
@@ -0,0 +1,40 @@
+"""Create flood_episodes table for persisted alarm flood detection.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+
+The signal-service flood detector runs inline on ingestion and upserts each
+episode here (open episodes have ended_at NULL) so the dashboard can list
+floods without re-scanning Loki.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "flood_episodes",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("scope", sa.String(255), nullable=False),
+        sa.Column("area", sa.String(255), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("ended_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("alarm_count", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("peak_rate", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("top_sources", sa.JSON(), nullable=False, server_default="[]"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("idx_flood_episodes_started_at", "flood_episodes", ["started_at"])
+    op.create_index("idx_flood_episodes_scope_started_at", "flood_episodes", ["scope", "started_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("flood_episodes")
@@ -0,0 +1,53 @@
+"""Create active_alarms state table.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+
+One row per alarm instance with its activation, acknowledge and clear
+times, maintained by signal-service ingestion with batched upserts. Lets
+the API list standing and stale alarms without scanning Loki history.
+Cleared rows are pruned after ACTIVE_ALARM_RETENTION_HOURS.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "active_alarms",
+        sa.Column(
+            "connector_id",
+            sa.String(36),
+            sa.ForeignKey("connectors.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("event_id", sa.String(255), primary_key=True),
+        sa.Column("area", sa.String(255), nullable=False, server_default="unknown"),
+        sa.Column("equipment", sa.String(255), nullable=False, server_default="unknown"),
+        sa.Column("alarm_type", sa.String(255), nullable=False, server_default="generic"),
+        sa.Column("isa_priority", sa.String(20), nullable=False, server_default="low"),
+        sa.Column("activated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("acked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("cleared_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    # Standing alarms: the hot query for the active/stale endpoints
+    op.create_index(
+        "idx_active_alarms_standing",
+        "active_alarms",
+        ["activated_at"],
+        postgresql_where=sa.text("cleared_at IS NULL AND activated_at IS NOT NULL"),
+    )
+    op.create_index("idx_active_alarms_cleared_at", "active_alarms", ["cleared_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("active_alarms")
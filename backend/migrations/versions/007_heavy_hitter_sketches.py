@@ -0,0 +1,33 @@
+"""Create heavy_hitter_sketches table for bad-actor ranking.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+
+One mergeable Space-Saving summary of alarm activations per source per
+hour, maintained by signal-service ingestion. Bad-actor rankings for any
+range merge the hourly summaries instead of running topk over Loki.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "heavy_hitter_sketches",
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("total", sa.BigInteger, nullable=False, server_default=sa.text("0")),
+        sa.Column("sketch", sa.JSON(), nullable=False, server_default="{}"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("heavy_hitter_sketches")
@@ -0,0 +1,42 @@
+"""Create alarm count rollup tables.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+
+10-minute and hourly event counts per connector, area, ISA priority,
+severity and event type, maintained by signal-service ingestion. The
+dashboard overview and the ISA-18.2 rate KPIs read these instead of
+aggregating raw logs in Loki; `python -m analyzers.rollups` rebuilds a
+range from Loki.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("alarm_counts_10m", "alarm_counts_1h")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.create_table(
+            table,
+            sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+            sa.Column("connector_id", sa.String(36), primary_key=True),
+            sa.Column("area", sa.String(255), primary_key=True),
+            sa.Column("isa_priority", sa.String(20), primary_key=True),
+            sa.Column("severity", sa.String(50), primary_key=True),
+            sa.Column("event_type", sa.String(20), primary_key=True),
+            sa.Column("count", sa.BigInteger, nullable=False, server_default=sa.text("0")),
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_table(table)
@@ -0,0 +1,47 @@
+"""Create incremental ISA-18.2 analysis tables.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+
+- analysis_watermarks: per-KPI end of the last processed hour
+- analysis_dirty_hours: closed hours that received late events and must
+  be recomputed by the next analysis run
+- isa182_hourly_kpis: stored per-hour alarm rate aggregates per area and
+  plant-wide, merged incrementally by the hourly analysis job
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analysis_watermarks",
+        sa.Column("kpi", sa.String(100), primary_key=True),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        "analysis_dirty_hours",
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+    )
+    op.create_table(
+        "isa182_hourly_kpis",
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("scope", sa.String(255), primary_key=True),
+        sa.Column("alarm_count", sa.Integer, nullable=False, server_default=sa.text("0")),
+        sa.Column("peak_10min", sa.Integer, nullable=False, server_default=sa.text("0")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("isa182_hourly_kpis")
+    op.drop_table("analysis_dirty_hours")
+    op.drop_table("analysis_watermarks")
@@ -0,0 +1,60 @@
+"""Create alarm_lifecycles and isa182_reports tables.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-19
+
+- alarm_lifecycles: one row per completed alarm instance with its time to
+  acknowledge and time to clear, written by the signal-service lifecycle
+  assembler on every ingestion cycle. The API computes percentiles for
+  any range from it.
+- isa182_reports: latest result of each periodic ISA-18.2 analysis (alarm
+  rate, bad actors, priority distribution, correlation groups), replaced
+  by every run of the analysis job.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "alarm_lifecycles",
+        sa.Column(
+            "connector_id",
+            sa.String(36),
+            sa.ForeignKey("connectors.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("event_id", sa.String(255), primary_key=True),
+        sa.Column("activated_at", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("source", sa.String(512), nullable=False),
+        sa.Column("area", sa.String(255), nullable=False, server_default="unknown"),
+        sa.Column("isa_priority", sa.String(20), nullable=False, server_default="low"),
+        sa.Column("acked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("cleared_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("time_to_ack", sa.Float, nullable=True),
+        sa.Column("time_to_clear", sa.Float, nullable=True),
+        sa.Column("outcome", sa.String(20), nullable=False),
+    )
+    # Range queries select by activation time
+    op.create_index("idx_alarm_lifecycles_activated_at", "alarm_lifecycles", ["activated_at"])
+    op.create_table(
+        "isa182_reports",
+        sa.Column("kind", sa.String(50), primary_key=True),
+        sa.Column("window_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("window_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=False, server_default="{}"),
+        sa.Column("computed_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("isa182_reports")
+    op.drop_table("alarm_lifecycles")
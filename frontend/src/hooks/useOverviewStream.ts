@@ -0,0 +1,51 @@
+import { useEffect, useState } from 'react'
+import { useQueryClient } from '@tanstack/react-query'
+import { metricsApi, type MetricsOverview } from '../lib/api'
+
+type Json = unknown
+
+// JSON merge patch (RFC 7386): objects merge key by key, null deletes, anything else replaces
+function applyMergePatch(target: Json, patch: Json): Json {
+  if (patch === null || typeof patch !== 'object' || Array.isArray(patch)) return patch
+  const result: Record<string, Json> =
+    target !== null && typeof target === 'object' && !Array.isArray(target) ? { ...(target as Record<string, Json>) } : {}
+  for (const [key, value] of Object.entries(patch as Record<string, Json>)) {
+    if (value === null) delete result[key]
+    else result[key] = applyMergePatch(result[key], value)
+  }
+  return result
+}
+
+/**
+ * Keeps the ['metrics-overview'] query up to date from the server-sent
+ * overview stream. Returns whether the stream is connected, so callers
+ * can fall back to polling while it is not.
+ */
+export function useOverviewStream() {
+  const queryClient = useQueryClient()
+  const [connected, setConnected] = useState(false)
+
+  useEffect(() => {
+    const source = new EventSource(metricsApi.streamUrl())
+
+    source.onopen = () => setConnected(true)
+    source.onerror = () => setConnected(false) // EventSource reconnects on its own
+
+    source.addEventListener('snapshot', (e) => {
+      queryClient.setQueryData<MetricsOverview>(['metrics-overview'], JSON.parse((e as MessageEvent).data))
+    })
+    source.addEventListener('delta', (e) => {
+      const patch = JSON.parse((e as MessageEvent).data)
+      queryClient.setQueryData<MetricsOverview>(['metrics-overview'], (old) =>
+        old ? (applyMergePatch(old, patch) as MetricsOverview) : old,
+      )
+    })
+
+    return () => {
+      source.close()
+      setConnected(false)
+    }
+  }, [queryClient])
+
+  return connected
+}
@@ -65,6 +65,10 @@ export const healthApi = {
 // Metrics
 export const metricsApi = {
   overview: () => api.get<MetricsOverview>('/metrics/overview'),
+  queryRange: (query: string, params: { start?: string; end?: string; step?: number } = {}) =>
+    api.get<MatrixResult>('/metrics/query_range', { params: { query, ...params } }),
+  // EventSource cannot send the Authorization header
+  streamUrl: () => `/api/metrics/stream?token=${encodeURIComponent(localStorage.getItem('token') ?? '')}`,
 }
 
 // Transform
@@ -211,7 +215,16 @@ export interface TransformConfig {
   export_enabled: boolean
 }
 
+export interface MatrixResult {
+  status: string
+  data: {
+    resultType: 'matrix'
+    result: { metric: Record<string, string>; values: [number, string][] }[]
+  }
+}
+
 export interface MetricsOverview {
+  generated_at: number
   alarm_rate: { time: number; count: number }[]
   by_severity: { severity: string; count: number }[]
   totals: { last_1h: number; last_24h: number }
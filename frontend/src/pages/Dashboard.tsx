@@ -1,6 +1,7 @@
 import { useQuery } from '@tanstack/react-query'
 import { Link } from 'react-router-dom'
 import { metricsApi, healthApi } from '../lib/api'
+import { useOverviewStream } from '../hooks/useOverviewStream'
 import { AlarmRateChart } from '../components/charts/AlarmRateChart'
 import { SeverityDonut } from '../components/charts/SeverityDonut'
 import {
@@ -19,10 +20,13 @@ import {
 } from 'lucide-react'
 
 export default function Dashboard() {
+  // Pushed by the server while the stream is up; polled only as a fallback
+  const live = useOverviewStream()
   const { data: metrics, dataUpdatedAt } = useQuery({
     queryKey: ['metrics-overview'],
     queryFn: () => metricsApi.overview().then((r) => r.data),
-    refetchInterval: 15_000,
+    refetchInterval: live ? false : 15_000,
+    refetchOnWindowFocus: !live,
   })
 
   const { data: health } = useQuery({
@@ -76,7 +80,7 @@ export default function Dashboard() {
         </div>
         <div className="text-xs text-gray-500 flex items-center gap-1.5">
           <div className="h-1.5 w-1.5 rounded-full bg-green-500 animate-pulse" />
-          Auto-refresh 15s
+          {live ? 'Live' : 'Auto-refresh 15s'}
           {dataUpdatedAt > 0 && (
             <span className="text-gray-600 ml-1">
               &middot; {new Date(dataUpdatedAt).toLocaleTimeString()}
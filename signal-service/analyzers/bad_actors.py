@@ -0,0 +1,53 @@
+"""Bad actor (most frequent alarm source) tracking.
+
+Counting activations per source over 30 days in Loki is expensive with a
+high tag cardinality. Instead, ingestion folds every batch into a
+Space-Saving summary per hour, persisted in heavy_hitter_sketches; a
+top-N query for any range merges the hourly summaries and reports the
+error bound of each count.
+"""
+
+import logging
+from collections import Counter, defaultdict
+
+from analyzers.pipeline import StreamOperator
+from analyzers.sketches import SpaceSaving
+from config import settings
+from db import merge_hourly_sketches
+from normalizer.schema import AlarmRecord
+
+logger = logging.getLogger("signal-service.analyzers.bad_actors")
+
+HOUR_SECONDS = 3600
+
+
+class BadActorTracker(StreamOperator):
+    """Counts activations per source per hour and merges them into the stored sketches."""
+
+    name = "bad_actors"
+
+    def __init__(self, capacity: int | None = None):
+        self.capacity = capacity or settings.BAD_ACTOR_SKETCH_CAPACITY
+        self._pending: dict[int, Counter] = defaultdict(Counter)
+
+    def observe(self, records: list[AlarmRecord]) -> None:
+        pending = self._pending
+        for rec in records:
+            if rec.event_type == "active":
+                pending[int(rec.timestamp // HOUR_SECONDS) * HOUR_SECONDS][rec.point] += 1
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, defaultdict(Counter)
+        sketches = {}
+        for hour, counts in pending.items():
+            sketch = SpaceSaving(self.capacity)
+            sketch.update(counts)
+            sketches[hour] = sketch
+        try:
+            await merge_hourly_sketches(sketches)
+        except Exception:
+            for hour, counts in pending.items():
+                self._pending[hour].update(counts)
+            raise
@@ -1 +1,167 @@
-"""Chattering alarm detection — Phase 4 stub."""
+"""Chattering alarm detection.
+
+An alarm source chatters when it transitions into alarm at least
+`threshold` times within a sliding `window` (ISA-18.2 default: 5 in one
+hour). Each source keeps a ring buffer of its recent transition timestamps;
+per event the new timestamp is appended and expired ones are popped from
+the left, so the work per event is O(1) amortized.
+
+Sources live in an LRU (OrderedDict, most recently seen last). Because
+timestamps advance roughly monotonically, sources whose last transition is
+older than the window sit at the front and are evicted as time moves on,
+which bounds state to the sources active within the last window (plus a
+hard cap of max_sources).
+"""
+
+import logging
+from collections import OrderedDict, deque
+from typing import Any
+
+from analyzers.pipeline import StreamOperator
+from normalizer.schema import AlarmRecord
+
+logger = logging.getLogger("signal-service.analyzers.chattering")
+
+
+class _SourceState:
+    __slots__ = ("area", "times", "last", "episode")
+
+    def __init__(self, area: str, capacity: int):
+        self.area = area
+        self.times: deque[float] = deque(maxlen=capacity)
+        self.last = 0.0
+        self.episode: dict[str, Any] | None = None
+
+
+class ChatteringDetector(StreamOperator):
+    """Sliding-window chattering detector keyed by alarm source."""
+
+    name = "chattering"
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        window_seconds: float = 3600,
+        max_sources: int = 50_000,
+        transition_types: tuple[str, ...] = ("active",),
+    ):
+        self.threshold = max(1, threshold)
+        self.window = window_seconds
+        self.max_sources = max_sources
+        self.transition_types = frozenset(transition_types)
+        # Only `threshold` timestamps are needed to decide; keep a little
+        # more so the reported in-window peak is meaningful
+        self.capacity = max(self.threshold * 4, 32)
+        self._sources: OrderedDict[str, _SourceState] = OrderedDict()
+        self._watermark = 0.0
+        self.closed: list[dict[str, Any]] = []
+
+    @property
+    def tracked_sources(self) -> int:
+        return len(self._sources)
+
+    def observe(self, records: list[AlarmRecord]) -> None:
+        sources = self._sources
+        window = self.window
+        for rec in records:
+            if rec.event_type not in self.transition_types:
+                continue
+            ts = rec.timestamp
+            key = rec.point
+            state = sources.get(key)
+            if state is None:
+                state = sources[key] = _SourceState(rec.area, self.capacity)
+            else:
+                sources.move_to_end(key)
+
+            times = state.times
+            times.append(ts)
+            while ts - times[0] >= window:
+                times.popleft()
+            state.last = max(state.last, ts)
+
+            # An episode lasts while every new transition still has
+            # `threshold` transitions within the trailing window
+            if state.episode is not None and len(times) < self.threshold:
+                self._close(key, state)
+            if state.episode is not None:
+                state.episode["transitions"] += 1
+                state.episode["end"] = state.last
+                state.episode["peak_in_window"] = max(state.episode["peak_in_window"], len(times))
+            elif len(times) >= self.threshold:
+                state.episode = {
+                    "start": times[0],
+                    "end": ts,
+                    "transitions": len(times),
+                    "peak_in_window": len(times),
+                }
+
+            if ts > self._watermark:
+                self._watermark = ts
+        self._evict()
+
+    def _close(self, key: str, state: _SourceState) -> None:
+        episode = state.episode
+        state.episode = None
+        if episode is not None:
+            self.closed.append({"source": key, "area": state.area, **episode})
+
+    def _evict(self) -> None:
+        """Drop sources idle for longer than the window, then enforce the cap."""
+        sources = self._sources
+        horizon = self._watermark - self.window
+        while sources:
+            key, state = next(iter(sources.items()))
+            if state.last > horizon and len(sources) <= self.max_sources:
+                break
+            self._close(key, state)
+            sources.popitem(last=False)
+
+    def close_all(self) -> None:
+        """Close every open episode (end of a historical range)."""
+        for key, state in self._sources.items():
+            self._close(key, state)
+
+    def drain(self) -> list[dict[str, Any]]:
+        """Return and forget the episodes closed since the last drain."""
+        closed, self.closed = self.closed, []
+        return closed
+
+    def open_episodes(self) -> list[dict[str, Any]]:
+        return [
+            {"source": key, "area": state.area, **state.episode}
+            for key, state in self._sources.items()
+            if state.episode is not None
+        ]
+
+    def report(self, include_open: bool = True) -> list[dict[str, Any]]:
+        """Summarize chattering per source, most transitions first.
+
+        Each entry lists the windows (episodes) in which the source
+        chattered; closed episodes are kept until drain().
+        """
+        episodes = list(self.closed)
+        if include_open:
+            episodes.extend(self.open_episodes())
+        by_source: dict[str, dict[str, Any]] = {}
+        for ep in sorted(episodes, key=lambda e: e["start"]):
+            entry = by_source.setdefault(ep["source"], {
+                "source": ep["source"],
+                "area": ep["area"],
+                "transitions": 0,
+                "peak_in_window": 0,
+                "windows": [],
+            })
+            entry["transitions"] += ep["transitions"]
+            entry["peak_in_window"] = max(entry["peak_in_window"], ep["peak_in_window"])
+            entry["windows"].append({"start": ep["start"], "end": ep["end"], "transitions": ep["transitions"]})
+        return sorted(by_source.values(), key=lambda e: e["transitions"], reverse=True)
+
+    async def flush(self) -> None:
+        for ep in self.drain():
+            logger.info(
+                f"Chattering: '{ep['source']}' ({ep['area']}) {ep['transitions']} transitions, "
+                f"peak {ep['peak_in_window']} within {int(self.window)}s"
+            )
+        if self._sources:
+            logger.debug(f"Chattering detector tracking {len(self._sources)} source(s)")
@@ -0,0 +1,247 @@
+"""Alarm correlation and root-cause grouping.
+
+Finds alarm sources that consistently activate within `window` seconds of
+each other. Activations are sorted by time and each one's window end is
+found with np.searchsorted; pairs (i, i+d) inside the window are then
+generated one neighbour offset d at a time over the whole array, so the
+work is proportional to the number of in-window pairs rather than to
+sources squared. Pairs are deduplicated per activation (a chattering
+partner counts once) and accumulated as a sparse (COO) matrix of directed
+co-occurrence counts:
+
+    co[a, b] = activations of a followed by at least one b within the window
+
+From co and the per-source activation counts n:
+  - sources a, b are linked when (co[a,b] + co[b,a]) / (n[a] + n[b]) reaches
+    min_score; linked sources are grouped with union-find
+  - b is a consequential alarm candidate of a when most b activations are
+    preceded by a (co[a,b] / n[b]) and a usually leads to b (co[a,b] / n[a])
+
+In dense floods each activation is paired with at most max_neighbors
+following activations, which bounds memory and time for long histories.
+"""
+
+import logging
+from array import array
+from typing import Any
+
+import numpy as np
+
+from analyzers.pipeline import StreamOperator
+from normalizer.schema import AlarmRecord
+
+logger = logging.getLogger("signal-service.analyzers.correlation")
+
+
+class ActivationCollector(StreamOperator):
+    """Collects activation times and source ids compactly for batch correlation."""
+
+    name = "correlation"
+
+    def __init__(self):
+        self.times = array("d")
+        self.ids = array("i")
+        self.source_ids: dict[str, int] = {}
+        self.areas: dict[str, str] = {}
+
+    def observe(self, records: list[AlarmRecord]) -> None:
+        source_ids = self.source_ids
+        for rec in records:
+            if rec.event_type != "active":
+                continue
+            point = rec.point
+            sid = source_ids.get(point)
+            if sid is None:
+                sid = source_ids[point] = len(source_ids)
+                self.areas[point] = rec.area
+            self.times.append(rec.timestamp)
+            self.ids.append(sid)
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray, list[str]]:
+        """(times, source ids, source names), sorted by time."""
+        times = np.frombuffer(self.times, dtype=np.float64)
+        ids = np.frombuffer(self.ids, dtype=np.int32)
+        order = np.argsort(times, kind="stable")
+        names = [None] * len(self.source_ids)
+        for name, sid in self.source_ids.items():
+            names[sid] = name
+        return times[order], ids[order], names
+
+
+def cooccurrence(
+    times: np.ndarray,
+    ids: np.ndarray,
+    n_sources: int,
+    window: float,
+    max_neighbors: int = 100,
+    chunk_size: int = 100_000,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Directed co-occurrence counts as sparse arrays (pair code, count, mean_lag).
+
+    Pair codes are a * n_sources + b, sorted. `times` must be sorted.
+    mean_lag is the mean delay from an activation of a to the first
+    following b within the window.
+    """
+    n = len(times)
+    n_sources = np.int64(n_sources)
+    hi = np.searchsorted(times, times + window, side="right")
+    # Index of the previous activation of the same source (-1 if none): a
+    # partner j is the first of its source after i exactly when prev[j] <= i
+    by_source = np.argsort(ids, kind="stable")
+    same = ids[by_source[1:]] == ids[by_source[:-1]]
+    prev = np.full(n, -1, dtype=np.int64)
+    prev[by_source[1:][same]] = by_source[:-1][same]
+    del by_source, same
+
+    acc_codes = np.zeros(0, dtype=np.int64)
+    acc_counts = np.zeros(0, dtype=np.int64)
+    acc_lags = np.zeros(0, dtype=np.float64)
+
+    for lo in range(0, n, chunk_size):
+        idx = np.arange(lo, min(n, lo + chunk_size), dtype=np.int64)
+        limit = np.minimum(hi[idx], idx + 1 + max_neighbors)
+        events, partners = [], []
+        for d in range(1, max_neighbors + 1):
+            mask = idx + d < limit
+            if not mask.any():
+                break
+            ev = idx[mask]
+            pt = ev + d
+            # One count per (activation, partner source), from the nearest
+            # partner; same-source repeats are chattering, not correlation
+            keep = (prev[pt] <= ev) & (ids[pt] != ids[ev])
+            events.append(ev[keep])
+            partners.append(pt[keep])
+        if not events:
+            continue
+        ev = np.concatenate(events)
+        pt = np.concatenate(partners)
+        del events, partners
+        codes = ids[ev].astype(np.int64) * n_sources + ids[pt]
+        lags = times[pt] - times[ev]
+        del ev, pt
+
+        # Fold the chunk into the running sparse matrix (both sides sorted,
+        # so existing pairs are found by binary search and new ones inserted)
+        uniq, inverse, counts = np.unique(codes, return_inverse=True, return_counts=True)
+        lag_sums = np.bincount(inverse, weights=lags, minlength=len(uniq))
+        pos = np.searchsorted(acc_codes, uniq)
+        found = pos < len(acc_codes)
+        found[found] = acc_codes[pos[found]] == uniq[found]
+        acc_counts[pos[found]] += counts[found]
+        acc_lags[pos[found]] += lag_sums[found]
+        new = ~found
+        acc_codes = np.insert(acc_codes, pos[new], uniq[new])
+        acc_counts = np.insert(acc_counts, pos[new], counts[new])
+        acc_lags = np.insert(acc_lags, pos[new], lag_sums[new])
+        del codes, lags, uniq, inverse, counts, lag_sums, pos, found, new
+
+    if len(acc_codes):
+        acc_lags /= acc_counts
+    return acc_codes, acc_counts, acc_lags
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def correlate(
+    collector: ActivationCollector,
+    window_seconds: float = 60,
+    min_support: int = 5,
+    min_score: float = 0.5,
+    min_confidence: float = 0.8,
+    max_neighbors: int = 100,
+) -> dict[str, Any]:
+    """Correlation groups and consequential alarm candidates.
+
+    min_support is the minimum number of co-occurrences for a pair to be
+    considered at all.
+    """
+    times, ids, names = collector.arrays()
+    n_sources = len(names)
+    activations = np.bincount(ids, minlength=n_sources) if n_sources else np.zeros(0, dtype=np.int64)
+    codes, counts, lags = cooccurrence(times, ids, n_sources, window_seconds, max_neighbors)
+
+    # Cheap necessary conditions first: a pair links only if one direction
+    # carries at least half the score, and is consequential only if most b
+    # activations are preceded by a
+    n_a = activations[codes // n_sources]
+    n_b = activations[codes % n_sources]
+    keep = (counts >= min_support) & (
+        (2 * counts >= min_score * (n_a + n_b)) | (counts >= min_confidence * n_b)
+    )
+    del n_a, n_b
+    pairs, co, lag = codes[keep], counts[keep], lags[keep]
+    a, b = pairs // n_sources, pairs % n_sources
+
+    # Reverse direction counts, looked up in the full sorted pair codes
+    reverse = b * n_sources + a
+    pos = np.minimum(np.searchsorted(codes, reverse), max(len(codes) - 1, 0))
+    co_reverse = np.where(codes[pos] == reverse, counts[pos], 0) if len(codes) else np.zeros(0, dtype=np.int64)
+    del codes, counts, lags
+
+    n_a, n_b = activations[a], activations[b]
+    score = (co + co_reverse) / (n_a + n_b)
+    follows = co / n_a  # P(b within window | a)
+    preceded = co / n_b  # P(a before b within window | b)
+
+    uf = _UnionFind(n_sources)
+    for x, y in zip(a[score >= min_score].tolist(), b[score >= min_score].tolist()):
+        uf.union(x, y)
+    members: dict[int, list[int]] = {}
+    for sid in np.unique(np.concatenate([a[score >= min_score], b[score >= min_score]])).tolist():
+        members.setdefault(uf.find(sid), []).append(sid)
+
+    consequential = (preceded >= min_confidence) & (follows >= min_confidence * 0.5) & (co > co_reverse)
+    candidates = [
+        {
+            "cause": names[x],
+            "consequence": names[y],
+            "support": int(c),
+            "p_consequence_after_cause": round(float(f), 3),
+            "p_cause_before_consequence": round(float(p), 3),
+            "mean_lag_seconds": round(float(l), 2),
+        }
+        for x, y, c, f, p, l in zip(
+            a[consequential].tolist(), b[consequential].tolist(), co[consequential],
+            follows[consequential], preceded[consequential], lag[consequential],
+        )
+    ]
+    caused = {c["consequence"] for c in candidates}
+
+    groups = []
+    for sids in members.values():
+        sources = [names[s] for s in sorted(sids, key=lambda s: -activations[s])]
+        groups.append({
+            "sources": sources,
+            "areas": sorted({collector.areas[s] for s in sources}),
+            "activations": int(activations[sids].sum()),
+            # Members never flagged as a consequence are the likely root causes
+            "root_candidates": [s for s in sources if s not in caused],
+        })
+
+    logger.info(
+        f"Correlation: {len(times)} activation(s) of {n_sources} source(s), "
+        f"{len(co)} candidate pair(s), {len(groups)} group(s)"
+    )
+    return {
+        "window_seconds": window_seconds,
+        "activations": int(len(times)),
+        "sources": n_sources,
+        "groups": sorted(groups, key=lambda g: g["activations"], reverse=True),
+        "consequential": sorted(candidates, key=lambda c: c["support"], reverse=True),
+    }
@@ -1 +1,277 @@
-"""Alarm flood detection — Phase 4 stub."""
+"""Alarm flood detection.
+
+An alarm flood is a period in which one operator position (an area) or the
+whole plant receives more than FLOOD_THRESHOLD alarm activations in 10
+minutes. The episode ends once the rolling rate drops back below the end
+threshold (half the start threshold by default, so a rate hovering around
+the limit does not open and close a new episode on every alarm).
+
+Rolling counts use a ring of fixed sub-buckets (10 s by default) per scope
+with a running total, so each event is O(1) and memory per scope is
+constant regardless of alarm rate. Per-source counts are only kept for the
+scopes currently in flood, to report the top contributors.
+
+Live ingestion interleaves batches from connectors polled concurrently,
+each at its own point in event time (one may be catching up on a backlog,
+another's clock may run behind). The live detector holds activations
+back until flush (the end of an ingestion cycle, once every connector has
+reported), tracks the newest event time per connector, and counts held
+activations in time order up to the oldest of those, so a lagging
+connector's alarms still land inside the window. Connectors that have gone quiet stop
+holding event time back, and the wait is bounded by max_lateness.
+"""
+
+import heapq
+import logging
+import time
+import uuid
+from collections import Counter
+from typing import Any
+
+from analyzers.pipeline import StreamOperator
+from db import save_flood_episodes
+from normalizer.schema import AlarmRecord
+
+logger = logging.getLogger("signal-service.analyzers.flooding")
+
+PLANT_SCOPE = "plant"
+
+
+class RollingCounter:
+    """Count of events in a sliding window, bucketed into a fixed ring."""
+
+    __slots__ = ("bucket_seconds", "buckets", "head", "total")
+
+    def __init__(self, window_seconds: float, bucket_seconds: float):
+        self.bucket_seconds = bucket_seconds
+        self.buckets = [0] * max(1, int(window_seconds // bucket_seconds))
+        self.head = -1  # absolute index of the newest bucket
+        self.total = 0
+
+    def advance(self, ts: float) -> None:
+        """Move the window end to ts, expiring buckets that fell out."""
+        idx = int(ts // self.bucket_seconds)
+        if idx <= self.head:
+            return
+        n = len(self.buckets)
+        if self.head < 0 or idx - self.head >= n:
+            self.buckets = [0] * n
+            self.total = 0
+        else:
+            for i in range(self.head + 1, idx + 1):
+                slot = i % n
+                self.total -= self.buckets[slot]
+                self.buckets[slot] = 0
+        self.head = idx
+
+    def add(self, ts: float) -> bool:
+        """Count an event at ts; returns False if it is older than the window."""
+        self.advance(ts)
+        idx = int(ts // self.bucket_seconds)
+        if self.head - idx >= len(self.buckets):
+            return False
+        self.buckets[idx % len(self.buckets)] += 1
+        self.total += 1
+        return True
+
+    def drop_time(self, threshold: int) -> float:
+        """Earliest time the count falls below threshold if no events arrive."""
+        n = len(self.buckets)
+        total = self.total
+        if total < threshold:
+            return (self.head + 1) * self.bucket_seconds
+        for k in range(1, n + 1):
+            # Moving the head to head+k expires absolute bucket head+k-n
+            total -= self.buckets[(self.head + k) % n]
+            if total < threshold:
+                return (self.head + k) * self.bucket_seconds
+        return (self.head + n) * self.bucket_seconds
+
+
+class FloodDetector(StreamOperator):
+    """Rolling 10-minute flood detector per area and plant-wide."""
+
+    name = "flooding"
+
+    def __init__(
+        self,
+        threshold: int = 10,
+        end_threshold: int | None = None,
+        window_seconds: float = 600,
+        bucket_seconds: float = 10,
+        top_n: int = 5,
+        max_sources_per_episode: int = 10_000,
+        live: bool = False,
+        max_lateness: float = 3600,
+        idle_seconds: float = 120,
+    ):
+        self.threshold = max(1, threshold)
+        self.end_threshold = end_threshold if end_threshold is not None else max(1, self.threshold // 2)
+        self.window = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.top_n = top_n
+        self.max_sources_per_episode = max_sources_per_episode
+        # Live: reorder interleaved connectors by event time, persist
+        # episodes on flush and close them by wall-clock time when alarms
+        # stop arriving altogether
+        self.live = live
+        self.max_lateness = max_lateness
+        self.idle_seconds = idle_seconds
+        self._sources: dict[str, tuple[float, float]] = {}  # connector -> (newest event time, monotonic seen)
+        self._held: list[tuple[float, int, AlarmRecord]] = []  # heap of activations past the event-time mark
+        self._seq = 0
+        self.late = 0  # activations older than the window when they could be counted
+        self._late_logged = 0
+        self._counters: dict[str, RollingCounter] = {}
+        self._open: dict[str, dict[str, Any]] = {}
+        self._contributors: dict[str, Counter] = {}
+        self._watermark = 0.0
+        self.closed: list[dict[str, Any]] = []
+        self._dirty: dict[str, dict[str, Any]] = {}
+        self._drop_at: dict[str, float] = {}
+
+    def _counter(self, scope: str) -> RollingCounter:
+        counter = self._counters.get(scope)
+        if counter is None:
+            counter = self._counters[scope] = RollingCounter(self.window, self.bucket_seconds)
+        return counter
+
+    def observe(self, records: list[AlarmRecord]) -> None:
+        if not self.live:
+            # Historical replays arrive in time order
+            for rec in records:
+                if rec.event_type == "active":
+                    self._count(rec)
+            return
+        now = time.monotonic()
+        for rec in records:
+            if rec.event_type != "active":
+                continue
+            mark = self._sources.get(rec.connector_id)
+            self._sources[rec.connector_id] = (rec.timestamp if mark is None else max(mark[0], rec.timestamp), now)
+            heapq.heappush(self._held, (rec.timestamp, self._seq, rec))
+            self._seq += 1
+
+    def _event_time(self, now: float) -> float:
+        """Time up to which every active connector has delivered its activations."""
+        newest = max(ts for ts, _ in self._sources.values())
+        active = [ts for ts, seen in self._sources.values() if now - seen <= self.idle_seconds]
+        return max(min(active) if active else newest, newest - self.max_lateness)
+
+    def _release(self, until: float) -> None:
+        while self._held and self._held[0][0] <= until:
+            self._count(heapq.heappop(self._held)[2])
+
+    def _count(self, rec: AlarmRecord) -> None:
+        ts = rec.timestamp
+        if ts > self._watermark:
+            # Drop times are bucket-aligned, so only re-check on a new bucket
+            if self._open and ts // self.bucket_seconds != self._watermark // self.bucket_seconds:
+                self._expire_open(ts)
+            self._watermark = ts
+        for scope, area in ((rec.area, rec.area), (PLANT_SCOPE, None)):
+            counter = self._counter(scope)
+            if not counter.add(ts):
+                if scope == PLANT_SCOPE:
+                    self.late += 1
+                continue
+            self._drop_at.pop(scope, None)
+            episode = self._open.get(scope)
+            if episode is None and counter.total > self.threshold:
+                episode = self._open_episode(scope, area, ts, counter.total)
+            if episode is not None:
+                episode["alarm_count"] += 1
+                episode["peak_rate"] = max(episode["peak_rate"], counter.total)
+                contributors = self._contributors[scope]
+                if rec.point in contributors or len(contributors) < self.max_sources_per_episode:
+                    contributors[rec.point] += 1
+                self._dirty[episode["id"]] = episode
+
+    def _open_episode(self, scope: str, area: str | None, ts: float, rate: int) -> dict[str, Any]:
+        episode = {
+            "id": str(uuid.uuid4()),
+            "scope": scope,
+            "area": area,
+            "start": ts,
+            "end": None,
+            # The alarms already in the window led into the flood
+            "alarm_count": rate - 1,
+            "peak_rate": rate,
+            "top_sources": [],
+        }
+        self._open[scope] = episode
+        self._contributors[scope] = Counter()
+        logger.info(f"Alarm flood started in '{scope}': {rate} alarms in {int(self.window)}s")
+        return episode
+
+    def _expire_open(self, now: float) -> None:
+        """Close open episodes whose rolling rate fell below the end threshold by now."""
+        for scope in list(self._open):
+            drop = self._drop_at.get(scope)
+            if drop is None:
+                drop = self._drop_at[scope] = self._counters[scope].drop_time(self.end_threshold)
+            if drop <= now:
+                self._close(scope, drop)
+
+    def _close(self, scope: str, end: float) -> None:
+        episode = self._open.pop(scope)
+        self._drop_at.pop(scope, None)
+        episode["end"] = end
+        episode["top_sources"] = self._top_sources(scope)
+        self._contributors.pop(scope, None)
+        self.closed.append(episode)
+        self._dirty[episode["id"]] = episode
+        logger.info(
+            f"Alarm flood ended in '{scope}': {episode['alarm_count']} alarms, "
+            f"peak {episode['peak_rate']}/{int(self.window)}s"
+        )
+
+    def _top_sources(self, scope: str) -> list[dict[str, Any]]:
+        contributors = self._contributors.get(scope) or Counter()
+        return [{"source": k, "count": v} for k, v in contributors.most_common(self.top_n)]
+
+    def close_all(self, end: float | None = None) -> None:
+        """Close every open episode (end of a historical range)."""
+        self._release(float("inf"))
+        end = end if end is not None else self._watermark
+        for scope in list(self._open):
+            self._close(scope, min(end, self._counters[scope].drop_time(self.end_threshold)))
+
+    def open_episodes(self) -> list[dict[str, Any]]:
+        return [{**ep, "top_sources": self._top_sources(scope)} for scope, ep in self._open.items()]
+
+    def drain(self) -> list[dict[str, Any]]:
+        closed, self.closed = self.closed, []
+        return closed
+
+    def rates(self) -> dict[str, int]:
+        """Current rolling count per scope."""
+        return {scope: c.total for scope, c in self._counters.items()}
+
+    async def flush(self) -> None:
+        """Persist episodes opened, updated or closed since the last flush."""
+        if self.live and self._sources:
+            now = time.monotonic()
+            self._release(self._event_time(now))
+            if not self._held and all(now - seen > self.idle_seconds for _, seen in self._sources.values()):
+                # Alarms stopped arriving altogether: let floods end by wall-clock time
+                self._expire_open(max(self._watermark, time.time()))
+            else:
+                # Sources may still be catching up; event time decides
+                self._expire_open(self._watermark)
+            if self.late > self._late_logged:
+                logger.warning(
+                    f"{self.late - self._late_logged} activation(s) arrived more than "
+                    f"{int(self.window)}s behind the flood window and were not counted"
+                )
+                self._late_logged = self.late
+        elif self._watermark:
+            self._expire_open(self._watermark)
+        dirty = [
+            {**ep, "top_sources": self._top_sources(ep["scope"])} if ep["end"] is None else ep
+            for ep in self._dirty.values()
+        ]
+        self._dirty = {}
+        self.drain()
+        if dirty and self.live:
+            await save_flood_episodes(dirty)
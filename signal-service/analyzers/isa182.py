@@ -1,4 +1,68 @@
-"""ISA-18.2 KPI engine — Phase 4 stub."""
+"""ISA-18.2 KPI engine."""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+
+from analyzers import distribution
+from analyzers.bad_actors import BadActorTracker
+from analyzers.chattering import ChatteringDetector
+from analyzers.correlation import ActivationCollector, correlate
+from analyzers.flooding import FloodDetector
+from analyzers.incremental import PLANT_SCOPE, AlarmRateKPI, IncrementalKPI
+from analyzers.lifecycle import LifecycleAssembler
+from analyzers.pipeline import StreamOperator
+from analyzers.rollups import RollupWriter
+from analyzers.sketches import SpaceSaving
+from analyzers.stale import ActiveAlarmTracker
+from config import settings
+from db import (
+    load_hourly_kpis,
+    load_hourly_sketches,
+    load_priority_counts,
+    load_rollup_series,
+    load_standing_alarms,
+)
+from loki import LokiQueryClient, loki_client, parse_time
+
+logger = logging.getLogger("signal-service.analyzers.isa182")
+
+BUCKET_SECONDS = 600  # 10-minute alarm rate bucket
+HOUR_SECONDS = 3600
+BUCKETS_PER_HOUR = HOUR_SECONDS // BUCKET_SECONDS
+
+# Alarm activations only — ack/clear transitions are not new alarms
+ACTIVE_SELECTOR = '{job="signalforge", event_type="active"}'
+ALL_EVENTS_SELECTOR = '{job="signalforge"}'
+
+
+def count_matrix(
+    series_list: list[dict],
+    label: str,
+    first_eval: float,
+    n_buckets: int,
+    step: int,
+) -> tuple[list[str], np.ndarray]:
+    """Pack a Loki count matrix into a (labels x buckets) int array.
+
+    Bucket i covers [first_eval - step + i*step, first_eval + i*step), i.e.
+    the count_over_time window evaluated at first_eval + i*step.
+    """
+    names = sorted({s.get("metric", {}).get(label, "unknown") for s in series_list})
+    row_of = {name: i for i, name in enumerate(names)}
+    counts = np.zeros((len(names), n_buckets), dtype=np.int64)
+    for series in series_list:
+        values = series.get("values") or []
+        if not values:
+            continue
+        arr = np.asarray(values, dtype=np.float64)
+        idx = np.rint((arr[:, 0] - first_eval) / step).astype(np.int64)
+        keep = (idx >= 0) & (idx < n_buckets)
+        row = row_of[series.get("metric", {}).get(label, "unknown")]
+        np.add.at(counts[row], idx[keep], arr[keep, 1].astype(np.int64))
+    return names, counts
 
 
 class ISA182Analyzer:
@@ -8,30 +72,347 @@ class ISA182Analyzer:
     ALARM_RATE_MANAGEABLE = 6  # alarms/operator/hour
     ALARM_RATE_OVERLOADED = 12
     FLOOD_THRESHOLD = 10  # alarms in 10 minutes
+    FLOOD_WINDOW_SECONDS = 600
     CHATTERING_THRESHOLD = 5  # transitions in 1 hour
+    CHATTERING_WINDOW_SECONDS = 3600
     STALE_THRESHOLD_HOURS = 24
+    CORRELATION_WINDOW_SECONDS = 60  # activations this close count as co-occurring
     PRIORITY_TARGETS = {"low": 0.80, "medium": 0.15, "high": 0.05}
 
-    async def calculate_alarm_rate(self, start: str, end: str) -> dict:
-        """Calculate average alarm rate per operator per hour."""
-        raise NotImplementedError("Phase 4")
+    def __init__(self, client: LokiQueryClient | None = None):
+        self.loki = client or loki_client
+
+    @classmethod
+    def chattering_detector(cls) -> ChatteringDetector:
+        return ChatteringDetector(
+            threshold=cls.CHATTERING_THRESHOLD,
+            window_seconds=cls.CHATTERING_WINDOW_SECONDS,
+            max_sources=settings.ANALYZER_MAX_TRACKED_SOURCES,
+        )
+
+    @classmethod
+    def flood_detector(cls, live: bool = False) -> FloodDetector:
+        return FloodDetector(
+            threshold=cls.FLOOD_THRESHOLD,
+            window_seconds=cls.FLOOD_WINDOW_SECONDS,
+            live=live,
+            max_lateness=settings.FLOOD_MAX_LATENESS_SECONDS,
+            idle_seconds=settings.FLOOD_SOURCE_IDLE_SECONDS,
+        )
+
+    @classmethod
+    def lifecycle_assembler(cls, keep_alarms: bool = False, live: bool = False) -> LifecycleAssembler:
+        return LifecycleAssembler(
+            timeout_seconds=settings.LIFECYCLE_PENDING_TIMEOUT_HOURS * 3600,
+            max_pending=settings.LIFECYCLE_MAX_PENDING,
+            max_sources=settings.ANALYZER_MAX_TRACKED_SOURCES,
+            keep_alarms=keep_alarms,
+            live=live,
+        )
+
+    @classmethod
+    def stream_operators(cls) -> list[StreamOperator]:
+        """Detectors run inline on live ingestion (see analyzers/pipeline.py)."""
+        return [
+            RollupWriter(),
+            cls.chattering_detector(),
+            cls.flood_detector(live=True),
+            ActiveAlarmTracker(),
+            BadActorTracker(),
+            cls.lifecycle_assembler(live=True),
+        ]
+
+    @classmethod
+    def incremental_kpis(cls) -> list[IncrementalKPI]:
+        """KPIs kept as stored hourly aggregates (see analyzers/incremental.py)."""
+        return [AlarmRateKPI()]
+
+    async def replay(self, operators: list[StreamOperator], start: str, end: str, selector: str = ALL_EVENTS_SELECTOR) -> None:
+        """Feed a historical Loki range through stream operators, in time order."""
+        async for records in self.loki.iter_records(selector, parse_time(start), parse_time(end)):
+            for op in operators:
+                op.observe(records)
+
+    async def alarm_counts(
+        self, start: str, end: str, by: str = "area", from_loki: bool = False
+    ) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """10-minute alarm activation counts per `by` label.
+
+        Reads the alarm_counts_10m rollups written by ingestion; with
+        from_loki=True the counts come straight from sharded Loki queries
+        instead (validation, or before rollups have been rebuilt). The
+        range is aligned down to whole hours at the start and whole
+        10-minute buckets at the end. Returns (labels, bucket_starts,
+        counts[labels x buckets]).
+        """
+        start_s = int(parse_time(start)) // HOUR_SECONDS * HOUR_SECONDS
+        end_s = int(parse_time(end)) // BUCKET_SECONDS * BUCKET_SECONDS
+        n_buckets = max(0, (end_s - start_s) // BUCKET_SECONDS)
+        bucket_starts = start_s + BUCKET_SECONDS * np.arange(n_buckets, dtype=np.int64)
+        if n_buckets == 0:
+            return [], bucket_starts, np.zeros((0, 0), dtype=np.int64)
+
+        if not from_loki:
+            rows = await load_rollup_series(start_s, end_s, by)
+            names = sorted({value for _, value, _ in rows})
+            row_of = {name: i for i, name in enumerate(names)}
+            counts = np.zeros((len(names), n_buckets), dtype=np.int64)
+            if rows:
+                rr = np.fromiter((row_of[value] for _, value, _ in rows), dtype=np.int64, count=len(rows))
+                cc = np.fromiter(
+                    ((int(bucket.timestamp()) - start_s) // BUCKET_SECONDS for bucket, _, _ in rows),
+                    dtype=np.int64, count=len(rows),
+                )
+                np.add.at(counts, (rr, cc), np.fromiter((n for _, _, n in rows), dtype=np.int64, count=len(rows)))
+            return names, bucket_starts, counts
+
+        first_eval = start_s + BUCKET_SECONDS
+        matrix = await self.loki.query_matrix(
+            f"sum by ({by}) (count_over_time({ACTIVE_SELECTOR}[10m]))",
+            start=first_eval,
+            end=end_s,
+            step=BUCKET_SECONDS,
+        )
+        names, counts = count_matrix(matrix, by, first_eval, n_buckets, BUCKET_SECONDS)
+        return names, bucket_starts, counts
+
+    def rate_kpis(self, counts_10m: np.ndarray, bucket_starts: np.ndarray) -> dict:
+        """Alarm rate KPIs for one 10-minute count series (vectorized)."""
+        n_hours = len(counts_10m) // BUCKETS_PER_HOUR
+        hourly = counts_10m[: n_hours * BUCKETS_PER_HOUR].reshape(n_hours, BUCKETS_PER_HOUR).sum(axis=1)
+        total = int(counts_10m.sum())
+        kpis = {
+            "total_alarms": total,
+            "hours": n_hours,
+            "avg_per_hour": round(total / n_hours, 2) if n_hours else 0.0,
+            "avg_per_10min": round(float(counts_10m.mean()), 2) if len(counts_10m) else 0.0,
+            "peak_10min": 0,
+            "peak_10min_at": None,
+            "peak_hour": 0,
+            "peak_hour_at": None,
+            "pct_hours_over_manageable": 0.0,
+            "pct_hours_over_overloaded": 0.0,
+        }
+        if len(counts_10m):
+            i = int(counts_10m.argmax())
+            kpis["peak_10min"] = int(counts_10m[i])
+            kpis["peak_10min_at"] = int(bucket_starts[i])
+        if n_hours:
+            h = int(hourly.argmax())
+            kpis["peak_hour"] = int(hourly[h])
+            kpis["peak_hour_at"] = int(bucket_starts[h * BUCKETS_PER_HOUR])
+            kpis["pct_hours_over_manageable"] = round(float((hourly > self.ALARM_RATE_MANAGEABLE).mean() * 100), 2)
+            kpis["pct_hours_over_overloaded"] = round(float((hourly > self.ALARM_RATE_OVERLOADED).mean() * 100), 2)
+        return kpis
+
+    async def calculate_alarm_rate(self, start: str, end: str, from_loki: bool = False) -> dict:
+        """Calculate average alarm rate per operator per hour.
+
+        Each area is treated as one operator position; "plant" is the sum
+        over all areas. Counts come from the 10-minute rollups (or parallel
+        Loki count_over_time shards) and all bucketing/threshold math is
+        done on NumPy arrays.
+        """
+        areas, bucket_starts, counts = await self.alarm_counts(start, end, by="area", from_loki=from_loki)
+        plant = counts.sum(axis=0) if len(areas) else np.zeros(len(bucket_starts), dtype=np.int64)
+
+        n_hours = len(bucket_starts) // BUCKETS_PER_HOUR
+        plant_hourly = plant[: n_hours * BUCKETS_PER_HOUR].reshape(n_hours, BUCKETS_PER_HOUR).sum(axis=1)
+
+        return {
+            "start": int(bucket_starts[0]) if len(bucket_starts) else None,
+            "end": int(bucket_starts[-1]) + BUCKET_SECONDS if len(bucket_starts) else None,
+            "thresholds": {
+                "manageable": self.ALARM_RATE_MANAGEABLE,
+                "overloaded": self.ALARM_RATE_OVERLOADED,
+            },
+            "plant": self.rate_kpis(plant, bucket_starts),
+            "areas": {area: self.rate_kpis(counts[i], bucket_starts) for i, area in enumerate(areas)},
+            "plant_hourly": [
+                {"time": int(bucket_starts[h * BUCKETS_PER_HOUR]), "count": int(c)}
+                for h, c in enumerate(plant_hourly)
+            ],
+        }
+
+    async def alarm_rate_summary(self, start: str, end: str) -> dict:
+        """Alarm rate KPIs for whole hours in [start, end) from the stored hourly aggregates.
+
+        Cost depends only on the number of hours and areas in the range,
+        not on the number of alarms.
+        """
+        start_s = int(parse_time(start)) // HOUR_SECONDS * HOUR_SECONDS
+        end_s = int(parse_time(end)) // HOUR_SECONDS * HOUR_SECONDS
+        n_hours = max(0, (end_s - start_s) // HOUR_SECONDS)
+        rows = await load_hourly_kpis(start_s, end_s)
+        scopes = sorted({row.scope for row in rows} | {PLANT_SCOPE})
+        index = {scope: i for i, scope in enumerate(scopes)}
+        totals = np.zeros((len(scopes), n_hours), dtype=np.int64)
+        peaks = np.zeros((len(scopes), n_hours), dtype=np.int64)
+        for row in rows:
+            h = (int(row.bucket_start.timestamp()) - start_s) // HOUR_SECONDS
+            totals[index[row.scope], h] = row.alarm_count
+            peaks[index[row.scope], h] = row.peak_10min
+
+        def summarize(i: int) -> dict:
+            hourly, peak = totals[i], peaks[i]
+            kpis = {
+                "total_alarms": int(hourly.sum()),
+                "hours": n_hours,
+                "avg_per_hour": round(float(hourly.mean()), 2) if n_hours else 0.0,
+                "peak_hour": int(hourly.max()) if n_hours else 0,
+                "peak_10min": int(peak.max()) if n_hours else 0,
+                "pct_hours_over_manageable": 0.0,
+                "pct_hours_over_overloaded": 0.0,
+            }
+            if n_hours:
+                kpis["pct_hours_over_manageable"] = round(float((hourly > self.ALARM_RATE_MANAGEABLE).mean() * 100), 2)
+                kpis["pct_hours_over_overloaded"] = round(float((hourly > self.ALARM_RATE_OVERLOADED).mean() * 100), 2)
+            return kpis
+
+        return {
+            "start": start_s,
+            "end": end_s,
+            "plant": summarize(index[PLANT_SCOPE]),
+            "areas": {scope: summarize(i) for scope, i in index.items() if scope != PLANT_SCOPE},
+        }
 
     async def detect_floods(self, start: str, end: str) -> list[dict]:
-        """Detect alarm flood periods."""
-        raise NotImplementedError("Phase 4")
+        """Detect alarm flood periods.
+
+        Batch mode: replays activations over [start, end] through the same
+        rolling-window detector that runs on live ingestion. Episodes still
+        in flood at `end` are closed there.
+        """
+        detector = self.flood_detector()
+        await self.replay([detector], start, end, selector=ACTIVE_SELECTOR)
+        detector.close_all(parse_time(end))
+        return sorted(detector.drain(), key=lambda ep: ep["start"])
 
     async def detect_chattering(self, start: str, end: str) -> list[dict]:
-        """Identify chattering alarms."""
-        raise NotImplementedError("Phase 4")
+        """Identify chattering alarms.
+
+        Replays alarm activations over [start, end] through the same
+        sliding-window detector used on live ingestion.
+        """
+        detector = self.chattering_detector()
+        await self.replay([detector], start, end, selector=ACTIVE_SELECTOR)
+        detector.close_all()
+        return detector.report()
 
     async def detect_stale(self) -> list[dict]:
-        """Identify stale/standing alarms."""
-        raise NotImplementedError("Phase 4")
+        """Identify stale/standing alarms.
+
+        Reads the active_alarms state maintained by ingestion: alarms
+        active for longer than STALE_THRESHOLD_HOURS without clearing.
+        """
+        now = datetime.now(timezone.utc)
+        rows = await load_standing_alarms(min_age_hours=self.STALE_THRESHOLD_HOURS)
+        return [
+            {
+                "connector_id": row.connector_id,
+                "event_id": row.event_id,
+                "source": f"{row.equipment}/{row.alarm_type}",
+                "area": row.area,
+                "isa_priority": row.isa_priority,
+                "activated_at": row.activated_at.isoformat(),
+                "acked": row.acked_at is not None,
+                "standing_hours": round((now - row.activated_at).total_seconds() / 3600, 2),
+            }
+            for row in rows
+        ]
+
+    async def find_correlations(
+        self,
+        start: str,
+        end: str,
+        window_seconds: float | None = None,
+        min_support: int = 5,
+        min_score: float = 0.5,
+    ) -> dict:
+        """Group sources that consistently alarm together; flag consequential alarms.
+
+        Replays activations over [start, end] into compact arrays, then runs
+        the sparse co-occurrence analysis (analyzers/correlation.py) off the
+        event loop.
+        """
+        collector = ActivationCollector()
+        await self.replay([collector], start, end, selector=ACTIVE_SELECTOR)
+        return await asyncio.to_thread(
+            correlate,
+            collector,
+            window_seconds=window_seconds or self.CORRELATION_WINDOW_SECONDS,
+            min_support=min_support,
+            min_score=min_score,
+        )
+
+    async def analyze_lifecycles(self, start: str, end: str, top_n: int = 50, include_alarms: bool = False) -> dict:
+        """Time to acknowledge / time to clear statistics.
+
+        Replays all transitions in [start, end] through the lifecycle
+        assembler. Percentiles are from quantile sketches (1% relative
+        accuracy); alarms still active at `end` count towards time to ack
+        only. include_alarms adds the per-alarm durations.
+        """
+        assembler = self.lifecycle_assembler(keep_alarms=include_alarms)
+        await self.replay([assembler], start, end, selector=ALL_EVENTS_SELECTOR)
+        assembler.close_all()
+        result = assembler.report(top_n)
+        if include_alarms:
+            result["alarms"] = sorted(assembler.drain(), key=lambda a: a["activated_at"])
+        return result
 
     async def analyze_priority_distribution(self, start: str, end: str) -> dict:
-        """Compare priority distribution against ISA-18.2 targets."""
-        raise NotImplementedError("Phase 4")
+        """Compare priority distribution against ISA-18.2 targets.
+
+        Sums the hourly activation counters kept by ingestion (hours
+        starting in [start, end) are included whole) and reports each
+        priority's share and deviation from PRIORITY_TARGETS plant-wide,
+        per area, per connector and per week.
+        """
+        start_s = int(parse_time(start)) // HOUR_SECONDS * HOUR_SECONDS
+        end_s = -(-int(parse_time(end)) // HOUR_SECONDS) * HOUR_SECONDS
+        rows = await load_priority_counts(start_s, end_s)
+        return {"start": start_s, "end": end_s, **distribution.summarize(rows, self.PRIORITY_TARGETS)}
+
+    async def get_bad_actors(self, start: str, end: str, top_n: int = 20, exact: bool = False) -> list[dict]:
+        """Get top N most frequently alarming points.
+
+        By default merges the hourly heavy-hitter sketches written by
+        ingestion (hour granularity: hours starting in [start, end) are
+        included whole). Each entry reports its count, the maximum
+        overcount ("error") and the guaranteed minimum. exact=True runs
+        the equivalent topk query on Loki instead, for validation.
+        """
+        start_s, end_s = parse_time(start), parse_time(end)
+        if exact:
+            return await self._exact_bad_actors(start_s, end_s, top_n)
+
+        merged = SpaceSaving(settings.BAD_ACTOR_SKETCH_CAPACITY)
+        first_hour = datetime.fromtimestamp(start_s // HOUR_SECONDS * HOUR_SECONDS, tz=timezone.utc)
+        for sketch in await load_hourly_sketches(first_hour, datetime.fromtimestamp(end_s, tz=timezone.utc)):
+            merged.merge(sketch)
+        actors = merged.top(top_n)
+        for actor in actors:
+            actor["share"] = round(actor["count"] / merged.total, 4) if merged.total else 0.0
+            # Untracked sources can have at most `floor` activations
+            actor["untracked_max"] = merged.floor
+        return actors
 
-    async def get_bad_actors(self, start: str, end: str, top_n: int = 20) -> list[dict]:
-        """Get top N most frequently alarming points."""
-        raise NotImplementedError("Phase 4")
+    async def _exact_bad_actors(self, start_s: float, end_s: float, top_n: int) -> list[dict]:
+        seconds = max(1, int(end_s - start_s))
+        data = await self.loki.query_instant(
+            f"topk({top_n}, sum by (equipment, alarm_type) "
+            f"(count_over_time({ACTIVE_SELECTOR}[{seconds}s])))",
+            time=end_s,
+        )
+        actors = []
+        for series in data.get("result", []):
+            metric = series.get("metric", {})
+            count = int(float(series["value"][1]))
+            actors.append({
+                "source": f"{metric.get('equipment', 'unknown')}/{metric.get('alarm_type', 'generic')}",
+                "count": count,
+                "error": 0,
+                "guaranteed": count,
+            })
+        return sorted(actors, key=lambda a: a["count"], reverse=True)
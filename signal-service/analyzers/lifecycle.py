@@ -0,0 +1,235 @@
+"""Alarm lifecycle reconstruction (time to acknowledge / time to clear).
+
+Journal rows for one alarm instance (active, then ack, then clear) arrive
+as unrelated events, possibly in different ingestion batches. The
+assembler keeps one pending entry per alarm key (connector_id, event_id,
+see analyzers.stale.alarm_key) until its clear arrives, then emits the
+alarm's durations and folds them into quantile sketches per source, per
+area and plant-wide.
+
+Pending entries live in an LRU (OrderedDict, most recently updated last).
+Entries not updated for `timeout_seconds` of event time, or beyond the
+`max_pending` cap, are evicted from the front as "timed_out": their
+time-to-ack still counts if the ack was seen, their time-to-clear does
+not. Per-source sketches are capped the same way (max_sources).
+
+On live ingestion every completed alarm is written to alarm_lifecycles
+on flush, so time-to-ack/clear statistics for any range are a query over
+that table.
+"""
+
+import logging
+from collections import Counter, OrderedDict
+from typing import Any
+
+from analyzers.pipeline import StreamOperator
+from analyzers.sketches import QuantileSketch
+from analyzers.stale import alarm_key
+from db import save_lifecycles
+from normalizer.schema import AlarmRecord
+
+logger = logging.getLogger("signal-service.analyzers.lifecycle")
+
+
+class _Pending:
+    __slots__ = ("connector_id", "event_id", "source", "area", "isa_priority", "activated", "acked", "cleared", "last")
+
+    def __init__(self, rec: AlarmRecord, key: tuple[str, str]):
+        self.connector_id, self.event_id = key
+        self.source = rec.point
+        self.area = rec.area
+        self.isa_priority = rec.isa_priority
+        self.activated: float | None = None
+        self.acked: float | None = None
+        self.cleared: float | None = None
+        self.last = rec.timestamp
+
+
+class _Durations:
+    __slots__ = ("time_to_ack", "time_to_clear")
+
+    def __init__(self, relative_accuracy: float):
+        self.time_to_ack = QuantileSketch(relative_accuracy)
+        self.time_to_clear = QuantileSketch(relative_accuracy)
+
+    def summary(self) -> dict[str, Any]:
+        return {"time_to_ack": self.time_to_ack.summary(), "time_to_clear": self.time_to_clear.summary()}
+
+
+class LifecycleAssembler(StreamOperator):
+    """Pairs active/ack/clear transitions per alarm instance and tracks their durations."""
+
+    name = "lifecycle"
+
+    def __init__(
+        self,
+        timeout_seconds: float = 72 * 3600,
+        max_pending: int = 200_000,
+        max_sources: int = 50_000,
+        relative_accuracy: float = 0.01,
+        keep_alarms: bool = False,
+        live: bool = False,
+    ):
+        self.timeout = timeout_seconds
+        self.max_pending = max_pending
+        self.max_sources = max_sources
+        self.relative_accuracy = relative_accuracy
+        # Live: persist every completed alarm on flush
+        self.live = live
+        self.keep_alarms = keep_alarms or live
+        self._pending: OrderedDict[tuple[str, str], _Pending] = OrderedDict()
+        self._watermark = 0.0
+        self.plant = _Durations(relative_accuracy)
+        self.areas: dict[str, _Durations] = {}
+        self.sources: OrderedDict[str, _Durations] = OrderedDict()
+        self.outcomes: Counter = Counter()
+        self.completed: list[dict[str, Any]] = []
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def observe(self, records: list[AlarmRecord]) -> None:
+        pending = self._pending
+        for rec in records:
+            event_type = rec.event_type
+            if event_type not in ("active", "ack", "clear"):
+                continue
+            ts = rec.timestamp
+            key = alarm_key(rec)
+            state = pending.get(key)
+
+            if event_type == "active":
+                if state is not None and state.activated is not None and ts > state.activated:
+                    # Re-activation without a clear in between (or a vendor
+                    # without event ids): the previous instance is over
+                    self._finish(pending.pop(key), "superseded")
+                    state = None
+                if state is None:
+                    state = pending[key] = _Pending(rec, key)
+                if state.activated is None or ts < state.activated:
+                    state.activated = ts
+                    # Transitions seen first but older than the activation belong to an earlier instance
+                    if state.acked is not None and state.acked < ts:
+                        state.acked = None
+                    if state.cleared is not None and state.cleared < ts:
+                        state.cleared = None
+            else:
+                if state is None:
+                    state = pending[key] = _Pending(rec, key)
+                if event_type == "ack":
+                    state.acked = ts if state.acked is None else min(state.acked, ts)
+                else:
+                    state.cleared = ts if state.cleared is None else min(state.cleared, ts)
+            state.last = max(state.last, ts)
+            pending.move_to_end(key)
+
+            if state.activated is not None and state.cleared is not None:
+                self._finish(pending.pop(key), "cleared")
+            if ts > self._watermark:
+                self._watermark = ts
+        self._evict()
+
+    def _evict(self) -> None:
+        """Time out entries idle for longer than the timeout, then enforce the cap."""
+        pending = self._pending
+        horizon = self._watermark - self.timeout
+        while pending:
+            key, state = next(iter(pending.items()))
+            if state.last > horizon and len(pending) <= self.max_pending:
+                break
+            pending.popitem(last=False)
+            self._finish(state, "timed_out")
+
+    def _finish(self, state: _Pending, outcome: str) -> None:
+        if state.activated is None:
+            # Ack/clear whose activation was never seen (before the range or evicted)
+            self.outcomes["orphaned"] += 1
+            return
+        self.outcomes[outcome] += 1
+        time_to_ack = state.acked - state.activated if state.acked is not None else None
+        time_to_clear = state.cleared - state.activated if state.cleared is not None else None
+
+        for durations in (self.plant, self._area(state.area), self._source(state.source)):
+            if time_to_ack is not None:
+                durations.time_to_ack.add(time_to_ack)
+            if time_to_clear is not None:
+                durations.time_to_clear.add(time_to_clear)
+
+        if self.keep_alarms:
+            self.completed.append({
+                "connector_id": state.connector_id,
+                "event_id": state.event_id,
+                "source": state.source,
+                "area": state.area,
+                "isa_priority": state.isa_priority,
+                "activated_at": state.activated,
+                "acked_at": state.acked,
+                "cleared_at": state.cleared,
+                "time_to_ack": time_to_ack,
+                "time_to_clear": time_to_clear,
+                "outcome": outcome,
+            })
+
+    def _area(self, area: str) -> _Durations:
+        durations = self.areas.get(area)
+        if durations is None:
+            durations = self.areas[area] = _Durations(self.relative_accuracy)
+        return durations
+
+    def _source(self, source: str) -> _Durations:
+        sources = self.sources
+        durations = sources.get(source)
+        if durations is None:
+            durations = sources[source] = _Durations(self.relative_accuracy)
+            if len(sources) > self.max_sources:
+                sources.popitem(last=False)
+                self.outcomes["sources_dropped"] += 1
+        else:
+            sources.move_to_end(source)
+        return durations
+
+    def close_all(self) -> None:
+        """Finish every pending alarm (end of a historical range).
+
+        Alarms still active count towards time-to-ack if acknowledged.
+        """
+        while self._pending:
+            _, state = self._pending.popitem(last=False)
+            self._finish(state, "open")
+
+    def drain(self) -> list[dict[str, Any]]:
+        """Return and forget the completed alarms kept since the last drain."""
+        completed, self.completed = self.completed, []
+        return completed
+
+    def report(self, top_n: int = 50) -> dict[str, Any]:
+        """Percentile summaries plant-wide, per area and for the slowest sources.
+
+        Sources are ranked by their 90th percentile time to acknowledge.
+        """
+        def slowest(item: tuple[str, _Durations]) -> float:
+            return item[1].time_to_ack.quantile(0.9) or 0.0
+
+        return {
+            "outcomes": dict(self.outcomes),
+            "pending": len(self._pending),
+            "plant": self.plant.summary(),
+            "areas": {area: d.summary() for area, d in sorted(self.areas.items())},
+            "sources": [
+                {"source": source, **d.summary()}
+                for source, d in sorted(self.sources.items(), key=slowest, reverse=True)[:top_n]
+            ],
+        }
+
+    async def flush(self) -> None:
+        """Persist the alarms completed since the last flush (live only)."""
+        completed = self.drain()
+        if not (completed and self.live):
+            return
+        try:
+            await save_lifecycles(completed)
+        except Exception:
+            self.completed[:0] = completed
+            raise
+        logger.debug(f"Lifecycle: stored {len(completed)} alarm(s), {len(self._pending)} pending")
@@ -0,0 +1,63 @@
+"""Streaming analysis pipeline.
+
+Stream operators consume AlarmRecord batches in event order and keep
+bounded incremental state, so the same detector code runs:
+  - inline in the ingestion cycle, on every batch accepted by Loki, and
+  - over historical ranges, fed from paginated Loki log queries.
+
+observe() is synchronous and must stay cheap (it runs on the ingestion
+event loop). flush() is called once per ingestion cycle and is where
+operators persist or report what they accumulated.
+"""
+
+import logging
+
+from normalizer.schema import AlarmRecord
+
+logger = logging.getLogger("signal-service.analyzers.pipeline")
+
+
+class StreamOperator:
+    """Base class for incremental analyzers fed by the pipeline."""
+
+    name = "operator"
+
+    def observe(self, records: list[AlarmRecord]) -> None:
+        raise NotImplementedError
+
+    async def flush(self) -> None:
+        """Persist/report accumulated results (default: nothing to do)."""
+
+
+class AnalysisPipeline:
+    """Fans record batches out to a fixed list of stream operators.
+
+    A failing operator is logged and skipped — analysis must never stop
+    alarms from being ingested.
+    """
+
+    def __init__(self, operators: list[StreamOperator]):
+        self.operators = operators
+
+    def observe(self, records: list[AlarmRecord]) -> None:
+        if not records:
+            return
+        for op in self.operators:
+            try:
+                op.observe(records)
+            except Exception as exc:
+                logger.error(f"Stream operator '{op.name}' failed: {exc}")
+
+    async def flush(self) -> None:
+        for op in self.operators:
+            try:
+                await op.flush()
+            except Exception as exc:
+                logger.error(f"Stream operator '{op.name}' flush failed: {exc}")
+
+
+def build_live_pipeline() -> AnalysisPipeline:
+    """Operators run inline on ingested alarms."""
+    from analyzers.isa182 import ISA182Analyzer
+
+    return AnalysisPipeline(ISA182Analyzer.stream_operators())
@@ -0,0 +1,136 @@
+"""Materialized alarm count rollups.
+
+Ingestion counts every pushed event per 10-minute and per-hour bucket and
+dimension (connector, area, ISA priority, severity, event type) and adds
+the counts to alarm_counts_10m / alarm_counts_1h, so the dashboard and the
+ISA-18.2 rate KPIs read small Postgres tables instead of aggregating Loki.
+
+The live path is additive: one transaction per flush, and pending counts
+are kept for the next cycle only when that transaction did not commit.
+A rebuild replaces a range with counts recomputed from Loki, which makes
+it safe to re-run and corrects any drift (e.g. events re-pushed after a
+crash, which Loki deduplicates but the live counters do not).
+
+Usage (from signal-service/):
+    python -m analyzers.rollups --start 2026-09-01T00:00:00Z --end 2026-10-01T00:00:00Z
+"""
+
+import argparse
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+
+from analyzers.pipeline import StreamOperator
+from db import add_rollup_counts, replace_rollup_counts
+from loki import LokiQueryClient, loki_client, parse_time
+from normalizer.schema import AlarmRecord
+
+logger = logging.getLogger("signal-service.analyzers.rollups")
+
+BUCKET_SECONDS = 600
+HOUR_SECONDS = 3600
+DAY_SECONDS = 86400
+DIMENSIONS = ("connector_id", "area", "isa_priority", "severity", "event_type")
+
+
+def hourly_from_10m(counts: Counter) -> Counter:
+    """Sum 10-minute counts into hour buckets.
+
+    Keys are (bucket_start epoch seconds, connector_id, area, isa_priority,
+    severity, event_type).
+    """
+    hourly: Counter = Counter()
+    for (bucket, *dims), count in counts.items():
+        hourly[(bucket // HOUR_SECONDS * HOUR_SECONDS, *dims)] += count
+    return hourly
+
+
+class RollupWriter(StreamOperator):
+    """Adds per-bucket event counts to the rollup tables on every flush."""
+
+    name = "rollups"
+
+    def __init__(self):
+        self._pending: Counter = Counter()
+
+    def observe(self, records: list[AlarmRecord]) -> None:
+        pending = self._pending
+        for rec in records:
+            bucket = int(rec.timestamp // BUCKET_SECONDS) * BUCKET_SECONDS
+            pending[(bucket, rec.connector_id, rec.area, rec.isa_priority, rec.severity, rec.event_type)] += 1
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, Counter()
+        try:
+            await add_rollup_counts(pending, hourly_from_10m(pending))
+        except Exception:
+            self._pending.update(pending)
+            raise
+
+
+async def counts_from_loki(start: float, end: float, client: LokiQueryClient | None = None) -> Counter:
+    """Recompute 10-minute rollup counts for [start, end) from Loki."""
+    client = client or loki_client
+    matrix = await client.query_matrix(
+        f'sum by ({", ".join(DIMENSIONS)}) (count_over_time({{job="signalforge"}}[10m]))',
+        start=start + BUCKET_SECONDS,
+        end=end,
+        step=BUCKET_SECONDS,
+    )
+    counts: Counter = Counter()
+    for series in matrix:
+        metric = series.get("metric", {})
+        dims = (
+            metric.get("connector_id", ""),
+            metric.get("area", "unknown"),
+            metric.get("isa_priority", "low"),
+            metric.get("severity", "info"),
+            metric.get("event_type", "active"),
+        )
+        for ts, value in series.get("values", []):
+            count = int(float(value))
+            if count:
+                # The window evaluated at t covers the bucket ending at t
+                counts[(int(float(ts)) - BUCKET_SECONDS, *dims)] += count
+    return counts
+
+
+async def rebuild(start: str, end: str, client: LokiQueryClient | None = None) -> int:
+    """Replace the rollups for whole hours in [start, end) with Loki counts.
+
+    Works one day at a time (one transaction each) so memory stays flat
+    for long ranges and an interrupted rebuild can simply be re-run.
+    """
+    start_s = int(parse_time(start)) // HOUR_SECONDS * HOUR_SECONDS
+    end_s = -(-int(parse_time(end)) // HOUR_SECONDS) * HOUR_SECONDS
+    rows = 0
+    for chunk_start in range(start_s, end_s, DAY_SECONDS):
+        chunk_end = min(end_s, chunk_start + DAY_SECONDS)
+        counts = await counts_from_loki(chunk_start, chunk_end, client)
+        await replace_rollup_counts(chunk_start, chunk_end, counts, hourly_from_10m(counts))
+        rows += len(counts)
+        logger.info(
+            f"Rebuilt rollups {_iso(chunk_start)} .. {_iso(chunk_end)}: "
+            f"{sum(counts.values())} event(s) in {len(counts)} row(s)"
+        )
+    return rows
+
+
+def _iso(ts: int) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", required=True, help="RFC3339 or unix seconds (aligned down to the hour)")
+    parser.add_argument("--end", required=True, help="RFC3339 or unix seconds (aligned up to the hour)")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.start, args.end))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Mergeable summaries used by the streaming analyzers."""
+
+import math
+from collections import Counter
+from typing import Any
+
+
+class SpaceSaving:
+    """Mergeable Space-Saving heavy-hitters summary with at most `capacity` items.
+
+    Each tracked item has an estimated count and an error: the true count
+    lies in [count - error, count]. Any item not tracked has a true count of
+    at most `floor`. Merging adds counts (an item missing on one side is
+    charged that side's floor, as error), keeps the `capacity` largest and
+    raises the floor to the largest dropped count, so the bounds hold after
+    any sequence of updates and merges; the floor never exceeds
+    total / capacity.
+    """
+
+    __slots__ = ("capacity", "items", "floor", "total")
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = max(1, capacity)
+        self.items: dict[str, list[int]] = {}  # key -> [count, error]
+        self.floor = 0
+        self.total = 0
+
+    def update(self, counts: Counter | dict[str, int]) -> None:
+        """Add exact counts (e.g. one ingestion batch) to the summary."""
+        exact = SpaceSaving(self.capacity)
+        exact.items = {k: [int(v), 0] for k, v in counts.items()}
+        exact.total = sum(int(v) for v in counts.values())
+        self.merge(exact)
+
+    def merge(self, other: "SpaceSaving") -> None:
+        items = self.items
+        for key, (count, error) in other.items.items():
+            current = items.get(key)
+            if current is None:
+                items[key] = [count + self.floor, error + self.floor]
+            else:
+                current[0] += count
+                current[1] += error
+        if other.floor:
+            for key, current in items.items():
+                if key not in other.items:
+                    current[0] += other.floor
+                    current[1] += other.floor
+        self.floor += other.floor
+        self.total += other.total
+        self._truncate()
+
+    def _truncate(self) -> None:
+        if len(self.items) <= self.capacity:
+            return
+        ranked = sorted(self.items.items(), key=lambda kv: kv[1][0], reverse=True)
+        self.items = dict(ranked[: self.capacity])
+        self.floor = max(self.floor, ranked[self.capacity][1][0])
+
+    def top(self, n: int) -> list[dict[str, Any]]:
+        ranked = sorted(self.items.items(), key=lambda kv: (kv[1][0], -kv[1][1]), reverse=True)[:n]
+        return [
+            {"source": key, "count": count, "error": error, "guaranteed": count - error}
+            for key, (count, error) in ranked
+        ]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"capacity": self.capacity, "items": self.items, "floor": self.floor, "total": self.total}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], capacity: int | None = None) -> "SpaceSaving":
+        sketch = cls(capacity or data.get("capacity", 1000))
+        sketch.items = {k: [int(v[0]), int(v[1])] for k, v in (data.get("items") or {}).items()}
+        sketch.floor = int(data.get("floor", 0))
+        sketch.total = int(data.get("total", 0))
+        sketch._truncate()
+        return sketch
+
+
+class QuantileSketch:
+    """Mergeable DDSketch-style quantile summary of non-negative values.
+
+    Values are counted in logarithmic bins of ratio gamma = (1+a)/(1-a),
+    so every quantile is returned within relative error `a` of a true
+    value of that rank. Values below MIN_VALUE are counted separately as
+    zero. When more than `max_bins` bins exist the lowest ones are folded
+    together, which only costs accuracy at the low quantiles.
+    """
+
+    MIN_VALUE = 1e-6
+
+    __slots__ = ("relative_accuracy", "gamma", "_log_gamma", "max_bins", "bins", "zero_count", "count", "min", "max", "sum")
+
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be in (0, 1)")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_bins = max(1, max_bins)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sum = 0.0
+
+    def add(self, value: float, weight: int = 1) -> None:
+        if value < self.MIN_VALUE:
+            self.zero_count += weight
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + weight
+            if len(self.bins) > self.max_bins:
+                self._collapse()
+        self.count += weight
+        self.sum += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        excess = keys[: len(keys) - self.max_bins]
+        self.bins[keys[len(excess)]] += sum(self.bins.pop(k) for k in excess)
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self, quantiles: tuple[float, ...] = (0.5, 0.9, 0.99)) -> dict[str, Any]:
+        """Count, mean, max and the requested quantiles (keys p50, p90, ...)."""
+        out: dict[str, Any] = {"count": self.count}
+        if not self.count:
+            return out
+        out["mean"] = round(self.sum / self.count, 3)
+        for q in quantiles:
+            out[f"p{q * 100:g}"] = round(self.quantile(q), 3)
+        out["max"] = round(self.max, 3)
+        return out
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(k): n for k, n in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "sum": self.sum,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], max_bins: int = 2048) -> "QuantileSketch":
+        sketch = cls(data.get("relative_accuracy", 0.01), max_bins)
+        sketch.bins = {int(k): int(n) for k, n in (data.get("bins") or {}).items()}
+        sketch.zero_count = int(data.get("zero_count", 0))
+        sketch.count = int(data.get("count", 0))
+        sketch.sum = float(data.get("sum", 0.0))
+        if sketch.count:
+            sketch.min = float(data["min"])
+            sketch.max = float(data["max"])
+        if len(sketch.bins) > sketch.max_bins:
+            sketch._collapse()
+        return sketch
@@ -1 +1,107 @@
-"""Stale alarm detection — Phase 4 stub."""
+"""Active alarm state tracking and stale alarm detection.
+
+Rather than scanning Loki history to find out which alarms are standing,
+the ingestion path keeps one row per alarm instance in active_alarms, keyed
+by (connector_id, event_id), with the activation, acknowledge and clear
+timestamps. Events are coalesced in memory per key during an ingestion
+cycle and written with one batched upsert per flush.
+
+Vendors without a per-instance event id fall back to the alarm source
+(equipment/alarm) as key; a newer activation then starts a new instance,
+dropping ack/clear times that predate it. The same merge rule is applied
+in memory (merge_state) and in SQL (db.upsert_active_alarms), so
+out-of-order batches converge to the same row.
+"""
+
+import logging
+import time
+from typing import Any
+
+from analyzers.pipeline import StreamOperator
+from config import settings
+from db import prune_active_alarms, upsert_active_alarms
+from normalizer.schema import AlarmRecord
+
+logger = logging.getLogger("signal-service.analyzers.stale")
+
+PRUNE_INTERVAL_SECONDS = 600
+
+_TIME_FIELD = {"active": "activated_at", "ack": "acked_at", "clear": "cleared_at"}
+
+
+def _latest(a: float | None, b: float | None) -> float | None:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+def merge_state(current: dict[str, Any], update: dict[str, Any]) -> dict[str, Any]:
+    """Merge two states of the same alarm key (commutative)."""
+    activated = _latest(current.get("activated_at"), update.get("activated_at"))
+    merged = {**current, **{k: v for k, v in update.items() if v is not None}}
+    merged["activated_at"] = activated
+    for field in ("acked_at", "cleared_at"):
+        value = _latest(current.get(field), update.get(field))
+        # Transitions older than the latest activation belong to a previous instance
+        merged[field] = value if activated is None or (value is not None and value >= activated) else None
+    return merged
+
+
+def alarm_key(rec: AlarmRecord) -> tuple[str, str]:
+    return rec.connector_id, rec.event_id or rec.point
+
+
+class ActiveAlarmTracker(StreamOperator):
+    """Coalesces alarm transitions and upserts them into active_alarms."""
+
+    name = "active_alarms"
+
+    def __init__(self, retention_hours: float | None = None):
+        self.retention_hours = retention_hours if retention_hours is not None else settings.ACTIVE_ALARM_RETENTION_HOURS
+        self._pending: dict[tuple[str, str], dict[str, Any]] = {}
+        self._last_prune = 0.0
+
+    def observe(self, records: list[AlarmRecord]) -> None:
+        pending = self._pending
+        for rec in records:
+            field = _TIME_FIELD.get(rec.event_type)
+            if field is None:
+                continue
+            key = alarm_key(rec)
+            update = {
+                "connector_id": key[0],
+                "event_id": key[1],
+                "area": rec.area,
+                "equipment": rec.equipment,
+                "alarm_type": rec.alarm_type,
+                "isa_priority": rec.isa_priority,
+                "activated_at": None,
+                "acked_at": None,
+                "cleared_at": None,
+                field: rec.timestamp,
+            }
+            current = pending.get(key)
+            pending[key] = update if current is None else merge_state(current, update)
+
+    async def flush(self) -> None:
+        if self._pending:
+            rows, self._pending = list(self._pending.values()), {}
+            try:
+                await upsert_active_alarms(rows)
+            except Exception:
+                # Keep the transitions for the next cycle rather than lose them
+                for row in rows:
+                    key = (row["connector_id"], row["event_id"])
+                    current = self._pending.get(key)
+                    self._pending[key] = row if current is None else merge_state(row, current)
+                raise
+            logger.debug(f"Upserted {len(rows)} active alarm state row(s)")
+
+        now = time.monotonic()
+        if now - self._last_prune >= PRUNE_INTERVAL_SECONDS:
+            self._last_prune = now
+            removed = await prune_active_alarms(self.retention_hours)
+            if removed:
+                logger.info(f"Pruned {removed} cleared alarm state row(s)")
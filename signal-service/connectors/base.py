@@ -1,12 +1,29 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import Any
 
 
+@dataclass(frozen=True)
+class ConnectorCapabilities:
+    """What the ingestion loop may rely on for a connector type."""
+
+    batch_fetch: bool = False  # fetch_alarms returns bounded batches and sets has_more
+    incremental_cursor: bool = False  # mark_processed advances a persisted cursor
+    delete_after_push: bool = False  # mark_processed deletes the source rows
+
+
 class BaseConnector(ABC):
     """Abstract base class for all SCADA alarm connectors."""
 
+    capabilities = ConnectorCapabilities()
+
+    # Set by fetch_alarms when the source has rows beyond the returned batch
+    has_more: bool = False
+
     def __init__(self, config: dict[str, Any]):
         self.config = config
+        self.connector_id = config.get("id", "")
+        self.name = config.get("name", "")
         self.host = config.get("host", "")
         self.port = config.get("port", 0)
         self.credentials = config.get("credentials", {})
@@ -27,6 +44,14 @@ class BaseConnector(ABC):
         """Fetch alarm events since the given timestamp."""
         ...
 
+    async def mark_processed(self, raw_alarms: list[dict[str, Any]]) -> int:
+        """Record that these raw alarms (in fetch order) reached Loki.
+
+        Staging connectors delete the rows; incremental connectors advance
+        their persisted cursor. Returns the number of events processed.
+        """
+        return 0
+
     @abstractmethod
     async def health_check(self) -> dict[str, Any]:
         """Check connector health and return status info."""
@@ -1,35 +1,76 @@
 import logging
+import re
 from typing import Any
 
 from sqlalchemy import text
+from sqlalchemy.engine import URL
 
-from connectors.base import BaseConnector
-from db import async_session
+from config import settings
+from connectors.base import BaseConnector, ConnectorCapabilities
+from db import get_source_session
 
 logger = logging.getLogger("signal-service.connectors.ignition")
 
 EVENT_TYPE_LABELS = {0: "Active", 1: "Clear", 2: "Ack"}
 
+_TABLE_PREFIX_RE = re.compile(r"^[A-Za-z0-9_]*$")
+
 
 class IgnitionConnector(BaseConnector):
     """Connector for Ignition alarm journal data via PostgreSQL.
 
-    Ignition writes alarm events directly to our Postgres database
+    Ignition writes alarm events directly to a Postgres database
     (alarm_events + alarm_event_data tables). This connector reads
     those events, and the ingestion loop handles cleanup after Loki push.
+
+    Each connector can point at its own journal through connection_params:
+      - database_url: full SQLAlchemy async URL for the journal database
+      - database: database name; host/port/credentials come from the connector
+        (db_host / db_port override them when the gateway and DB differ)
+      - table_prefix: prefix for the journal tables, e.g. "gw2_" reads
+        gw2_alarm_events + gw2_alarm_event_data
+    With none of these set, the shared SignalForge database is used.
     """
 
+    capabilities = ConnectorCapabilities(batch_fetch=True, delete_after_push=True)
+
     def __init__(self, config: dict[str, Any]):
         super().__init__(config)
         self._fetched_ids: list[int] = []
 
+        prefix = str(self.connection_params.get("table_prefix", "") or "")
+        if not _TABLE_PREFIX_RE.match(prefix):
+            raise ValueError(f"Invalid journal table_prefix '{prefix}'")
+        self.events_table = f"{prefix}alarm_events"
+        self.data_table = f"{prefix}alarm_event_data"
+        self.dsn = self._build_dsn()
+
+    def _build_dsn(self) -> str:
+        """Resolve the journal database URL from connection_params."""
+        params = self.connection_params
+        if params.get("database_url"):
+            return str(params["database_url"])
+        if params.get("database"):
+            return URL.create(
+                "postgresql+asyncpg",
+                username=self.credentials.get("username") or None,
+                password=self.credentials.get("password") or None,
+                host=params.get("db_host") or self.host or None,
+                port=int(params.get("db_port") or self.port or 5432),
+                database=str(params["database"]),
+            ).render_as_string(hide_password=False)
+        return settings.DATABASE_URL
+
+    def _session(self):
+        return get_source_session(self.dsn)()
+
     async def connect(self) -> bool:
-        """Verify the alarm journal tables exist in our Postgres."""
+        """Verify the alarm journal tables exist in the journal database."""
         try:
-            async with async_session() as session:
-                await session.execute(text("SELECT 1 FROM alarm_events LIMIT 0"))
-                await session.execute(text("SELECT 1 FROM alarm_event_data LIMIT 0"))
-            logger.info("Alarm journal tables verified in Postgres")
+            async with self._session() as session:
+                await session.execute(text(f"SELECT 1 FROM {self.events_table} LIMIT 0"))
+                await session.execute(text(f"SELECT 1 FROM {self.data_table} LIMIT 0"))
+            logger.info(f"Alarm journal tables {self.events_table}/{self.data_table} verified")
             return True
         except Exception as exc:
             logger.error(f"Alarm journal tables not accessible: {exc}")
@@ -46,15 +87,16 @@ class IgnitionConnector(BaseConnector):
         loop can delete them after successful Loki push.
         """
         try:
-            async with async_session() as session:
+            async with self._session() as session:
                 # Fetch events ordered by time
                 query = (
                     "SELECT id, eventid, source, displaypath, priority, "
                     "eventtime, eventtype, eventflags "
-                    "FROM alarm_events ORDER BY eventtime ASC LIMIT 1000"
+                    f"FROM {self.events_table} ORDER BY eventtime ASC LIMIT 1000"
                 )
                 events_result = await session.execute(text(query))
                 events = [dict(row._mapping) for row in events_result]
+                self.has_more = len(events) == 1000
 
                 if not events:
                     return []
@@ -66,7 +108,7 @@ class IgnitionConnector(BaseConnector):
                 data_result = await session.execute(
                     text(
                         "SELECT id, propname, dtype, intvalue, floatvalue, strvalue "
-                        "FROM alarm_event_data WHERE id = ANY(:ids)"
+                        f"FROM {self.data_table} WHERE id = ANY(:ids)"
                     ),
                     {"ids": event_ids},
                 )
@@ -106,19 +148,23 @@ class IgnitionConnector(BaseConnector):
         """Return the IDs of events fetched in the last fetch_alarms call."""
         return self._fetched_ids
 
+    async def mark_processed(self, raw_alarms: list[dict[str, Any]]) -> int:
+        """Delete pushed events from the journal staging tables."""
+        return await self.cleanup_processed([raw["id"] for raw in raw_alarms])
+
     async def cleanup_processed(self, event_ids: list[int]) -> int:
         """Delete processed events from the journal staging tables."""
         if not event_ids:
             return 0
         try:
-            async with async_session() as session:
+            async with self._session() as session:
                 # Delete event data first (FK constraint)
                 await session.execute(
-                    text("DELETE FROM alarm_event_data WHERE id = ANY(:ids)"),
+                    text(f"DELETE FROM {self.data_table} WHERE id = ANY(:ids)"),
                     {"ids": event_ids},
                 )
                 result = await session.execute(
-                    text("DELETE FROM alarm_events WHERE id = ANY(:ids)"),
+                    text(f"DELETE FROM {self.events_table} WHERE id = ANY(:ids)"),
                     {"ids": event_ids},
                 )
                 await session.commit()
@@ -132,8 +178,8 @@ class IgnitionConnector(BaseConnector):
     async def health_check(self) -> dict[str, Any]:
         """Check alarm journal table accessibility."""
         try:
-            async with async_session() as session:
-                result = await session.execute(text("SELECT COUNT(*) FROM alarm_events"))
+            async with self._session() as session:
+                result = await session.execute(text(f"SELECT COUNT(*) FROM {self.events_table}"))
                 count = result.scalar() or 0
                 return {
                     "connector_type": "ignition",
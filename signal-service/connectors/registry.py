@@ -0,0 +1,111 @@
+"""Lazy connector registry.
+
+Connector implementations are registered by module path and imported only
+when an enabled connector of that type is first polled, so service startup
+does not pay for vendor drivers (asyncpg engines, ODBC, ...) it never uses.
+
+Besides the built-in connectors, site-specific connectors can be added
+without forking:
+  - as a package entry point in the "signalforge.connectors" group
+    (name = connector type, value = "package.module:ConnectorClass"), or
+  - through the CONNECTOR_PLUGINS setting:
+    "my_dcs=site_connectors.my_dcs:MyDCSConnector,other=pkg.mod:Other"
+
+Capabilities always come from the connector class's `capabilities`
+attribute, so they are declared in exactly one place.
+"""
+
+import importlib
+import logging
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+
+from config import settings
+from connectors.base import BaseConnector, ConnectorCapabilities
+
+logger = logging.getLogger("signal-service.connectors.registry")
+
+ENTRY_POINT_GROUP = "signalforge.connectors"
+
+
+@dataclass(frozen=True)
+class ConnectorSpec:
+    connector_type: str
+    target: str  # "module.path:ClassName"
+
+
+BUILTIN_CONNECTORS: dict[str, ConnectorSpec] = {
+    "ignition": ConnectorSpec("ignition", "connectors.ignition:IgnitionConnector"),
+    "factorytalk": ConnectorSpec("factorytalk", "connectors.factorytalk:FactoryTalkConnector"),
+    "wincc": ConnectorSpec("wincc", "connectors.wincc:WinCCConnector"),
+    "plant_scada": ConnectorSpec("plant_scada", "connectors.plant_scada:PlantSCADAConnector"),
+}
+
+
+def _parse_plugins(value: str) -> dict[str, ConnectorSpec]:
+    specs = {}
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        connector_type, sep, target = item.partition("=")
+        if not sep or ":" not in target:
+            logger.warning(f"Ignoring malformed CONNECTOR_PLUGINS entry '{item}'")
+            continue
+        specs[connector_type.strip()] = ConnectorSpec(connector_type.strip(), target.strip())
+    return specs
+
+
+class ConnectorRegistry:
+    """Maps connector types to lazily imported connector classes."""
+
+    def __init__(self):
+        self._specs: dict[str, ConnectorSpec] = dict(BUILTIN_CONNECTORS)
+        self._classes: dict[str, type[BaseConnector]] = {}
+        self._discovered = False
+
+    def _discover(self) -> None:
+        """Add entry-point and CONNECTOR_PLUGINS specs (once, no imports)."""
+        if self._discovered:
+            return
+        self._discovered = True
+        for ep in entry_points(group=ENTRY_POINT_GROUP):
+            self._specs.setdefault(ep.name, ConnectorSpec(ep.name, ep.value))
+        # Explicit settings win over entry points and built-ins
+        self._specs.update(_parse_plugins(settings.CONNECTOR_PLUGINS))
+
+    def register(self, spec: ConnectorSpec) -> None:
+        self._specs[spec.connector_type] = spec
+        self._classes.pop(spec.connector_type, None)
+
+    def types(self) -> list[str]:
+        self._discover()
+        return sorted(self._specs)
+
+    def get(self, connector_type: str) -> ConnectorSpec | None:
+        self._discover()
+        return self._specs.get(connector_type)
+
+    def load(self, connector_type: str) -> type[BaseConnector] | None:
+        """Import and return the connector class, or None if unknown."""
+        cls = self._classes.get(connector_type)
+        if cls is not None:
+            return cls
+        spec = self.get(connector_type)
+        if spec is None:
+            return None
+        module_name, _, class_name = spec.target.partition(":")
+        cls = getattr(importlib.import_module(module_name), class_name)
+        if not issubclass(cls, BaseConnector):
+            raise TypeError(f"{spec.target} is not a BaseConnector subclass")
+        self._classes[connector_type] = cls
+        logger.info(f"Loaded connector implementation '{connector_type}' from {spec.target}")
+        return cls
+
+    def capabilities(self, connector_type: str) -> ConnectorCapabilities:
+        """Capabilities declared by the connector class (imports it if needed)."""
+        cls = self.load(connector_type)
+        return cls.capabilities if cls is not None else ConnectorCapabilities()
+
+
+registry = ConnectorRegistry()
@@ -1,22 +1,131 @@
+import asyncio
 import logging
+import os
 from typing import Any
 
-from connectors.base import BaseConnector
+from connectors.base import BaseConnector, ConnectorCapabilities
+from connectors.filetail import ArchiveTailer
+from db import load_cursor, save_cursor
 
 logger = logging.getLogger("signal-service.connectors.wincc")
 
 
 class WinCCConnector(BaseConnector):
-    """Connector for Siemens WinCC — Phase 5 stub."""
+    """Connector for Siemens WinCC alarm archives exported to a shared folder.
+
+    WinCC writes alarm log segments as CSV/text files. The connector tails
+    every matching file with ArchiveTailer (mmap reads from the committed
+    byte offset, rotation-safe) and checkpoints per-file offsets in
+    connector_cursors after each successful Loki push.
+
+    connection_params:
+      - archive_dir: folder the archive segments are exported to (required)
+      - pattern: file glob (default "*.csv")
+      - delimiter: field delimiter (default ";")
+      - encoding: file encoding (default "utf-8"; must be ASCII-compatible)
+      - columns: explicit column names when files have no header row
+      - column_map: rename export columns to the wincc mapping fields,
+        e.g. {"Message text": "AlarmText", "Number": "MessageNumber"}
+      - max_batch_bytes: bytes read per fetch (default 4 MiB)
+      - start_at: where a brand-new connector starts: "end" (default) skips
+        the files' existing history and ingests only rows appended later;
+        "beginning" reads it all (Loki rejects samples older than its
+        reject_old_samples_max_age, 168h by default)
+    """
+
+    capabilities = ConnectorCapabilities(batch_fetch=True, incremental_cursor=True)
+
+    def __init__(self, config: dict[str, Any]):
+        super().__init__(config)
+        params = self.connection_params
+        self.archive_dir = str(params.get("archive_dir", "") or "")
+        self.column_map: dict[str, str] = dict(params.get("column_map") or {})
+        self.start_at = str(params.get("start_at", "end"))
+        self.tailer = ArchiveTailer(
+            directory=self.archive_dir,
+            pattern=str(params.get("pattern", "*.csv")),
+            delimiter=str(params.get("delimiter", ";")),
+            encoding=str(params.get("encoding", "utf-8")),
+            columns=params.get("columns"),
+            max_batch_bytes=int(params.get("max_batch_bytes", 4 * 1024 * 1024)),
+        )
+        self._cursor: dict[str, Any] = {}
+        self._state: dict[str, dict[str, Any]] = {}
 
     async def connect(self) -> bool:
-        raise NotImplementedError("WinCC connector not yet implemented")
+        """Verify the archive folder is readable and load file checkpoints."""
+        if not self.archive_dir or not os.path.isdir(self.archive_dir):
+            logger.error(f"WinCC archive folder not accessible: '{self.archive_dir}'")
+            return False
+        self._cursor = await load_cursor(self.connector_id) if self.connector_id else {}
+        return True
 
     async def disconnect(self) -> None:
-        pass
+        logger.debug("WinCC connector disconnect (no-op)")
+
+    @property
+    def has_more(self) -> bool:
+        return self.tailer.has_more
 
     async def fetch_alarms(self, since: str | None = None) -> list[dict[str, Any]]:
-        raise NotImplementedError("WinCC connector not yet implemented")
+        """Read the next batch of archive rows past the committed offsets."""
+        initialized = "files" in self._cursor
+        skip_existing = not initialized and self.start_at == "end"
+        try:
+            rows, self._state = await asyncio.to_thread(
+                self.tailer.read_batch, self._cursor.get("files", {}), skip_existing
+            )
+        except Exception as exc:
+            logger.error(f"Error reading WinCC archive files: {exc}")
+            return []
+
+        if not initialized:
+            # Persist the starting point so a restart does not re-read history
+            await self._save({"files": self._state})
+
+        records = [self._to_record(row) for row in rows]
+        if records:
+            logger.info(f"Read {len(records)} WinCC archive row(s)")
+        return records
+
+    def _to_record(self, row: dict[str, Any]) -> dict[str, Any]:
+        """Rename export columns to the wincc mapping fields.
+
+        Adds AlarmKey (Tag | MessageNumber, or the alarm text when the
+        export has no message number): one key for the come, acknowledge
+        and go rows of an alarm, which each get their own EventId.
+        """
+        if self.column_map:
+            row = {self.column_map.get(k, k): v for k, v in row.items()}
+        if "DateTime" not in row and "Date" in row and "Time" in row:
+            row["DateTime"] = f"{row['Date']} {row['Time']}"
+        if "AlarmKey" not in row:
+            name = row.get("MessageNumber") or row.get("AlarmText") or ""
+            row["AlarmKey"] = "|".join(str(p) for p in (row.get("Tag"), name) if p)
+        return row
+
+    async def mark_processed(self, raw_alarms: list[dict[str, Any]]) -> int:
+        """Advance the per-file byte offsets past the pushed rows."""
+        if not raw_alarms:
+            return 0
+        await self._save({"files": ArchiveTailer.commit(self._state, raw_alarms)})
+        return len(raw_alarms)
+
+    async def _save(self, cursor: dict[str, Any]) -> None:
+        self._cursor = cursor
+        if self.connector_id:
+            await save_cursor(self.connector_id, cursor)
 
     async def health_check(self) -> dict[str, Any]:
-        return {"connector_type": "wincc", "status": "not_implemented"}
+        """Report archive folder accessibility and tracked files."""
+        if not self.archive_dir or not os.path.isdir(self.archive_dir):
+            return {
+                "connector_type": "wincc",
+                "status": "unhealthy",
+                "error": f"Archive folder not accessible: '{self.archive_dir}'",
+            }
+        return {
+            "connector_type": "wincc",
+            "status": "healthy",
+            "tracked_files": len(self._cursor.get("files", {})),
+        }
@@ -1,8 +1,35 @@
 """Lightweight async database access for the signal-service."""
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
+from sqlalchemy import and_, case, delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+
+from analyzers.sketches import SpaceSaving
 from config import settings
+from models import (
+    ActiveAlarm,
+    AlarmCount10m,
+    AlarmCount1h,
+    AlarmLifecycle,
+    AnalysisDirtyHour,
+    AnalysisWatermark,
+    ConnectorCursor,
+    FloodEpisode,
+    HeavyHitterSketch,
+    HourlyKPI,
+    ISA182Report,
+)
+
+logger = logging.getLogger("signal-service.db")
 
 
 def get_async_session() -> async_sessionmaker[AsyncSession]:
@@ -11,5 +38,515 @@ def get_async_session() -> async_sessionmaker[AsyncSession]:
     return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
-# Backward-compatible module-level alias (used by connectors)
-async_session = get_async_session()
+# asyncpg connections belong to the event loop that opened them, and the
+# scheduler runs ingestion and the ISA-18.2 analysis on separate loops (in
+# separate threads), so each loop gets its own engine and pool
+_loop_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, async_sessionmaker[AsyncSession]]" = (
+    weakref.WeakKeyDictionary()
+)
+_loop_sessions_lock = threading.Lock()
+
+
+def async_session() -> AsyncSession:
+    """New session on the running event loop's own engine."""
+    loop = asyncio.get_running_loop()
+    factory = _loop_sessions.get(loop)
+    if factory is None:
+        with _loop_sessions_lock:
+            factory = _loop_sessions.get(loop)
+            if factory is None:
+                factory = _loop_sessions[loop] = get_async_session()
+    return factory()
+
+
+# ---------------------------------------------------------------------------
+# Per-source engine cache
+#
+# Connectors that read from their own database (one Ignition journal per
+# gateway, for example) get a pooled engine keyed by DSN. Engines survive
+# across ingestion cycles and are disposed once they sit idle.
+# ---------------------------------------------------------------------------
+
+_source_engines: dict[str, tuple[AsyncEngine, async_sessionmaker[AsyncSession]]] = {}
+_source_last_used: dict[str, float] = {}
+
+
+def get_source_session(dsn: str) -> async_sessionmaker[AsyncSession]:
+    """Return a cached session factory for an external source database."""
+    entry = _source_engines.get(dsn)
+    if entry is None:
+        pool_args: dict[str, Any] = {}
+        if make_url(dsn).get_backend_name() != "sqlite":
+            # SQLite stand-ins (fixture databases) use SQLAlchemy's default pool
+            pool_args = {
+                "pool_size": settings.SOURCE_POOL_SIZE,
+                "max_overflow": settings.SOURCE_POOL_MAX_OVERFLOW,
+            }
+        engine = create_async_engine(dsn, echo=False, pool_pre_ping=True, **pool_args)
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        entry = (engine, factory)
+        _source_engines[dsn] = entry
+        logger.info(f"Created source engine for {engine.url.render_as_string(hide_password=True)}")
+    _source_last_used[dsn] = time.monotonic()
+    return entry[1]
+
+
+async def evict_idle_engines(max_idle_seconds: float | None = None) -> int:
+    """Dispose source engines that have not been used recently."""
+    if max_idle_seconds is None:
+        max_idle_seconds = settings.SOURCE_ENGINE_IDLE_SECONDS
+    cutoff = time.monotonic() - max_idle_seconds
+    idle = [dsn for dsn, last in _source_last_used.items() if last < cutoff]
+    for dsn in idle:
+        engine, _ = _source_engines.pop(dsn)
+        _source_last_used.pop(dsn, None)
+        await engine.dispose()
+        logger.info(f"Disposed idle source engine for {engine.url.render_as_string(hide_password=True)}")
+    return len(idle)
+
+
+# ---------------------------------------------------------------------------
+# Connector cursors
+#
+# Incremental connectors persist their high-water mark in connector_cursors
+# after each successful Loki push so restarts never re-read history.
+# ---------------------------------------------------------------------------
+
+async def load_cursor(connector_id: str) -> dict[str, Any]:
+    """Load the persisted read cursor for a connector (empty if none)."""
+    async with async_session() as session:
+        row = await session.get(ConnectorCursor, connector_id)
+        return dict(row.cursor or {}) if row else {}
+
+
+async def save_cursor(connector_id: str, cursor: dict[str, Any]) -> None:
+    """Upsert the read cursor for a connector."""
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(ConnectorCursor).values(connector_id=connector_id, cursor=cursor, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ConnectorCursor.connector_id],
+        set_={"cursor": stmt.excluded.cursor, "updated_at": stmt.excluded.updated_at},
+    )
+    async with async_session() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+# ---------------------------------------------------------------------------
+# Analyzer results
+# ---------------------------------------------------------------------------
+
+def _utc(ts: float | None) -> datetime | None:
+    return datetime.fromtimestamp(ts, tz=timezone.utc) if ts is not None else None
+
+
+def _flood_rows(episodes: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": ep["id"],
+            "scope": ep["scope"],
+            "area": ep["area"],
+            "started_at": _utc(ep["start"]),
+            "ended_at": _utc(ep["end"]),
+            "alarm_count": ep["alarm_count"],
+            "peak_rate": ep["peak_rate"],
+            "top_sources": ep["top_sources"],
+            "updated_at": now,
+        }
+        for ep in episodes
+    ]
+
+
+async def save_flood_episodes(episodes: list[dict[str, Any]]) -> None:
+    """Upsert flood episodes (open ones are rewritten until they close)."""
+    stmt = pg_insert(FloodEpisode).values(_flood_rows(episodes))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FloodEpisode.id],
+        set_={
+            col: stmt.excluded[col]
+            for col in ("ended_at", "alarm_count", "peak_rate", "top_sources", "updated_at")
+        },
+    )
+    async with async_session() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+async def replace_flood_episodes(start: int, end: int, episodes: list[dict[str, Any]]) -> None:
+    """Replace the flood episodes that started in [start, end) (backfill)."""
+    async with async_session() as session:
+        await session.execute(
+            delete(FloodEpisode).where(FloodEpisode.started_at >= _utc(start), FloodEpisode.started_at < _utc(end))
+        )
+        if episodes:
+            await session.execute(pg_insert(FloodEpisode).values(_flood_rows(episodes)))
+        await session.commit()
+
+
+def _active_alarm_upsert(rows: list[dict[str, Any]]):
+    """Upsert that merges transition times like analyzers.stale.merge_state."""
+    stmt = pg_insert(ActiveAlarm).values(rows)
+    table, new = ActiveAlarm.__table__.c, stmt.excluded
+    # GREATEST ignores NULLs in PostgreSQL
+    activated = func.greatest(table.activated_at, new.activated_at)
+
+    def since_activation(column: str):
+        latest = func.greatest(table[column], new[column])
+        return case((or_(activated.is_(None), latest >= activated), latest), else_=None)
+
+    return stmt.on_conflict_do_update(
+        index_elements=[ActiveAlarm.connector_id, ActiveAlarm.event_id],
+        set_={
+            "area": new.area,
+            "equipment": new.equipment,
+            "alarm_type": new.alarm_type,
+            "isa_priority": new.isa_priority,
+            "activated_at": activated,
+            "acked_at": since_activation("acked_at"),
+            "cleared_at": since_activation("cleared_at"),
+            "updated_at": new.updated_at,
+        },
+    )
+
+
+async def upsert_active_alarms(states: list[dict[str, Any]]) -> None:
+    """Write coalesced alarm states in batches, in one transaction."""
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            **state,
+            "activated_at": _utc(state.get("activated_at")),
+            "acked_at": _utc(state.get("acked_at")),
+            "cleared_at": _utc(state.get("cleared_at")),
+            "updated_at": now,
+        }
+        for state in states
+    ]
+    batch = max(1, settings.ACTIVE_ALARM_UPSERT_BATCH)
+    async with async_session() as session:
+        for i in range(0, len(rows), batch):
+            await session.execute(_active_alarm_upsert(rows[i:i + batch]))
+        await session.commit()
+
+
+async def prune_active_alarms(retention_hours: float) -> int:
+    """Delete cleared alarms (and orphan ack/clear rows) past retention."""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=retention_hours)
+    stmt = delete(ActiveAlarm).where(
+        or_(
+            ActiveAlarm.cleared_at < cutoff,
+            and_(ActiveAlarm.activated_at.is_(None), ActiveAlarm.updated_at < cutoff),
+        )
+    )
+    async with async_session() as session:
+        result = await session.execute(stmt)
+        await session.commit()
+        return result.rowcount or 0
+
+
+async def load_standing_alarms(min_age_hours: float = 0, limit: int | None = None) -> list[ActiveAlarm]:
+    """Alarms activated and not yet cleared, oldest first."""
+    stmt = select(ActiveAlarm).where(ActiveAlarm.activated_at.is_not(None), ActiveAlarm.cleared_at.is_(None))
+    if min_age_hours:
+        stmt = stmt.where(ActiveAlarm.activated_at < datetime.now(timezone.utc) - timedelta(hours=min_age_hours))
+    stmt = stmt.order_by(ActiveAlarm.activated_at)
+    if limit:
+        stmt = stmt.limit(limit)
+    async with async_session() as session:
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+
+async def merge_hourly_sketches(sketches: dict[int, SpaceSaving]) -> None:
+    """Merge per-hour heavy-hitter sketches into the stored ones.
+
+    Read-merge-write under a row lock, one transaction for all hours.
+    """
+    now = datetime.now(timezone.utc)
+    hours = {_utc(hour): sketch for hour, sketch in sketches.items()}
+    async with async_session() as session:
+        result = await session.execute(
+            select(HeavyHitterSketch)
+            .where(HeavyHitterSketch.bucket_start.in_(list(hours)))
+            .with_for_update()
+        )
+        stored = {row.bucket_start: row for row in result.scalars().all()}
+        for bucket_start, sketch in hours.items():
+            row = stored.get(bucket_start)
+            if row is not None:
+                merged = SpaceSaving.from_dict(row.sketch, sketch.capacity)
+                merged.merge(sketch)
+                row.sketch = merged.to_dict()
+                row.total = merged.total
+                row.updated_at = now
+            else:
+                session.add(HeavyHitterSketch(
+                    bucket_start=bucket_start, total=sketch.total, sketch=sketch.to_dict(), updated_at=now
+                ))
+        await session.commit()
+
+
+async def load_hourly_sketches(start: datetime, end: datetime) -> list[SpaceSaving]:
+    """Stored hourly sketches for hours starting in [start, end)."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(HeavyHitterSketch.sketch)
+            .where(HeavyHitterSketch.bucket_start >= start, HeavyHitterSketch.bucket_start < end)
+        )
+        return [SpaceSaving.from_dict(data) for data in result.scalars().all()]
+
+
+async def replace_hourly_sketches(start: int, end: int, sketches: dict[int, dict[str, Any]]) -> None:
+    """Replace the stored sketches for hours in [start, end) (backfill).
+
+    `sketches` maps hour start to SpaceSaving.to_dict() output.
+    """
+    now = datetime.now(timezone.utc)
+    async with async_session() as session:
+        await session.execute(
+            delete(HeavyHitterSketch)
+            .where(HeavyHitterSketch.bucket_start >= _utc(start), HeavyHitterSketch.bucket_start < _utc(end))
+        )
+        for hour, data in sketches.items():
+            session.add(HeavyHitterSketch(
+                bucket_start=_utc(hour), total=data["total"], sketch=data, updated_at=now
+            ))
+        await session.commit()
+
+
+# ---------------------------------------------------------------------------
+# Alarm count rollups
+#
+# Counter keys are (bucket_start epoch seconds, connector_id, area,
+# isa_priority, severity, event_type).
+# ---------------------------------------------------------------------------
+
+ROLLUP_BATCH = 2000
+
+
+def _rollup_rows(counts: dict[tuple, int]) -> list[dict[str, Any]]:
+    return [
+        {
+            "bucket_start": _utc(bucket),
+            "connector_id": connector_id,
+            "area": area,
+            "isa_priority": isa_priority,
+            "severity": severity,
+            "event_type": event_type,
+            "count": count,
+        }
+        for (bucket, connector_id, area, isa_priority, severity, event_type), count in counts.items()
+    ]
+
+
+async def _upsert_rollups(session: AsyncSession, model, counts: dict[tuple, int], additive: bool) -> None:
+    rows = _rollup_rows(counts)
+    for i in range(0, len(rows), ROLLUP_BATCH):
+        stmt = pg_insert(model).values(rows[i:i + ROLLUP_BATCH])
+        count = model.__table__.c.count + stmt.excluded.count if additive else stmt.excluded.count
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["bucket_start", "connector_id", "area", "isa_priority", "severity", "event_type"],
+            set_={"count": count},
+        )
+        await session.execute(stmt)
+
+
+async def _mark_dirty_hours(session: AsyncSession, hours: set[int]) -> None:
+    if hours:
+        stmt = pg_insert(AnalysisDirtyHour).values([{"bucket_start": _utc(h)} for h in sorted(hours)])
+        await session.execute(stmt.on_conflict_do_nothing())
+
+
+async def add_rollup_counts(counts_10m: dict[tuple, int], counts_1h: dict[tuple, int]) -> None:
+    """Add live ingestion counts to both rollup tables in one transaction.
+
+    Hours before the current one are marked dirty so incremental KPIs that
+    already processed them recompute (late events, connector backlogs).
+    Listeners on INGEST_NOTIFY_CHANNEL (the backend's dashboard push) are
+    notified on commit.
+    """
+    current_hour = int(time.time()) // 3600 * 3600
+    async with async_session() as session:
+        await _upsert_rollups(session, AlarmCount10m, counts_10m, additive=True)
+        await _upsert_rollups(session, AlarmCount1h, counts_1h, additive=True)
+        await _mark_dirty_hours(session, {key[0] for key in counts_1h if key[0] < current_hour})
+        if settings.INGEST_NOTIFY_CHANNEL:
+            await session.execute(
+                select(func.pg_notify(settings.INGEST_NOTIFY_CHANNEL, str(sum(counts_10m.values()))))
+            )
+        await session.commit()
+
+
+async def replace_rollup_counts(
+    start: int, end: int, counts_10m: dict[tuple, int], counts_1h: dict[tuple, int]
+) -> None:
+    """Replace both rollup tables over [start, end) (whole hours)."""
+    start_dt, end_dt = _utc(start), _utc(end)
+    async with async_session() as session:
+        for model in (AlarmCount10m, AlarmCount1h):
+            await session.execute(
+                delete(model).where(model.bucket_start >= start_dt, model.bucket_start < end_dt)
+            )
+        await _upsert_rollups(session, AlarmCount10m, counts_10m, additive=False)
+        await _upsert_rollups(session, AlarmCount1h, counts_1h, additive=False)
+        await _mark_dirty_hours(session, set(range(start, end, 3600)))
+        await session.commit()
+
+
+async def load_rollup_series(
+    start: int, end: int, by: str, event_type: str | None = "active", hourly: bool = False
+) -> list[tuple[datetime, str, int]]:
+    """(bucket_start, <by> value, count) rows for buckets in [start, end)."""
+    model = AlarmCount1h if hourly else AlarmCount10m
+    column = getattr(model, by)
+    stmt = (
+        select(model.bucket_start, column, func.sum(model.count))
+        .where(model.bucket_start >= _utc(start), model.bucket_start < _utc(end))
+        .group_by(model.bucket_start, column)
+    )
+    if event_type:
+        stmt = stmt.where(model.event_type == event_type)
+    async with async_session() as session:
+        result = await session.execute(stmt)
+        return [(bucket, value, int(count)) for bucket, value, count in result.all()]
+
+
+async def load_priority_counts(start: int, end: int) -> list[tuple[datetime, str, str, str, int]]:
+    """Activation counts for hours in [start, end) per (week, area, connector_id, isa_priority).
+
+    Weeks start on Monday 00:00 UTC; the first and last week may be partial.
+    """
+    week = func.date_trunc("week", func.timezone("UTC", AlarmCount1h.bucket_start))
+    stmt = (
+        select(week, AlarmCount1h.area, AlarmCount1h.connector_id, AlarmCount1h.isa_priority, func.sum(AlarmCount1h.count))
+        .where(
+            AlarmCount1h.bucket_start >= _utc(start),
+            AlarmCount1h.bucket_start < _utc(end),
+            AlarmCount1h.event_type == "active",
+        )
+        .group_by(week, AlarmCount1h.area, AlarmCount1h.connector_id, AlarmCount1h.isa_priority)
+    )
+    async with async_session() as session:
+        result = await session.execute(stmt)
+        return [
+            (week_start.replace(tzinfo=timezone.utc), area, connector_id, priority, int(count))
+            for week_start, area, connector_id, priority, count in result.all()
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Incremental analysis state
+# ---------------------------------------------------------------------------
+
+async def load_watermark(kpi: str) -> int | None:
+    """End of the last hour processed for a KPI (epoch seconds), if any."""
+    async with async_session() as session:
+        row = await session.get(AnalysisWatermark, kpi)
+        return int(row.watermark.timestamp()) if row else None
+
+
+async def save_watermark(kpi: str, watermark: int) -> None:
+    stmt = pg_insert(AnalysisWatermark).values(
+        kpi=kpi, watermark=_utc(watermark), updated_at=datetime.now(timezone.utc)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[AnalysisWatermark.kpi],
+        set_={"watermark": stmt.excluded.watermark, "updated_at": stmt.excluded.updated_at},
+    )
+    async with async_session() as session:
+        await session.execute(stmt)
+        await session.commit()
+
+
+async def claim_dirty_hours(before: int, limit: int) -> list[int]:
+    """Atomically take the oldest dirty-hour marks before `before` (epoch seconds).
+
+    The marks are deleted as they are read (DELETE ... RETURNING), so an
+    hour re-marked by ingestion while the caller recomputes it keeps its
+    new mark for the next run.
+    """
+    oldest = (
+        select(AnalysisDirtyHour.bucket_start)
+        .where(AnalysisDirtyHour.bucket_start < _utc(before))
+        .order_by(AnalysisDirtyHour.bucket_start)
+        .limit(limit)
+    )
+    async with async_session() as session:
+        result = await session.execute(
+            delete(AnalysisDirtyHour)
+            .where(AnalysisDirtyHour.bucket_start.in_(oldest.scalar_subquery()))
+            .returning(AnalysisDirtyHour.bucket_start)
+        )
+        hours = sorted(int(ts.timestamp()) for ts in result.scalars().all())
+        await session.commit()
+    return hours
+
+
+async def restore_dirty_hours(hours: list[int]) -> None:
+    """Put back claimed marks whose recompute did not complete."""
+    async with async_session() as session:
+        await _mark_dirty_hours(session, set(hours))
+        await session.commit()
+
+
+async def replace_hourly_kpis(start: int, end: int, rows: list[dict[str, Any]]) -> None:
+    """Replace the stored hourly KPI rows for hours in [start, end)."""
+    async with async_session() as session:
+        await session.execute(
+            delete(HourlyKPI).where(HourlyKPI.bucket_start >= _utc(start), HourlyKPI.bucket_start < _utc(end))
+        )
+        for i in range(0, len(rows), ROLLUP_BATCH):
+            await session.execute(
+                pg_insert(HourlyKPI).values(
+                    [{**row, "bucket_start": _utc(row["bucket_start"])} for row in rows[i:i + ROLLUP_BATCH]]
+                )
+            )
+        await session.commit()
+
+
+async def load_hourly_kpis(start: int, end: int) -> list[HourlyKPI]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(HourlyKPI).where(HourlyKPI.bucket_start >= _utc(start), HourlyKPI.bucket_start < _utc(end))
+        )
+        return list(result.scalars().all())
+
+
+# ---------------------------------------------------------------------------
+# Alarm lifecycles and periodic reports
+# ---------------------------------------------------------------------------
+
+async def save_lifecycles(alarms: list[dict[str, Any]]) -> None:
+    """Insert completed alarm lifecycles (an instance already stored is kept)."""
+    rows = [
+        {
+            **alarm,
+            "activated_at": _utc(alarm["activated_at"]),
+            "acked_at": _utc(alarm["acked_at"]),
+            "cleared_at": _utc(alarm["cleared_at"]),
+        }
+        for alarm in alarms
+    ]
+    async with async_session() as session:
+        for i in range(0, len(rows), ROLLUP_BATCH):
+            await session.execute(pg_insert(AlarmLifecycle).values(rows[i:i + ROLLUP_BATCH]).on_conflict_do_nothing())
+        await session.commit()
+
+
+async def save_report(kind: str, start: int, end: int, result: Any) -> None:
+    """Store the latest result of one periodic ISA-18.2 analysis."""
+    stmt = pg_insert(ISA182Report).values(
+        kind=kind,
+        window_start=_utc(start),
+        window_end=_utc(end),
+        result=result,
+        computed_at=datetime.now(timezone.utc),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ISA182Report.kind],
+        set_={col: stmt.excluded[col] for col in ("window_start", "window_end", "result", "computed_at")},
+    )
+    async with async_session() as session:
+        await session.execute(stmt)
+        await session.commit()
@@ -0,0 +1,181 @@
+"""Loki query access for the signal-service analyzers."""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator
+
+import httpx
+
+from config import settings
+from normalizer.schema import AlarmRecord
+
+logger = logging.getLogger("signal-service.loki")
+
+
+def parse_time(value: str | int | float | datetime) -> float:
+    """Parse RFC3339, unix seconds or unix nanoseconds into epoch seconds."""
+    if isinstance(value, datetime):
+        dt = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        try:
+            seconds = float(value)
+        except ValueError:
+            dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            return parse_time(dt)
+    # Loki accepts nanosecond epochs too
+    return seconds / 1e9 if seconds > 1e12 else seconds
+
+
+def split_range(start: float, end: float, shard_seconds: float, align: float) -> list[tuple[float, float]]:
+    """Split [start, end) into consecutive shards whose edges are step-aligned."""
+    shard_seconds = max(align, (shard_seconds // align) * align)
+    shards = []
+    cursor = start
+    while cursor < end:
+        shard_end = min(end, cursor + shard_seconds)
+        shards.append((cursor, shard_end))
+        cursor = shard_end
+    return shards
+
+
+class LokiQueryClient:
+    """Async LogQL query client with bounded parallel range sharding."""
+
+    def __init__(self, base_url: str | None = None):
+        self.base_url = (base_url or settings.LOKI_URL).rstrip("/")
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=settings.LOKI_QUERY_TIMEOUT_SECONDS)
+            self._semaphore = asyncio.Semaphore(max(1, settings.LOKI_MAX_PARALLEL_QUERIES))
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+    async def query_instant(self, query: str, time: float, **params: Any) -> dict[str, Any]:
+        """Run one instant (metric) query evaluated at `time`."""
+        client = self._http()
+        request = {"query": query, "time": str(int(time * 1e9)), **params}
+        assert self._semaphore is not None
+        async with self._semaphore:
+            resp = await client.get(f"{self.base_url}/loki/api/v1/query", params=request)
+        resp.raise_for_status()
+        return resp.json().get("data", {})
+
+    async def query_range(self, query: str, start: float, end: float, step: int | None = None, **params: Any) -> dict[str, Any]:
+        """Run one query_range request (bounded by LOKI_MAX_PARALLEL_QUERIES)."""
+        if step is not None:
+            params["step"] = step
+        return await self._query_range_ns(query, int(start * 1e9), int(end * 1e9), **params)
+
+    async def _query_range_ns(self, query: str, start_ns: int, end_ns: int, **params: Any) -> dict[str, Any]:
+        # Integer nanoseconds: float seconds cannot represent them exactly
+        client = self._http()
+        request = {"query": query, "start": str(start_ns), "end": str(end_ns), **params}
+        assert self._semaphore is not None
+        async with self._semaphore:
+            resp = await client.get(f"{self.base_url}/loki/api/v1/query_range", params=request)
+        resp.raise_for_status()
+        return resp.json().get("data", {})
+
+    async def query_matrix(
+        self,
+        query: str,
+        start: float,
+        end: float,
+        step: int,
+        shard_seconds: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """Run a metric query over [start, end] in parallel time shards.
+
+        Evaluation timestamps are start, start+step, ... <= end. Shards split
+        on step boundaries so no timestamp is evaluated twice. Returns the
+        merged matrix: one {"metric", "values"} entry per series, in time
+        order.
+        """
+        shard_seconds = shard_seconds or settings.LOKI_SHARD_SECONDS
+        shards = split_range(start, end + step, shard_seconds, step)
+        results = await asyncio.gather(
+            *(self.query_range(query, s, e - step, step=step) for s, e in shards)
+        )
+
+        merged: dict[tuple, dict[str, Any]] = {}
+        for data in results:
+            for series in data.get("result", []):
+                key = tuple(sorted(series.get("metric", {}).items()))
+                entry = merged.setdefault(key, {"metric": series.get("metric", {}), "values": []})
+                entry["values"].extend(series.get("values", []))
+        return list(merged.values())
+
+    async def iter_entries(
+        self,
+        query: str,
+        start: float,
+        end: float,
+        page_size: int | None = None,
+    ) -> AsyncIterator[list[tuple[dict[str, str], str, str]]]:
+        """Page through a log query in time order.
+
+        Yields pages of (labels, timestamp_ns, line) sorted by timestamp.
+        Each page resumes at the last timestamp seen (Loki's start is
+        inclusive); entries already yielded at that exact timestamp are
+        skipped so nothing is duplicated or lost at page boundaries.
+        """
+        page_size = page_size or settings.LOKI_QUERY_PAGE_SIZE
+        start_ns = int(start * 1e9)
+        end_ns = int(end * 1e9)
+        boundary: set[tuple] = set()
+        while start_ns < end_ns:
+            data = await self._query_range_ns(query, start_ns, end_ns, limit=page_size, direction="forward")
+            entries = [
+                (series.get("stream", {}), ts, line)
+                for series in data.get("result", [])
+                for ts, line in series.get("values", [])
+            ]
+            if not entries:
+                return
+            entries.sort(key=lambda e: int(e[1]))
+
+            page = []
+            for labels, ts, line in entries:
+                key = (ts, line, tuple(sorted(labels.items())))
+                if int(ts) == start_ns and key in boundary:
+                    continue
+                page.append((labels, ts, line))
+            if page:
+                yield page
+
+            last_ns = int(entries[-1][1])
+            if len(entries) < page_size:
+                return
+            if last_ns == start_ns and not page:
+                # A full page of one timestamp was already seen; step past it
+                last_ns += 1
+            if last_ns != start_ns:
+                boundary = set()
+            boundary.update(
+                (ts, line, tuple(sorted(labels.items())))
+                for labels, ts, line in entries
+                if int(ts) == last_ns
+            )
+            start_ns = last_ns
+
+    async def iter_records(
+        self, selector: str, start: float, end: float, page_size: int | None = None
+    ) -> AsyncIterator[list[AlarmRecord]]:
+        """Page through alarm events as AlarmRecord batches in time order."""
+        async for page in self.iter_entries(selector, start, end, page_size):
+            yield [AlarmRecord.from_loki(labels, ts, line) for labels, ts, line in page]
+
+
+loki_client = LokiQueryClient()
@@ -5,6 +5,7 @@ import sys
 from apscheduler.schedulers.blocking import BlockingScheduler
 
 from config import settings
+from normalizer.batch import shutdown_pool
 from scheduler.ingestion import run_ingestion_cycle
 from scheduler.isa182_analysis import run_isa182_analysis
 
@@ -40,6 +41,7 @@ def main():
     def shutdown(signum, frame):
         logger.info("Shutting down signal-service...")
         scheduler.shutdown(wait=False)
+        shutdown_pool()
         sys.exit(0)
 
     signal.signal(signal.SIGTERM, shutdown)
@@ -1,8 +1,9 @@
 """Minimal SQLAlchemy models for signal-service — maps to same tables as backend."""
 
 from datetime import datetime
+from typing import Any
 
-from sqlalchemy import String, Integer, DateTime, JSON, Text, MetaData
+from sqlalchemy import BigInteger, String, Integer, DateTime, Float, JSON, Text, MetaData
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -27,3 +28,122 @@ class Connector(Base):
     status: Mapped[str] = mapped_column(String(50), default="disconnected")
     last_successful_pull: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class ConnectorCursor(Base):
+    __tablename__ = "connector_cursors"
+
+    connector_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    cursor: Mapped[dict] = mapped_column(JSON, default=dict)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class FloodEpisode(Base):
+    __tablename__ = "flood_episodes"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    scope: Mapped[str] = mapped_column(String(255))  # area name or "plant"
+    area: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    alarm_count: Mapped[int] = mapped_column(Integer, default=0)
+    peak_rate: Mapped[int] = mapped_column(Integer, default=0)  # alarms per 10 minutes
+    top_sources: Mapped[list] = mapped_column(JSON, default=list)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class ActiveAlarm(Base):
+    __tablename__ = "active_alarms"
+
+    connector_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    event_id: Mapped[str] = mapped_column(String(255), primary_key=True)  # vendor event id, else equipment/alarm
+    area: Mapped[str] = mapped_column(String(255), default="unknown")
+    equipment: Mapped[str] = mapped_column(String(255), default="unknown")
+    alarm_type: Mapped[str] = mapped_column(String(255), default="generic")
+    isa_priority: Mapped[str] = mapped_column(String(20), default="low")
+    activated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    acked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    cleared_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class HeavyHitterSketch(Base):
+    __tablename__ = "heavy_hitter_sketches"
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)  # hour
+    total: Mapped[int] = mapped_column(BigInteger, default=0)
+    sketch: Mapped[dict] = mapped_column(JSON, default=dict)  # SpaceSaving.to_dict()
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class AlarmCount10m(Base):
+    __tablename__ = "alarm_counts_10m"
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    connector_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    area: Mapped[str] = mapped_column(String(255), primary_key=True)
+    isa_priority: Mapped[str] = mapped_column(String(20), primary_key=True)
+    severity: Mapped[str] = mapped_column(String(50), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(20), primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class AlarmCount1h(Base):
+    __tablename__ = "alarm_counts_1h"
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    connector_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    area: Mapped[str] = mapped_column(String(255), primary_key=True)
+    isa_priority: Mapped[str] = mapped_column(String(20), primary_key=True)
+    severity: Mapped[str] = mapped_column(String(50), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(20), primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+class AnalysisWatermark(Base):
+    __tablename__ = "analysis_watermarks"
+
+    kpi: Mapped[str] = mapped_column(String(100), primary_key=True)
+    watermark: Mapped[datetime] = mapped_column(DateTime(timezone=True))  # end of last processed hour
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class AnalysisDirtyHour(Base):
+    __tablename__ = "analysis_dirty_hours"
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+
+
+class HourlyKPI(Base):
+    __tablename__ = "isa182_hourly_kpis"
+
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    scope: Mapped[str] = mapped_column(String(255), primary_key=True)  # area name or "plant"
+    alarm_count: Mapped[int] = mapped_column(Integer, default=0)
+    peak_10min: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class AlarmLifecycle(Base):
+    __tablename__ = "alarm_lifecycles"
+
+    connector_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    event_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    activated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    source: Mapped[str] = mapped_column(String(512))  # equipment/alarm_type
+    area: Mapped[str] = mapped_column(String(255), default="unknown")
+    isa_priority: Mapped[str] = mapped_column(String(20), default="low")
+    acked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    cleared_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    time_to_ack: Mapped[float | None] = mapped_column(Float, nullable=True)  # seconds
+    time_to_clear: Mapped[float | None] = mapped_column(Float, nullable=True)
+    outcome: Mapped[str] = mapped_column(String(20))  # cleared, superseded, timed_out
+
+
+class ISA182Report(Base):
+    __tablename__ = "isa182_reports"
+
+    kind: Mapped[str] = mapped_column(String(50), primary_key=True)
+    window_start: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    window_end: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    result: Mapped[Any] = mapped_column(JSON, default=dict)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
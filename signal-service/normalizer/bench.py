@@ -0,0 +1,70 @@
+"""Benchmark batch normalization throughput by worker count.
+
+Usage (from signal-service/):
+    python -m normalizer.bench --rows 200000 --workers 0,1,2,4,8
+
+Worker count 0 is the inline path. Each run normalizes and encodes the same
+synthetic WinCC-shaped batch through normalize_rows() and reports rows/s.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from config import settings
+from normalizer import batch
+
+
+def _synthetic_rows(n: int) -> list[dict]:
+    return [
+        {
+            "MessageNumber": i,
+            "DateTime": f"26.02.2026 14:{i % 60:02d}:{i % 59:02d}",
+            "AlarmText": f"Motor MU_{i % 500:03d} overtemperature",
+            "Class": ("Error", "Warning", "Fault")[i % 3],
+            "Priority": i % 16,
+            "Unit": f"UNIT_{i % 40}",
+            "Tag": f"M{i % 500:03d}_TEMP",
+            "State": ("COME", "GO", "ACK")[i % 3],
+            "ProcessValue": 80.0 + (i % 100) / 10,
+            "Limit": 80.0,
+            "EventId": f"WCC-{i}",
+        }
+        for i in range(n)
+    ]
+
+
+async def _run(rows: list[dict], workers: int, repeat: int) -> float:
+    settings.NORMALIZER_WORKERS = workers
+    batch.shutdown_pool()
+    # Warm the pool so worker spawn time is not measured
+    await batch.normalize_rows("wincc", {}, "bench", "bench", rows[: settings.NORMALIZER_POOL_MIN_BATCH * max(1, workers)])
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = await batch.normalize_rows("wincc", {}, "bench", "bench", rows)
+        assert len(result.ok) == len(rows)
+    return len(rows) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", default=",".join(str(w) for w in (0, 1, 2, 4, os.cpu_count() or 1)))
+    args = parser.parse_args()
+
+    rows = _synthetic_rows(args.rows)
+    worker_counts = sorted({int(w) for w in args.workers.split(",")})
+    print(f"{args.rows} rows x {args.repeat}, {os.cpu_count()} CPU(s)")
+    baseline = None
+    for workers in worker_counts:
+        rate = asyncio.run(_run(rows, workers, args.repeat))
+        baseline = baseline or rate
+        label = "inline" if workers == 0 else f"{workers} worker(s)"
+        print(f"  {label:>12}: {rate:>10,.0f} rows/s  ({rate / baseline:.2f}x)")
+    batch.shutdown_pool()
+
+
+if __name__ == "__main__":
+    main()
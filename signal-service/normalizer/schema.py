@@ -1,5 +1,6 @@
+import json
 from datetime import datetime
-from typing import Any
+from typing import Any, NamedTuple
 
 from pydantic import BaseModel
 
@@ -28,6 +29,48 @@ class AlarmMetadata(BaseModel):
     shelved: bool = False
 
 
+class AlarmRecord(NamedTuple):
+    """Compact per-event view used by the streaming analyzers.
+
+    Small enough to return from normalizer worker processes alongside the
+    encoded push bodies, and rebuildable from Loki entries for historical
+    runs.
+    """
+    timestamp: float  # epoch seconds
+    area: str
+    equipment: str
+    alarm_type: str
+    event_type: str
+    isa_priority: str
+    event_id: str
+    connector_id: str
+    severity: str = "info"
+
+    @property
+    def point(self) -> str:
+        """Alarm source key: the equipment tag plus the alarm on it."""
+        return f"{self.equipment}/{self.alarm_type}"
+
+    @classmethod
+    def from_loki(cls, labels: dict[str, str], timestamp_ns: str | int, line: str) -> "AlarmRecord":
+        """Rebuild a record from a Loki stream label set and log entry."""
+        try:
+            event_id = str(json.loads(line).get("event_id", ""))
+        except (ValueError, AttributeError):
+            event_id = ""
+        return cls(
+            timestamp=int(timestamp_ns) / 1_000_000_000,
+            area=labels.get("area", "unknown"),
+            equipment=labels.get("equipment", "unknown"),
+            alarm_type=labels.get("alarm_type", "generic"),
+            event_type=labels.get("event_type", "active"),
+            isa_priority=labels.get("isa_priority", "low"),
+            event_id=event_id,
+            connector_id=labels.get("connector_id", ""),
+            severity=labels.get("severity", "info"),
+        )
+
+
 class CanonicalAlarmEvent(BaseModel):
     """Canonical alarm event schema — all vendor alarms normalize to this."""
     timestamp: datetime
@@ -44,3 +87,16 @@ class CanonicalAlarmEvent(BaseModel):
             "metadata": self.metadata.model_dump(),
             "timestamp_ns": int(self.timestamp.timestamp() * 1_000_000_000),
         }
+
+    def to_record(self) -> AlarmRecord:
+        return AlarmRecord(
+            timestamp=self.timestamp.timestamp(),
+            area=self.labels.area,
+            equipment=self.labels.equipment,
+            alarm_type=self.labels.alarm_type,
+            event_type=self.labels.event_type,
+            isa_priority=self.labels.isa_priority,
+            event_id=self.metadata.event_id,
+            connector_id=self.labels.connector_id,
+            severity=self.labels.severity,
+        )
@@ -1,6 +1,6 @@
 import logging
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Callable
 
 from normalizer.schema import CanonicalAlarmEvent, AlarmLabels, AlarmMetadata
 
@@ -12,6 +12,132 @@ EVENT_TYPE_MAP = {0: "active", 1: "clear", 2: "ack"}
 # Ignition priority int → ISA severity
 PRIORITY_MAP = {0: "diagnostic", 1: "low", 2: "medium", 3: "high", 4: "critical"}
 
+# Vendor state text → canonical event type (mapped connectors)
+STATE_EVENT_TYPES = {
+    "active": "active", "come": "active", "unacknowledged": "active", "unack": "active",
+    "alarm": "active", "raised": "active", "in": "active",
+    "ack": "ack", "acked": "ack", "acknowledged": "ack", "quit": "ack",
+    "clear": "clear", "cleared": "clear", "go": "clear", "inactive": "clear",
+    "normal": "clear", "rtn": "clear", "reset": "clear", "out": "clear",
+}
+
+# Non-ISO timestamp formats seen in vendor exports
+TIMESTAMP_FORMATS = (
+    "%d.%m.%Y %H:%M:%S.%f",  # WinCC
+    "%d.%m.%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S.%f",  # Plant SCADA (regional)
+    "%d/%m/%Y %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S",
+)
+
+# ---------------------------------------------------------------------------
+# Default field mappings per vendor — mirrors backend app/api/transform.py so
+# the saved per-connector overrides from the Transform page apply unchanged.
+# ---------------------------------------------------------------------------
+
+DEFAULT_MAPPINGS: dict[str, dict[str, str]] = {
+    "ignition": {
+        "timestamp_field": "eventtime",
+        "message_field": "displaypath",
+        "severity_field": "priority",
+        "area_field": "displaypath",
+        "equipment_field": "source",
+        "alarm_type_field": "name",
+        "state_field": "eventtype_label",
+        "value_field": "eventValue",
+        "priority_field": "priority",
+        "vendor_id_field": "eventid",
+    },
+    "factorytalk": {
+        "timestamp_field": "TimeStamp",
+        "message_field": "Description",
+        "severity_field": "Severity",
+        "area_field": "Area",
+        "equipment_field": "TagName",
+        "alarm_type_field": "AlarmName",
+        "state_field": "State",
+        "value_field": "Value",
+        "threshold_field": "Limit",
+        "priority_field": "Priority",
+        "vendor_id_field": "EventID",
+        "event_id_field": "AlarmId",
+    },
+    "wincc": {
+        "timestamp_field": "DateTime",
+        "message_field": "AlarmText",
+        "severity_field": "Class",
+        "area_field": "Unit",
+        "equipment_field": "Tag",
+        "alarm_type_field": "Class",
+        "state_field": "State",
+        "value_field": "ProcessValue",
+        "threshold_field": "Limit",
+        "priority_field": "Priority",
+        "vendor_id_field": "EventId",
+        "event_id_field": "AlarmKey",
+    },
+    "plant_scada": {
+        "timestamp_field": "Time",
+        "message_field": "Description",
+        "severity_field": "Category",
+        "area_field": "Area",
+        "equipment_field": "Equipment",
+        "alarm_type_field": "Tag",
+        "state_field": "State",
+        "value_field": "Value",
+        "threshold_field": "High",
+        "priority_field": "Priority",
+        "vendor_id_field": "AlarmID",
+        "event_id_field": "AlarmKey",
+    },
+}
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    """Parse a vendor timestamp (datetime, ISO/vendor string, or epoch ms).
+
+    Naive values are taken as UTC; unparseable values fall back to now.
+    """
+    ts: datetime | None = None
+    if isinstance(value, datetime):
+        ts = value
+    elif isinstance(value, str) and value:
+        try:
+            ts = datetime.fromisoformat(value)
+        except ValueError:
+            for fmt in TIMESTAMP_FORMATS:
+                try:
+                    ts = datetime.strptime(value, fmt)
+                    break
+                except ValueError:
+                    continue
+    elif isinstance(value, (int, float)) and value > 0:
+        ts = datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+
+    if ts is None:
+        return datetime.now(timezone.utc)
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _to_float(value: Any) -> float | None:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _severity_to_isa(severity: str) -> str:
+    """Bucket a vendor severity string into ISA low/medium/high."""
+    sev = severity.lower()
+    if sev in ("critical", "high", "fault", "error", "4", "3"):
+        return "high"
+    if sev in ("warning", "medium", "urgent", "2"):
+        return "medium"
+    return "low"
+
 
 def _extract_area(displaypath: str) -> str:
     """Extract area from Ignition displaypath (first segment)."""
@@ -47,20 +173,7 @@ def normalize_ignition_alarm(raw: dict[str, Any], connector_id: str, source: str
       - eventValue: alarm value (from event_data)
     """
     # Parse timestamp — Ignition 8.3+ sends TIMESTAMPTZ, older sends epoch ms
-    eventtime = raw.get("eventtime")
-    if isinstance(eventtime, datetime):
-        ts = eventtime if eventtime.tzinfo else eventtime.replace(tzinfo=timezone.utc)
-    elif isinstance(eventtime, str):
-        try:
-            ts = datetime.fromisoformat(eventtime)
-            if ts.tzinfo is None:
-                ts = ts.replace(tzinfo=timezone.utc)
-        except ValueError:
-            ts = datetime.now(timezone.utc)
-    elif isinstance(eventtime, (int, float)) and eventtime > 0:
-        ts = datetime.fromtimestamp(eventtime / 1000, tz=timezone.utc)
-    else:
-        ts = datetime.now(timezone.utc)
+    ts = _parse_timestamp(raw.get("eventtime"))
 
     # Map integer fields
     priority_int = raw.get("priority", 4)
@@ -78,13 +191,7 @@ def normalize_ignition_alarm(raw: dict[str, Any], connector_id: str, source: str
     alarm_name = str(raw.get("name", raw.get("eventtype_label", "unknown")))
 
     # Parse value
-    event_value = raw.get("eventValue")
-    value_float = None
-    if event_value is not None and event_value != "":
-        try:
-            value_float = float(event_value)
-        except (ValueError, TypeError):
-            pass
+    value_float = _to_float(raw.get("eventValue"))
 
     return CanonicalAlarmEvent(
         timestamp=ts,
@@ -110,3 +217,89 @@ def normalize_ignition_alarm(raw: dict[str, Any], connector_id: str, source: str
             shelved=False,
         ),
     )
+
+
+def resolve_mapping(connector_type: str, label_mappings: dict[str, Any] | None) -> dict[str, str]:
+    """Merge a connector's saved field mapping over the vendor defaults.
+
+    Keys starting with "_" (e.g. _export_enabled) are settings, not fields.
+    """
+    saved = {k: v for k, v in (label_mappings or {}).items() if not k.startswith("_")}
+    return {**DEFAULT_MAPPINGS.get(connector_type, {}), **saved}
+
+
+def normalize_mapped_alarm(
+    raw: dict[str, Any],
+    mapping: dict[str, str],
+    connector_id: str,
+    source: str,
+) -> CanonicalAlarmEvent:
+    """Transform a vendor alarm record into canonical form via a field mapping.
+
+    Used by every connector except Ignition, which has a dedicated journal
+    normalizer. The mapping has the same shape as DEFAULT_MAPPINGS entries.
+    """
+
+    def get(key: str, default: Any = None) -> Any:
+        field_name = mapping.get(key)
+        if not field_name:
+            return default
+        value = raw.get(field_name, default)
+        return default if value is None else value
+
+    severity = str(get("severity_field", "info")).lower()
+    isa_priority = _severity_to_isa(severity)
+    state = str(get("state_field", "active"))
+    event_type = STATE_EVENT_TYPES.get(state.strip().lower(), "active")
+    alarm_name = str(get("alarm_type_field", "generic"))
+
+    try:
+        priority_int = int(get("priority_field", 4))
+    except (ValueError, TypeError):
+        priority_int = 4
+
+    vendor_id = str(get("vendor_id_field", ""))
+    # Key shared by all transitions of one alarm; defaults to the vendor id
+    event_id = str(get("event_id_field", vendor_id))
+    ack_user = str(get("ack_user_field", ""))
+
+    return CanonicalAlarmEvent(
+        timestamp=_parse_timestamp(get("timestamp_field")),
+        labels=AlarmLabels(
+            source=source,
+            severity=severity,
+            area=str(get("area_field", "unknown")) or "unknown",
+            equipment=str(get("equipment_field", "unknown")) or "unknown",
+            alarm_type=alarm_name,
+            connector_id=connector_id,
+            isa_priority=isa_priority,
+            event_type=event_type,
+        ),
+        message=str(get("message_field", "")) or alarm_name,
+        metadata=AlarmMetadata(
+            value=_to_float(get("value_field")),
+            threshold=_to_float(get("threshold_field")),
+            state=event_type.upper(),
+            priority=priority_int,
+            vendor_alarm_id=vendor_id,
+            event_id=event_id,
+            ack_user=ack_user,
+            ack_required=True,
+            shelved=False,
+        ),
+    )
+
+
+def get_normalizer(
+    connector_type: str,
+    label_mappings: dict[str, Any] | None = None,
+) -> Callable[[dict[str, Any], str, str], CanonicalAlarmEvent]:
+    """Return the normalizer for a connector type.
+
+    The returned callable takes (raw, connector_id, source) like
+    normalize_ignition_alarm.
+    """
+    if connector_type == "ignition":
+        return normalize_ignition_alarm
+    mapping = resolve_mapping(connector_type, label_mappings)
+    return lambda raw, connector_id, source: normalize_mapped_alarm(raw, mapping, connector_id, source)
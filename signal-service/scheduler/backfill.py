@@ -0,0 +1,285 @@
+"""Parallel historical backfill / recompute of ISA-18.2 KPIs.
+
+Splits [start, end) into day shards and, for each shard:
+  - rollups:    replaces the 10-minute/hourly count rollups from Loki
+  - alarm_rate: recomputes the stored hourly alarm rate KPIs
+  - floods:     replays activations through the flood detector and
+                replaces the day's flood episodes
+  - bad_actors: rebuilds the day's hourly heavy-hitter sketches
+
+Loki requests from all shards share LOKI_MAX_PARALLEL_QUERIES slots; the
+CPU-bound part (flood detection and sketching) runs in a process pool, so
+fetching one shard overlaps with analysing others. Completed shards are
+recorded in a checkpoint file, and re-running the same command resumes
+where it stopped.
+
+Usage (from signal-service/):
+    python -m scheduler.backfill --start 2026-06-01 --end 2026-10-01 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any
+
+from analyzers.flooding import FloodDetector
+from analyzers.incremental import AlarmRateKPI
+from analyzers.isa182 import ACTIVE_SELECTOR, ISA182Analyzer
+from analyzers.rollups import counts_from_loki, hourly_from_10m
+from analyzers.sketches import SpaceSaving
+from config import settings
+from db import replace_flood_episodes, replace_hourly_sketches, replace_rollup_counts
+from loki import loki_client, parse_time
+from normalizer.schema import AlarmRecord
+
+logger = logging.getLogger("signal-service.backfill")
+
+DAY_SECONDS = 86400
+HOUR_SECONDS = 3600
+ALL_KPIS = ("rollups", "alarm_rate", "floods", "bad_actors")
+
+# Floods that start in a shard are followed past its end (up to this long)
+# so an episode spanning midnight is recorded whole by the shard it began in
+FLOOD_TAIL_SECONDS = 3600
+
+
+# ---------------------------------------------------------------------------
+# Worker side (runs in the process pool)
+# ---------------------------------------------------------------------------
+
+def analyze_shard(
+    shard_start: int,
+    shard_end: int,
+    timestamps: list[float],
+    areas: list[str],
+    sources: list[str],
+    params: dict[str, Any],
+) -> dict[str, Any]:
+    """Flood episodes and hourly bad-actor sketches for one shard.
+
+    Inputs are the shard's activations in time order (including the
+    warm-up before and tail after the shard), as parallel columns.
+    """
+    result: dict[str, Any] = {}
+
+    if params.get("floods"):
+        detector = FloodDetector(threshold=params["flood_threshold"], window_seconds=params["flood_window"])
+        chunk = 5000
+        for i in range(0, len(timestamps), chunk):
+            detector.observe([
+                AlarmRecord(ts, area, *source.split("/", 1), "active", "", "", "")
+                for ts, area, source in zip(timestamps[i:i + chunk], areas[i:i + chunk], sources[i:i + chunk])
+            ])
+        detector.close_all()
+        result["floods"] = [ep for ep in detector.drain() if shard_start <= ep["start"] < shard_end]
+
+    if params.get("bad_actors"):
+        hourly: dict[int, Counter] = defaultdict(Counter)
+        for ts, source in zip(timestamps, sources):
+            if shard_start <= ts < shard_end:
+                hourly[int(ts // HOUR_SECONDS) * HOUR_SECONDS][source] += 1
+        sketches = {}
+        for hour, counts in hourly.items():
+            sketch = SpaceSaving(params["sketch_capacity"])
+            sketch.update(counts)
+            sketches[hour] = sketch.to_dict()
+        result["sketches"] = sketches
+
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Coordinator
+# ---------------------------------------------------------------------------
+
+class Checkpoint:
+    """Completed shard starts for one (range, kpis) backfill, saved atomically."""
+
+    def __init__(self, path: str, start: int, end: int, kpis: list[str], restart: bool = False):
+        self.path = path
+        self.key = {"start": start, "end": end, "kpis": sorted(kpis)}
+        self.done: set[int] = set()
+        if not restart and os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("key") == self.key:
+                self.done = set(data.get("done", []))
+            else:
+                logger.warning(f"Checkpoint {path} is for a different backfill — starting over")
+
+    def mark(self, shard_start: int) -> None:
+        self.done.add(shard_start)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"key": self.key, "done": sorted(self.done)}, f)
+        os.replace(tmp, self.path)
+
+
+class Progress:
+    def __init__(self, total: int):
+        self.total = total
+        self.completed = 0
+        self.events = 0
+        self.started = time.monotonic()
+
+    def shard_done(self, shard_start: int, events: int, floods: int) -> None:
+        self.completed += 1
+        self.events += events
+        elapsed = time.monotonic() - self.started
+        rate = self.completed / elapsed if elapsed else 0.0
+        eta = (self.total - self.completed) / rate if rate else 0.0
+        logger.info(
+            f"[{self.completed}/{self.total}] {_day(shard_start)}: {events} activation(s), "
+            f"{floods} flood(s) — {rate * 60:.1f} shards/min, "
+            f"{self.events / elapsed if elapsed else 0:.0f} events/s, ETA {eta / 60:.1f} min"
+        )
+
+
+def _day(ts: int) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).date().isoformat()
+
+
+async def _fetch_activations(start: int, end: int) -> tuple[list[float], list[str], list[str]]:
+    """Activations in [start, end) as (timestamps, areas, sources) columns."""
+    timestamps: list[float] = []
+    areas: list[str] = []
+    sources: list[str] = []
+    async for page in loki_client.iter_entries(ACTIVE_SELECTOR, start, end):
+        for labels, ts, _line in page:
+            timestamps.append(int(ts) / 1e9)
+            areas.append(labels.get("area", "unknown"))
+            sources.append(f"{labels.get('equipment', 'unknown')}/{labels.get('alarm_type', 'generic')}")
+    return timestamps, areas, sources
+
+
+async def _backfill_shard(
+    shard_start: int,
+    shard_end: int,
+    kpis: list[str],
+    pool: ProcessPoolExecutor,
+    params: dict[str, Any],
+) -> tuple[int, int]:
+    """Recompute one shard; returns (activations analysed, flood episodes)."""
+    if "rollups" in kpis:
+        counts = await counts_from_loki(shard_start, shard_end)
+        await replace_rollup_counts(shard_start, shard_end, counts, hourly_from_10m(counts))
+    if "alarm_rate" in kpis:
+        await AlarmRateKPI().recompute(list(range(shard_start, shard_end, HOUR_SECONDS)))
+
+    if not params["floods"] and not params["bad_actors"]:
+        return 0, 0
+
+    warmup = params["flood_window"] if params["floods"] else 0
+    tail = FLOOD_TAIL_SECONDS if params["floods"] else 0
+    timestamps, areas, sources = await _fetch_activations(shard_start - warmup, shard_end + tail)
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(
+        pool, analyze_shard, shard_start, shard_end, timestamps, areas, sources, params
+    )
+
+    if params["floods"]:
+        await replace_flood_episodes(shard_start, shard_end, result["floods"])
+    if params["bad_actors"]:
+        await replace_hourly_sketches(shard_start, shard_end, result["sketches"])
+    in_shard = sum(1 for ts in timestamps if shard_start <= ts < shard_end)
+    return in_shard, len(result.get("floods", []))
+
+
+async def backfill(
+    start: str,
+    end: str,
+    kpis: list[str],
+    workers: int,
+    concurrency: int,
+    checkpoint_path: str,
+    restart: bool = False,
+) -> None:
+    start_s = int(parse_time(start)) // DAY_SECONDS * DAY_SECONDS
+    end_s = -(-int(parse_time(end)) // DAY_SECONDS) * DAY_SECONDS
+    checkpoint = Checkpoint(checkpoint_path, start_s, end_s, kpis, restart)
+    shards = [s for s in range(start_s, end_s, DAY_SECONDS) if s not in checkpoint.done]
+    skipped = (end_s - start_s) // DAY_SECONDS - len(shards)
+    logger.info(
+        f"Backfilling {', '.join(kpis)} for {_day(start_s)} .. {_day(end_s - 1)}: "
+        f"{len(shards)} day shard(s) to do" + (f", {skipped} already done" if skipped else "")
+    )
+    if not shards:
+        return
+
+    params = {
+        "floods": "floods" in kpis,
+        "bad_actors": "bad_actors" in kpis,
+        "flood_threshold": ISA182Analyzer.FLOOD_THRESHOLD,
+        "flood_window": ISA182Analyzer.FLOOD_WINDOW_SECONDS,
+        "sketch_capacity": settings.BAD_ACTOR_SKETCH_CAPACITY,
+    }
+    progress = Progress(len(shards))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    failed: list[int] = []
+
+    async def run(shard_start: int) -> None:
+        async with semaphore:
+            try:
+                events, floods = await _backfill_shard(
+                    shard_start, min(end_s, shard_start + DAY_SECONDS), kpis, pool, params
+                )
+            except Exception as exc:
+                logger.error(f"Shard {_day(shard_start)} failed: {exc}")
+                failed.append(shard_start)
+                return
+            checkpoint.mark(shard_start)
+            progress.shard_done(shard_start, events, floods)
+
+    with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn")) as pool:
+        await asyncio.gather(*(run(s) for s in shards))
+    await loki_client.close()
+
+    if failed:
+        logger.error(
+            f"{len(failed)} shard(s) failed ({', '.join(_day(s) for s in sorted(failed))}) — "
+            f"re-run the same command to retry them"
+        )
+    else:
+        logger.info(f"Backfill complete: {progress.events} activation(s) in {time.monotonic() - progress.started:.0f}s")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", required=True, help="RFC3339 or unix seconds (aligned down to the day, UTC)")
+    parser.add_argument("--end", required=True, help="RFC3339 or unix seconds (aligned up to the day, UTC)")
+    parser.add_argument("--kpis", default=",".join(ALL_KPIS), help=f"comma-separated subset of {','.join(ALL_KPIS)}")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="analysis processes")
+    parser.add_argument("--concurrency", type=int, default=0, help="shards in flight (default: 2 x workers)")
+    parser.add_argument("--max-queries", type=int, default=settings.LOKI_MAX_PARALLEL_QUERIES, help="Loki requests in flight")
+    parser.add_argument("--checkpoint", default="", help="checkpoint file (default: backfill-<start>-<end>.json)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    kpis = [k.strip() for k in args.kpis.split(",") if k.strip()]
+    unknown = set(kpis) - set(ALL_KPIS)
+    if unknown:
+        parser.error(f"unknown KPI(s): {', '.join(sorted(unknown))}")
+    settings.LOKI_MAX_PARALLEL_QUERIES = args.max_queries
+    checkpoint = args.checkpoint or f"backfill-{_day(int(parse_time(args.start)))}-{_day(int(parse_time(args.end)))}.json"
+
+    asyncio.run(backfill(
+        args.start,
+        args.end,
+        kpis,
+        workers=args.workers,
+        concurrency=args.concurrency or 2 * max(1, args.workers),
+        checkpoint_path=checkpoint,
+        restart=args.restart,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,155 +2,251 @@
 
 Data flow:
   1. Query DB for enabled connectors
-  2. For each connector, instantiate the appropriate connector class
-  3. Fetch alarm events from our Postgres journal tables
-  4. Normalize raw alarms via the transform pipeline
-  5. Push normalized alarms to Loki (only if export is enabled)
-  6. Clean up processed events from journal tables
-  7. Update connector status in DB
+  2. For each connector (concurrently), load its class from the lazy registry
+  3. Fetch a batch of alarm events from the connector's source
+     (journal tables, AllEvent, archive files, ...)
+  4. Normalize and encode the batch (inline, or in the normalizer process
+     pool when NORMALIZER_WORKERS > 0)
+  5. Push the encoded batch to Loki (only if export is enabled)
+  6. Mark pushed events processed (journal cleanup or cursor advance).
+     A cursor also advances past events Loki rejects permanently or that
+     fail to normalize, so they cannot stall the source; journal cleanup
+     deletes only pushed events and leaves the others in the journal
+  7. Repeat 3-6 while the connector has more rows, up to
+     INGESTION_MAX_BATCHES_PER_CYCLE batches
+  8. Update connector status in DB
+  9. Flush the streaming analyzers fed with every pushed batch
 """
 
 import asyncio
-import json
 import logging
 from datetime import datetime, timezone
+from typing import Any
 
 import httpx
 from sqlalchemy import select
 
+from analyzers.pipeline import build_live_pipeline
 from config import settings
-from db import async_session
+from db import async_session, evict_idle_engines
 from models import Connector
-from connectors.ignition import IgnitionConnector
-from normalizer.transform import normalize_ignition_alarm
+from connectors.registry import registry
+from normalizer.batch import NormalizedBatch, normalize_rows
 
 logger = logging.getLogger("signal-service.ingestion")
 
-# Map connector types to their implementation classes
-CONNECTOR_CLASSES = {
-    "ignition": IgnitionConnector,
-}
+_http_client: httpx.AsyncClient | None = None
 
+# Streaming ISA-18.2 detectors; state persists across ingestion cycles
+_pipeline = build_live_pipeline() if settings.STREAM_ANALYSIS_ENABLED else None
 
-async def _push_to_loki(labels: dict, message: str, metadata: dict, timestamp_ns: int) -> bool:
-    """Push a single alarm event to Loki."""
-    line = json.dumps({"message": message, **metadata})
-    payload = {
-        "streams": [
-            {
-                "stream": labels,
-                "values": [[str(timestamp_ns), line]],
-            }
-        ]
-    }
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            resp = await client.post(
-                f"{settings.LOKI_URL.rstrip('/')}/loki/api/v1/push",
-                json=payload,
-                headers={"Content-Type": "application/json"},
-            )
-            return resp.status_code == 204
-    except Exception as exc:
-        logger.warning(f"Loki push failed: {exc}")
-        return False
 
+def _get_http_client() -> httpx.AsyncClient:
+    """Shared Loki HTTP client (kept alive across ingestion cycles)."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(timeout=10.0)
+    return _http_client
 
-async def _run_ingestion():
-    """Async ingestion cycle implementation."""
-    async with async_session() as session:
-        result = await session.execute(
-            select(Connector).where(Connector.enabled == True)
-        )
-        connectors = result.scalars().all()
 
-        if not connectors:
-            logger.debug("No enabled connectors found")
+async def _push_bodies_to_loki(bodies: list[tuple[int, bytes]]) -> list[bool]:
+    """Send pre-encoded push bodies to Loki, in order.
+
+    Returns one outcome per body sent: True if Loki accepted it, False if
+    it rejected it permanently (4xx other than 429: too old, malformed,
+    over a limit...), which a retry would not change. A transient failure
+    (connection error, 429, 5xx) stops the push, so the caller only marks
+    the bodies before it as processed.
+    """
+    client = _get_http_client()
+    url = f"{settings.LOKI_URL.rstrip('/')}/loki/api/v1/push"
+    outcomes: list[bool] = []
+    for count, body in bodies:
+        try:
+            resp = await client.post(url, content=body, headers={"Content-Type": "application/json"})
+        except Exception as exc:
+            logger.warning(f"Loki push failed: {exc}")
+            break
+        if resp.status_code == 204:
+            outcomes.append(True)
+        elif 400 <= resp.status_code < 500 and resp.status_code != 429:
+            logger.warning(f"Loki push rejected {count} event(s) ({resp.status_code}): {resp.text[:200]}")
+            outcomes.append(False)
+        else:
+            logger.warning(f"Loki push failed ({resp.status_code}): {resp.text[:200]}")
+            break
+    return outcomes
+
+
+def _processed_rows(
+    raw_alarms: list[dict[str, Any]],
+    batch: NormalizedBatch,
+    outcomes: list[bool],
+    skip_failed: bool,
+) -> tuple[list[dict[str, Any]], bool]:
+    """Rows to mark processed after a push, and whether the whole batch was handled.
+
+    With skip_failed (cursor sources), rows up to the last one sent are
+    done, including rows Loki rejected and rows that failed to normalize:
+    retrying them would fail the same way and hold the cursor back
+    forever. Otherwise (journal sources that delete processed rows) only
+    rows Loki accepted are done, since deleting any other row would lose
+    it; the rest stay in the source.
+    """
+    sent = sum(count for count, _ in batch.bodies[:len(outcomes)])
+    if skip_failed:
+        if sent == len(batch.ok):
+            return raw_alarms, True
+        return (raw_alarms[:batch.ok[sent - 1] + 1] if sent else []), False
+
+    done = []
+    start = 0
+    for (count, _), ok in zip(batch.bodies, outcomes):
+        if ok:
+            done.extend(raw_alarms[i] for i in batch.ok[start:start + count])
+        start += count
+    # Re-fetching would return the same rows if none were removed
+    return done, sent == len(batch.ok) and bool(done)
+
+
+async def _poll_connector(connector_id: str, semaphore: asyncio.Semaphore) -> None:
+    """Run one fetch → normalize → push → cleanup pass for a single connector.
+
+    Each connector gets its own session so many connectors can be polled
+    concurrently without sharing ORM state.
+    """
+    async with semaphore, async_session() as session:
+        conn = await session.get(Connector, connector_id)
+        if conn is None:
+            return
+
+        if registry.get(conn.connector_type) is None:
+            logger.debug(f"Skipping '{conn.name}' — no implementation for type '{conn.connector_type}'")
             return
 
-        for conn in connectors:
-            connector_cls = CONNECTOR_CLASSES.get(conn.connector_type)
-            if not connector_cls:
-                logger.debug(f"Skipping '{conn.name}' — no implementation for type '{conn.connector_type}'")
-                continue
-
-            logger.info(f"Polling connector '{conn.name}' ({conn.connector_type})")
-
-            try:
-                config = {
-                    "host": conn.host,
-                    "port": conn.port,
-                    "credentials": conn.credentials or {},
-                    "connection_params": conn.connection_params or {},
-                }
-                connector = connector_cls(config)
-
-                # Verify journal tables
-                connected = await connector.connect()
-                if not connected:
-                    conn.status = "error"
-                    conn.error_message = "Alarm journal tables not accessible"
-                    await session.commit()
-                    continue
-
-                conn.status = "polling"
+        logger.info(f"Polling connector '{conn.name}' ({conn.connector_type})")
+
+        try:
+            # Imported on first use of this connector type
+            connector_cls = registry.load(conn.connector_type)
+            capabilities = registry.capabilities(conn.connector_type)
+            config = {
+                "id": conn.id,
+                "name": conn.name,
+                "host": conn.host,
+                "port": conn.port,
+                "credentials": conn.credentials or {},
+                "connection_params": conn.connection_params or {},
+            }
+            connector = connector_cls(config)
+
+            # Verify the alarm source is reachable
+            connected = await connector.connect()
+            if not connected:
+                conn.status = "error"
+                conn.error_message = "Alarm source not accessible"
                 await session.commit()
+                return
+
+            conn.status = "polling"
+            await session.commit()
 
-                # Fetch raw alarm events from journal tables
+            # Check if export is enabled
+            label_mappings = conn.label_mappings or {}
+            export_enabled = label_mappings.get("_export_enabled", False)
+
+            # Drain batch-capable sources while the connector reports more
+            # rows and the previous batch was fully processed.
+            max_batches = settings.INGESTION_MAX_BATCHES_PER_CYCLE if capabilities.batch_fetch else 1
+            for _ in range(max(1, max_batches)):
                 raw_alarms = await connector.fetch_alarms()
-                logger.info(f"Connector '{conn.name}': fetched {len(raw_alarms)} journal event(s)")
-
-                # Check if export is enabled
-                label_mappings = conn.label_mappings or {}
-                export_enabled = label_mappings.get("_export_enabled", False)
-
-                if raw_alarms and export_enabled:
-                    # Normalize and push to Loki
-                    pushed = 0
-                    pushed_ids: list[int] = []
-                    for raw in raw_alarms:
-                        try:
-                            event = normalize_ignition_alarm(raw, conn.id, conn.name)
-                            payload = event.to_loki_payload()
-                            ok = await _push_to_loki(
-                                labels=payload["labels"],
-                                message=payload["message"],
-                                metadata=payload["metadata"],
-                                timestamp_ns=payload["timestamp_ns"],
-                            )
-                            if ok:
-                                pushed += 1
-                                pushed_ids.append(raw["id"])
-                        except Exception as exc:
-                            logger.warning(f"Failed to normalize/push alarm: {exc}")
-
-                    logger.info(f"Connector '{conn.name}': pushed {pushed}/{len(raw_alarms)} event(s) to Loki")
-
-                    # Clean up successfully processed events
-                    if pushed_ids:
-                        deleted = await connector.cleanup_processed(pushed_ids)
-                        logger.info(f"Connector '{conn.name}': cleaned up {deleted} processed event(s)")
-
-                elif raw_alarms and not export_enabled:
+                logger.info(f"Connector '{conn.name}': fetched {len(raw_alarms)} event(s)")
+
+                if not raw_alarms:
+                    break
+
+                if not export_enabled:
                     logger.info(
                         f"Connector '{conn.name}': {len(raw_alarms)} event(s) fetched but "
                         f"export not enabled — skipping Loki push. "
                         f"Enable export on the Transform page."
                     )
+                    break
 
-                # Update status
-                conn.status = "connected"
-                conn.last_successful_pull = datetime.now(timezone.utc)
-                conn.error_message = None
-                await session.commit()
+                # Normalize + encode (inline or in the worker pool), then push
+                batch = await normalize_rows(
+                    conn.connector_type, label_mappings, conn.id, conn.name, raw_alarms
+                )
+                outcomes = await _push_bodies_to_loki(batch.bodies)
+                pushed = rejected = sent = 0
+                accepted = []
+                for (count, _), ok in zip(batch.bodies, outcomes):
+                    if ok:
+                        pushed += count
+                        accepted.extend(batch.records[sent:sent + count])
+                    else:
+                        rejected += count
+                    sent += count
+                logger.info(f"Connector '{conn.name}': pushed {pushed}/{len(raw_alarms)} event(s) to Loki")
+                if rejected or batch.errors:
+                    kept = "skipping" if capabilities.incremental_cursor else "leaving in the source"
+                    logger.warning(
+                        f"Connector '{conn.name}': {kept} {rejected} event(s) rejected by Loki "
+                        f"and {batch.errors} that failed to normalize"
+                    )
 
-                await connector.disconnect()
+                if _pipeline is not None:
+                    _pipeline.observe(accepted)
 
-            except Exception as exc:
-                logger.error(f"Error polling connector '{conn.name}': {exc}")
-                conn.status = "error"
-                conn.error_message = str(exc)[:500]
-                await session.commit()
+                done, finished = _processed_rows(
+                    raw_alarms, batch, outcomes, skip_failed=capabilities.incremental_cursor
+                )
+
+                # Clean up staged events / advance the connector's cursor
+                if done and (capabilities.delete_after_push or capabilities.incremental_cursor):
+                    processed = await connector.mark_processed(done)
+                    action = "cleaned up" if capabilities.delete_after_push else "advanced cursor past"
+                    logger.info(f"Connector '{conn.name}': {action} {processed} event(s)")
+
+                if not finished or not connector.has_more:
+                    break
+
+            # Update status
+            conn.status = "connected"
+            conn.last_successful_pull = datetime.now(timezone.utc)
+            conn.error_message = None
+            await session.commit()
+
+            await connector.disconnect()
+
+        except Exception as exc:
+            logger.error(f"Error polling connector '{conn.name}': {exc}")
+            conn.status = "error"
+            conn.error_message = str(exc)[:500]
+            await session.commit()
+
+
+async def _run_ingestion():
+    """Async ingestion cycle implementation."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(Connector.id).where(Connector.enabled == True)
+        )
+        connector_ids = list(result.scalars().all())
+
+    if not connector_ids:
+        logger.debug("No enabled connectors found")
+        return
+
+    # Fan in from all connectors concurrently, bounded by INGESTION_MAX_PARALLEL
+    semaphore = asyncio.Semaphore(max(1, settings.INGESTION_MAX_PARALLEL))
+    await asyncio.gather(*(_poll_connector(cid, semaphore) for cid in connector_ids))
+
+    if _pipeline is not None:
+        await _pipeline.flush()
+
+    # Release pooled source engines for connectors that stopped polling
+    await evict_idle_engines()
 
 
 _loop = asyncio.new_event_loop()
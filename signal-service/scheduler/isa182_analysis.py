@@ -1,11 +1,74 @@
+"""Periodic ISA-18.2 analysis job.
+
+Advances the watermarked incremental KPIs (only hours closed since the
+last run, plus hours that received late events) and then reports the
+last 24 hours from the stored hourly aggregates, so each run does a
+constant amount of work however long the history is.
+
+Each report (alarm rate, bad actors, priority distribution, correlation
+groups) is stored in isa182_reports, replacing the previous run's, and
+served by the backend's /api/isa182/reports endpoints.
+"""
+
+import asyncio
 import logging
+from datetime import datetime, timedelta, timezone
+
+from analyzers.incremental import run_incremental
+from analyzers.isa182 import ISA182Analyzer
+from db import save_report
 
 logger = logging.getLogger("signal-service.isa182")
 
+REPORT_WINDOW = timedelta(hours=24)
+
+
+async def _run_analysis() -> None:
+    analyzer = ISA182Analyzer()
+    await run_incremental(analyzer.incremental_kpis())
+
+    end = datetime.now(timezone.utc)
+    start = end - REPORT_WINDOW
+    rate = await analyzer.alarm_rate_summary(start.isoformat(), end.isoformat())
+    await save_report("alarm_rate", int(start.timestamp()), int(end.timestamp()), rate)
+    plant = rate["plant"]
+    logger.info(
+        f"Alarm rate ({plant['hours']}h): {plant['total_alarms']} alarms, "
+        f"avg {plant['avg_per_hour']}/h, peak {plant['peak_hour']}/h and "
+        f"{plant['peak_10min']}/10min, {plant['pct_hours_over_manageable']}% of hours "
+        f"> {analyzer.ALARM_RATE_MANAGEABLE}/h, {plant['pct_hours_over_overloaded']}% "
+        f"> {analyzer.ALARM_RATE_OVERLOADED}/h"
+    )
+    for area, kpis in rate["areas"].items():
+        if kpis["pct_hours_over_overloaded"] > 0:
+            logger.info(
+                f"Area '{area}': avg {kpis['avg_per_hour']}/h, peak {kpis['peak_hour']}/h, "
+                f"{kpis['pct_hours_over_overloaded']}% of hours overloaded"
+            )
+
+    reports = {
+        "bad_actors": analyzer.get_bad_actors,
+        "priority_distribution": analyzer.analyze_priority_distribution,
+        "correlations": analyzer.find_correlations,
+    }
+    for kind, compute in reports.items():
+        # One failing report must not hold back the others
+        try:
+            result = await compute(start.isoformat(), end.isoformat())
+            await save_report(kind, int(start.timestamp()), int(end.timestamp()), result)
+        except Exception as exc:
+            logger.error(f"ISA-18.2 report '{kind}' failed: {exc}")
+
+
+_loop = asyncio.new_event_loop()
+
 
 def run_isa182_analysis():
     """Periodic ISA-18.2 KPI calculation job."""
     logger.info("Running ISA-18.2 analysis job...")
-    # Phase 4: Will query Loki for alarm history and calculate
-    # chattering, stale, flooding, distribution KPIs
-    logger.info("ISA-18.2 analysis complete (not yet implemented)")
+    try:
+        _loop.run_until_complete(_run_analysis())
+    except Exception as exc:
+        logger.error(f"ISA-18.2 analysis failed: {exc}")
+        return
+    logger.info("ISA-18.2 analysis complete")
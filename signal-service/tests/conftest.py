@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# Modules import each other top-level (config, db, connectors...), as in the service container
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def cursor_store(monkeypatch):
+    """In-memory connector_cursors table, patched into the given connector modules."""
+    store: dict[str, dict] = {}
+
+    async def load_cursor(connector_id):
+        return dict(store.get(connector_id, {}))
+
+    async def save_cursor(connector_id, cursor):
+        store[connector_id] = cursor
+
+    def patch(*modules):
+        for module in modules:
+            monkeypatch.setattr(module, "load_cursor", load_cursor)
+            monkeypatch.setattr(module, "save_cursor", save_cursor)
+        return store
+
+    return patch
@@ -0,0 +1,25 @@
+import asyncio
+import threading
+
+import db
+
+
+async def _engine():
+    async with db.async_session() as session:
+        return session.bind
+
+
+def test_each_event_loop_gets_its_own_engine():
+    loop = asyncio.new_event_loop()
+    try:
+        first = loop.run_until_complete(_engine())
+        assert loop.run_until_complete(_engine()) is first
+    finally:
+        loop.close()
+
+    # A job loop in another thread (as APScheduler runs them) must not share it
+    engines = []
+    thread = threading.Thread(target=lambda: engines.append(asyncio.run(_engine())))
+    thread.start()
+    thread.join()
+    assert engines[0] is not first
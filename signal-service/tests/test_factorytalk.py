@@ -0,0 +1,121 @@
+import asyncio
+import sqlite3
+from datetime import datetime
+
+import httpx
+
+import connectors.factorytalk as factorytalk
+from connectors.factorytalk import FactoryTalkConnector
+from db import evict_idle_engines
+from normalizer.transform import get_normalizer
+from scheduler import ingestion
+
+T0 = datetime(2026, 3, 1, 8, 0, 0)
+
+
+def _all_event(path, rows):
+    # Timestamps stored as SQLAlchemy binds them, so SQLite compares them as equal strings
+    with sqlite3.connect(path) as db:
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS AllEvent (EventID TEXT, EventTimeStamp TIMESTAMP, SourceName TEXT,"
+            " ConditionName TEXT, SubConditionName TEXT, Message TEXT, Severity INTEGER, ChangeMask INTEGER,"
+            " NewState INTEGER, InputValue REAL, LimitValue REAL, ActorID TEXT)"
+        )
+        db.executemany(
+            "INSERT INTO AllEvent VALUES (?, ?, ?, ?, ?, '', 600, ?, ?, NULL, NULL, '')",
+            [
+                (event_id, ts.strftime("%Y-%m-%d %H:%M:%S.%f"), source, condition, sub, mask, state)
+                for event_id, ts, source, condition, sub, mask, state in rows
+            ],
+        )
+
+
+def _row(event_id, minute, state=0x02, mask=0x01, source="/Area1::[PLC]Tank01", sub="HI"):
+    return (event_id, T0.replace(minute=minute), source, "Level", sub, mask, state)
+
+
+def _connector(path, **params):
+    return FactoryTalkConnector({
+        "id": "ft-1",
+        "connection_params": {"database_url": f"sqlite+aiosqlite:///{path}", **params},
+    })
+
+
+def test_cursor_round_trip_across_restarts(tmp_path, cursor_store):
+    store = cursor_store(factorytalk)
+    path = tmp_path / "ftae.db"
+    # Two rows share a timestamp: EventID breaks the tie
+    _all_event(path, [_row("a", 0), _row("b", 1), _row("c", 1), _row("d", 2)])
+
+    async def run():
+        first = _connector(path, start_at="beginning", batch_size=3)
+        assert await first.connect()
+        batch = await first.fetch_alarms()
+        assert [r["EventID"] for r in batch] == ["a", "b", "c"]
+        assert first.has_more
+        await first.mark_processed(batch[:2])  # "c" never reached Loki
+        assert store["ft-1"]["event_id"] == "b"
+
+        second = _connector(path, start_at="beginning", batch_size=3)
+        assert await second.connect()
+        batch = await second.fetch_alarms()
+        assert [r["EventID"] for r in batch] == ["c", "d"]
+        await second.mark_processed(batch)
+
+        third = _connector(path, start_at="beginning", batch_size=3)
+        assert await third.connect()
+        assert await third.fetch_alarms() == []
+        await evict_idle_engines(0)
+
+    asyncio.run(run())
+
+
+def test_new_connector_starts_at_end_or_lookback(tmp_path, cursor_store):
+    cursor_store(factorytalk)
+    path = tmp_path / "ftae.db"
+    _all_event(path, [_row("a", 0), _row("b", 30), _row("c", 50)])
+
+    async def run():
+        latest = _connector(path)
+        assert await latest.connect()
+        assert await latest.fetch_alarms() == []
+        _all_event(path, [_row("d", 55)])
+        assert [r["EventID"] for r in await latest.fetch_alarms()] == ["d"]
+
+        lookback = _connector(path, lookback_hours=0.5)
+        lookback.connector_id = ""  # not persisted: independent of the first connector
+        assert await lookback.connect()
+        assert [r["EventID"] for r in await lookback.fetch_alarms()] == ["b", "c", "d"]
+        await evict_idle_engines(0)
+
+    asyncio.run(run())
+
+
+def test_transitions_of_one_condition_share_the_alarm_key():
+    normalize = get_normalizer("factorytalk")
+    active = FactoryTalkConnector._to_record(dict(zip(
+        ("EventID", "EventTimeStamp", "SourceName", "ConditionName", "SubConditionName", "ChangeMask", "NewState"),
+        _row("e1", 0),
+    )))
+    cleared = FactoryTalkConnector._to_record(dict(zip(
+        ("EventID", "EventTimeStamp", "SourceName", "ConditionName", "SubConditionName", "ChangeMask", "NewState"),
+        _row("e2", 5, state=0),
+    )))
+    a = normalize(active, "ft-1", "factorytalk").metadata
+    c = normalize(cleared, "ft-1", "factorytalk").metadata
+    assert a.event_id == c.event_id == "/Area1::[PLC]Tank01|Level|HI"
+    assert (a.vendor_alarm_id, c.vendor_alarm_id) == ("e1", "e2")
+
+
+def test_push_skips_permanently_rejected_bodies(monkeypatch):
+    statuses = iter([204, 400, 204, 503, 204])
+
+    def handler(request):
+        return httpx.Response(next(statuses), text="")
+
+    async def run():
+        monkeypatch.setattr(ingestion, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        return await ingestion._push_bodies_to_loki([(1, b"{}")] * 5)
+
+    # 400 is skipped, 503 is retried next cycle
+    assert asyncio.run(run()) == [True, False, True]
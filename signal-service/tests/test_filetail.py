@@ -0,0 +1,75 @@
+from connectors.filetail import ArchiveTailer
+
+
+def _write(path, rows, header=True, mode="w"):
+    with open(path, mode, newline="") as f:
+        if header:
+            f.write("Time,Tag,Text\n")
+        for row in rows:
+            f.write(row + "\n")
+
+
+def _rows(start, stop):
+    return [f"2026-01-01 00:00:{i:02d},T{i},text {i}" for i in range(start, stop)]
+
+
+def test_partial_commit_resumes_at_first_unprocessed_row(tmp_path):
+    _write(tmp_path / "a.csv", _rows(0, 10))
+    tailer = ArchiveTailer(str(tmp_path))
+
+    rows, state = tailer.read_batch({})
+    assert [r["Tag"] for r in rows] == [f"T{i}" for i in range(10)]
+
+    committed = ArchiveTailer.commit(state, rows[:3])
+    rows, state = tailer.read_batch(committed)
+    assert [r["Tag"] for r in rows] == [f"T{i}" for i in range(3, 10)]
+
+    committed = ArchiveTailer.commit(state, rows)
+    rows, _ = tailer.read_batch(committed)
+    assert rows == []
+
+
+def test_row_offsets_follow_quoted_multiline_fields(tmp_path):
+    path = tmp_path / "a.csv"
+    with open(path, "w", newline="") as f:
+        f.write('Time,Tag,Text\n1,T1,"line one\nline two"\n2,T2,plain\n')
+    tailer = ArchiveTailer(str(tmp_path))
+
+    rows, state = tailer.read_batch({})
+    assert [r["Text"] for r in rows] == ["line one\nline two", "plain"]
+
+    rows, _ = tailer.read_batch(ArchiveTailer.commit(state, rows[:1]))
+    assert [r["Tag"] for r in rows] == ["T2"]
+
+
+def test_restart_reads_only_appended_rows(tmp_path):
+    path = tmp_path / "a.csv"
+    _write(path, _rows(0, 5))
+    rows, state = ArchiveTailer(str(tmp_path)).read_batch({})
+    checkpoints = ArchiveTailer.commit(state, rows)
+
+    _write(path, _rows(5, 8), header=False, mode="a")
+    rows, _ = ArchiveTailer(str(tmp_path)).read_batch(checkpoints)
+    assert [r["Tag"] for r in rows] == ["T5", "T6", "T7"]
+
+
+def test_batch_budget_splits_on_row_boundaries(tmp_path):
+    _write(tmp_path / "a.csv", _rows(0, 100))
+    tailer = ArchiveTailer(str(tmp_path), max_batch_bytes=1024)
+
+    seen, checkpoints = [], {}
+    while True:
+        rows, state = tailer.read_batch(checkpoints)
+        if not rows:
+            break
+        seen.extend(r["Tag"] for r in rows)
+        checkpoints = ArchiveTailer.commit(state, rows)
+    assert seen == [f"T{i}" for i in range(100)]
+
+
+def test_crlf_rows_end_past_their_line_terminator(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_bytes(b'Time,Tag,Text\r\n1,T1,"a\r\nb"\r\n2,T2,x\r\n')
+
+    rows, _ = ArchiveTailer(str(tmp_path)).read_batch({})
+    assert [(r["Text"], r["_offset"]) for r in rows] == [("a\r\nb", 28), ("x", path.stat().st_size)]
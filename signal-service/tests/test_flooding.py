@@ -0,0 +1,46 @@
+import asyncio
+
+from analyzers import flooding
+from analyzers.flooding import FloodDetector
+from normalizer.schema import AlarmRecord
+
+T0 = 1_000_000.0  # far in the past: closing by wall-clock time would end every flood at once
+
+
+def _act(ts, area, connector, n):
+    return AlarmRecord(ts, area, f"Tag{n}", "HI", "active", "high", f"{connector}-{n}", connector)
+
+
+def test_interleaved_connectors_with_skewed_clocks(monkeypatch):
+    saved = []
+
+    async def save_flood_episodes(episodes):
+        saved.extend(episodes)
+
+    monkeypatch.setattr(flooding, "save_flood_episodes", save_flood_episodes)
+    detector = FloodDetector(threshold=10, live=True)
+
+    # Connector "a" is on time with a steady trickle in Area1. Connector "b"
+    # runs 15 minutes (more than the window) behind and floods Area2. Their
+    # batches arrive interleaved, one of each per ingestion cycle.
+    for cycle in range(6):
+        now = T0 + cycle * 30
+        detector.observe([_act(now + i, "Area1", "a", cycle * 10 + i) for i in range(0, 30, 10)])
+        detector.observe([_act(now - 900 + i, "Area2", "b", cycle * 10 + i) for i in range(0, 30, 5)])
+        asyncio.run(detector.flush())
+
+    assert detector.late == 0
+    floods = {ep["scope"]: ep for ep in detector.open_episodes()}
+    assert "Area2" in floods and "Area1" not in floods
+    assert floods["Area2"]["start"] < T0 - 700
+    # Still open: "b" keeps delivering, so event time (not the wall clock) decides
+    assert not detector.closed
+    assert {ep["scope"] for ep in saved} >= {"Area2"}
+
+
+def test_replay_counts_in_arrival_order():
+    detector = FloodDetector(threshold=3)
+    detector.observe([_act(T0 + i, "Area1", "a", i) for i in range(5)])
+    assert detector.rates()["Area1"] == 5
+    detector.close_all()
+    assert [ep["scope"] for ep in detector.drain()] == ["Area1", "plant"]
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from analyzers import incremental
+from analyzers.incremental import IncrementalKPI, run_incremental
+from config import settings
+
+HOUR = 3600
+NOW = 1_000 * HOUR + settings.ANALYSIS_LATENESS_SECONDS
+
+
+class _Marks:
+    """analysis_dirty_hours / watermarks stand-in with claim semantics."""
+
+    def __init__(self, monkeypatch, hours, watermark):
+        self.hours = set(hours)
+        self.watermarks = {}
+
+        async def claim(before, limit):
+            claimed = sorted(h for h in self.hours if h < before)[:limit]
+            self.hours -= set(claimed)
+            return claimed
+
+        async def restore(hours):
+            self.hours |= set(hours)
+
+        async def load_watermark(name):
+            return self.watermarks.get(name, watermark)
+
+        async def save_watermark(name, value):
+            self.watermarks[name] = value
+
+        monkeypatch.setattr(incremental, "claim_dirty_hours", claim)
+        monkeypatch.setattr(incremental, "restore_dirty_hours", restore)
+        monkeypatch.setattr(incremental, "load_watermark", load_watermark)
+        monkeypatch.setattr(incremental, "save_watermark", save_watermark)
+
+
+class _RecordingKPI(IncrementalKPI):
+    name = "test"
+
+    def __init__(self, on_recompute=None):
+        self.hours = []
+        self.on_recompute = on_recompute
+
+    async def recompute(self, hours):
+        self.hours.extend(hours)
+        if self.on_recompute:
+            self.on_recompute()
+
+
+def test_mark_added_during_recompute_survives(monkeypatch):
+    marks = _Marks(monkeypatch, [990 * HOUR], watermark=1_000 * HOUR)
+    # Ingestion re-marks the hour while it is being recomputed
+    kpi = _RecordingKPI(on_recompute=lambda: marks.hours.add(990 * HOUR))
+
+    asyncio.run(run_incremental([kpi], now=NOW))
+    assert kpi.hours == [990 * HOUR]
+    assert marks.hours == {990 * HOUR}
+
+
+def test_failed_recompute_restores_claimed_marks(monkeypatch):
+    marks = _Marks(monkeypatch, [990 * HOUR, 991 * HOUR], watermark=1_000 * HOUR)
+
+    def fail():
+        raise RuntimeError("database went away")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run_incremental([_RecordingKPI(on_recompute=fail)], now=NOW))
+    assert marks.hours == {990 * HOUR, 991 * HOUR}
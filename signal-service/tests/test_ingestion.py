@@ -0,0 +1,27 @@
+from normalizer.batch import NormalizedBatch
+from scheduler.ingestion import _processed_rows
+
+ROWS = [{"id": i} for i in range(6)]
+# Row 2 failed to normalize; the rest went out in three bodies of 2, 2 and 1 events
+BATCH = NormalizedBatch(bodies=[(2, b""), (2, b""), (1, b"")], ok=[0, 1, 3, 4, 5], errors=1, records=[])
+
+
+def _ids(rows):
+    return [r["id"] for r in rows]
+
+
+def test_cursor_sources_skip_past_rejected_and_failed_rows():
+    done, finished = _processed_rows(ROWS, BATCH, [True, False, True], skip_failed=True)
+    assert (_ids(done), finished) == ([0, 1, 2, 3, 4, 5], True)
+
+    # A transient failure on the last body holds the cursor at the last row sent
+    done, finished = _processed_rows(ROWS, BATCH, [True, False], skip_failed=True)
+    assert (_ids(done), finished) == ([0, 1, 2, 3, 4], False)
+
+
+def test_journal_sources_only_delete_rows_that_reached_loki():
+    done, finished = _processed_rows(ROWS, BATCH, [True, False, True], skip_failed=False)
+    assert (_ids(done), finished) == ([0, 1, 5], True)
+
+    done, finished = _processed_rows(ROWS, BATCH, [False], skip_failed=False)
+    assert (done, finished) == ([], False)
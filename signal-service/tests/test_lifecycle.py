@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from analyzers import lifecycle
+from analyzers.lifecycle import LifecycleAssembler
+from normalizer.schema import AlarmRecord
+
+
+def _rec(ts, event_type, event_id="ev-1"):
+    return AlarmRecord(ts, "Area1", "Tank01", "HighLevel", event_type, "high", event_id, "ft-1")
+
+
+def test_live_flush_persists_completed_alarms(monkeypatch):
+    stored = []
+
+    async def save_lifecycles(alarms):
+        stored.extend(alarms)
+
+    monkeypatch.setattr(lifecycle, "save_lifecycles", save_lifecycles)
+    assembler = LifecycleAssembler(live=True)
+    # The transitions of one alarm arrive in different ingestion batches
+    assembler.observe([_rec(100, "active"), _rec(105, "active", "ev-2")])
+    assembler.observe([_rec(130, "ack"), _rec(190, "clear")])
+    asyncio.run(assembler.flush())
+
+    assert [(a["event_id"], a["time_to_ack"], a["time_to_clear"], a["outcome"]) for a in stored] == [
+        ("ev-1", 30, 90, "cleared")
+    ]
+    assert assembler.pending == 1
+
+
+def test_failed_flush_keeps_alarms_for_the_next_one(monkeypatch):
+    async def failing(alarms):
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(lifecycle, "save_lifecycles", failing)
+    assembler = LifecycleAssembler(live=True)
+    assembler.observe([_rec(100, "active"), _rec(190, "clear")])
+    with pytest.raises(ConnectionError):
+        asyncio.run(assembler.flush())
+
+    stored = []
+
+    async def save_lifecycles(alarms):
+        stored.extend(alarms)
+
+    monkeypatch.setattr(lifecycle, "save_lifecycles", save_lifecycles)
+    asyncio.run(assembler.flush())
+    assert [a["event_id"] for a in stored] == ["ev-1"]
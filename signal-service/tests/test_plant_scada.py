@@ -0,0 +1,137 @@
+import asyncio
+import base64
+
+import httpx
+
+from connectors import plant_scada
+from connectors.plant_scada import PlantSCADAConnector
+from normalizer.transform import get_normalizer
+
+
+def _write(path, start, stop, header=True):
+    with open(path, "a", newline="") as f:
+        if header:
+            f.write("Date,Time,Tag,Desc\n")
+        for i in range(start, stop):
+            f.write(f"2026-01-01,00:00:{i:02d},T{i},alarm {i}\n")
+
+
+def _connector(export_dir, **params):
+    return PlantSCADAConnector({"id": "ps-1", "connection_params": {"export_dir": str(export_dir), **params}})
+
+
+async def _fetch(connector):
+    return [r["Tag"] for r in await connector.fetch_alarms()]
+
+
+def test_file_mode_partial_commit_rereads_unpushed_rows(tmp_path, cursor_store):
+    cursor_store(plant_scada)
+    _write(tmp_path / "summary.csv", 0, 10)
+
+    async def run():
+        connector = _connector(tmp_path, start_at="beginning")
+        assert await connector.connect()
+        rows = await connector.fetch_alarms()
+        assert len(rows) == 10
+        assert rows[0]["Time"] == "2026-01-01 00:00:00"
+
+        # Loki accepted only the first 3 rows
+        await connector.mark_processed(rows[:3])
+        assert await _fetch(connector) == [f"T{i}" for i in range(3, 10)]
+
+        # ...and the same after a restart
+        restarted = _connector(tmp_path, start_at="beginning")
+        assert await restarted.connect()
+        assert await _fetch(restarted) == [f"T{i}" for i in range(3, 10)]
+
+    asyncio.run(run())
+
+
+def test_start_at_defaults_to_end(tmp_path, cursor_store):
+    cursor_store(plant_scada)
+    path = tmp_path / "summary.csv"
+    _write(path, 0, 5)
+
+    async def run():
+        connector = _connector(tmp_path)
+        assert await connector.connect()
+        assert await connector.fetch_alarms() == []
+
+        _write(path, 5, 7, header=False)
+        restarted = _connector(tmp_path)
+        assert await restarted.connect()
+        assert await _fetch(restarted) == ["T5", "T6"]
+
+    asyncio.run(run())
+
+
+def test_http_health_check_sends_the_fetch_credentials(monkeypatch, cursor_store):
+    cursor_store(plant_scada)
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.params.get("limit"), request.headers.get("Authorization")))
+        return httpx.Response(200, json={"records": []})
+
+    client_cls = httpx.AsyncClient
+    monkeypatch.setattr(
+        plant_scada.httpx, "AsyncClient",
+        lambda **kwargs: client_cls(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    connector = PlantSCADAConnector({
+        "id": "ps-1",
+        "credentials": {"username": "scada", "password": "secret"},
+        "connection_params": {"mode": "http", "url": "http://scada.plant/export"},
+    })
+
+    async def run():
+        assert await connector.connect()
+        await connector.fetch_alarms()
+        assert (await connector.health_check())["status"] == "healthy"
+        await connector.disconnect()
+
+    asyncio.run(run())
+    auth = "Basic " + base64.b64encode(b"scada:secret").decode()
+    assert seen == [("1000", auth), ("1", auth)]
+
+
+def test_transitions_of_one_alarm_share_the_alarm_key():
+    normalize = get_normalizer("plant_scada")
+    connector = _connector("unused")
+    rows = [
+        {"AlarmID": "CIT-1", "Time": "2026-01-01 00:00:00", "Equipment": "PUMP_01", "Tag": "P01_FAULT", "State": "Active"},
+        {"AlarmID": "CIT-2", "Time": "2026-01-01 00:05:00", "Equipment": "PUMP_01", "Tag": "P01_FAULT", "State": "Cleared"},
+    ]
+    meta = [normalize(connector._to_record(row), "ps-1", "plant_scada").metadata for row in rows]
+    assert [m.event_id for m in meta] == ["PUMP_01|P01_FAULT"] * 2
+    assert [m.vendor_alarm_id for m in meta] == ["CIT-1", "CIT-2"]
+
+
+def test_http_cursor_skips_rows_without_a_cursor_value(monkeypatch, cursor_store):
+    store = cursor_store(plant_scada)
+    pages = {
+        None: [{"SeqNo": 1, "Tag": "A"}, {"SeqNo": 2, "Tag": "B"}, {"Tag": "C"}],
+        "2": [{"Tag": "D"}],
+    }
+
+    def handler(request):
+        return httpx.Response(200, json=pages[request.url.params.get("after")])
+
+    client_cls = httpx.AsyncClient
+    monkeypatch.setattr(
+        plant_scada.httpx, "AsyncClient",
+        lambda **kwargs: client_cls(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    connector = _connector("unused", mode="http", url="http://scada.plant/export", start_at="beginning")
+
+    async def run():
+        assert await connector.connect()
+        rows = await connector.fetch_alarms()
+        assert await connector.mark_processed(rows) == 3
+        assert store["ps-1"] == {"after": 2}
+        # A page with no cursor values at all is not handed out for pushing
+        assert await connector.fetch_alarms() == []
+        assert not connector.has_more
+        await connector.disconnect()
+
+    asyncio.run(run())
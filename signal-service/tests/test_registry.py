@@ -0,0 +1,15 @@
+import pytest
+
+from connectors.registry import BUILTIN_CONNECTORS, ConnectorRegistry
+
+
+@pytest.mark.parametrize("connector_type", sorted(BUILTIN_CONNECTORS))
+def test_capabilities_come_from_the_connector_class(connector_type):
+    registry = ConnectorRegistry()
+    assert registry.capabilities(connector_type) is registry.load(connector_type).capabilities
+
+
+def test_unknown_type_has_no_capabilities():
+    registry = ConnectorRegistry()
+    assert registry.load("no_such_vendor") is None
+    assert not registry.capabilities("no_such_vendor").batch_fetch
@@ -0,0 +1,87 @@
+import asyncio
+
+from connectors import wincc
+from connectors.wincc import WinCCConnector
+from normalizer.transform import get_normalizer
+
+
+def _write(path, start, stop, header=True):
+    with open(path, "a", newline="") as f:
+        if header:
+            f.write("Date;Time;Number;Message text\n")
+        for i in range(start, stop):
+            f.write(f"2026-01-01;00:00:{i:02d};{i};alarm {i}\n")
+
+
+def _connector(archive_dir, **params):
+    return WinCCConnector({
+        "id": "wincc-1",
+        "connection_params": {
+            "archive_dir": str(archive_dir),
+            "column_map": {"Number": "EventId", "Message text": "AlarmText"},
+            **params,
+        },
+    })
+
+
+async def _fetch(connector):
+    return [r["EventId"] for r in await connector.fetch_alarms()]
+
+
+def test_partial_commit_rereads_unpushed_rows(tmp_path, cursor_store):
+    cursor_store(wincc)
+    _write(tmp_path / "AlarmLog_01.csv", 0, 8)
+
+    async def run():
+        connector = _connector(tmp_path, start_at="beginning")
+        assert await connector.connect()
+        rows = await connector.fetch_alarms()
+        assert [r["EventId"] for r in rows] == [str(i) for i in range(8)]
+        assert rows[0]["DateTime"] == "2026-01-01 00:00:00"
+        assert rows[0]["AlarmText"] == "alarm 0"
+
+        # Loki accepted only the first 5 rows
+        await connector.mark_processed(rows[:5])
+        assert await _fetch(connector) == ["5", "6", "7"]
+
+        # ...and the same after a restart
+        restarted = _connector(tmp_path, start_at="beginning")
+        assert await restarted.connect()
+        assert await _fetch(restarted) == ["5", "6", "7"]
+
+    asyncio.run(run())
+
+
+def test_restart_reads_only_rows_appended_since(tmp_path, cursor_store):
+    cursor_store(wincc)
+    path = tmp_path / "AlarmLog_01.csv"
+    _write(path, 0, 3)
+
+    async def run():
+        connector = _connector(tmp_path)
+        assert await connector.connect()
+        # start_at defaults to "end": existing history is skipped
+        assert await _fetch(connector) == []
+        _write(path, 3, 6, header=False)
+        rows = await connector.fetch_alarms()
+        assert [r["EventId"] for r in rows] == ["3", "4", "5"]
+        await connector.mark_processed(rows)
+
+        _write(path, 6, 8, header=False)
+        restarted = _connector(tmp_path)
+        assert await restarted.connect()
+        assert await _fetch(restarted) == ["6", "7"]
+
+    asyncio.run(run())
+
+
+def test_come_and_go_rows_share_the_alarm_key(tmp_path):
+    normalize = get_normalizer("wincc")
+    connector = _connector(tmp_path, column_map={"Number": "MessageNumber"})
+    rows = [
+        {"EventId": "e1", "Date": "2026-01-01", "Time": "00:00:00", "Number": "1234", "Tag": "M01_TEMP", "State": "COME"},
+        {"EventId": "e2", "Date": "2026-01-01", "Time": "00:05:00", "Number": "1234", "Tag": "M01_TEMP", "State": "GO"},
+    ]
+    meta = [normalize(connector._to_record(row), "wincc-1", "wincc").metadata for row in rows]
+    assert [m.event_id for m in meta] == ["M01_TEMP|1234"] * 2
+    assert [m.vendor_alarm_id for m in meta] == ["e1", "e2"]